@@ -0,0 +1,379 @@
+"""
+run_benchmarks.py
+Μετρήσεις απόδοσης για τα στάδια του inspect_directory_state και για το
+pipeline του __main__.process_files, πάνω σε συνθετικά δέντρα.
+
+Κάθε στάδιο τρέχει σε ξεχωριστό child process, ώστε το peak RSS και οι
+μετρητές I/O (/proc/self/io στο Linux: κλήσεις read/write και bytes που
+διαβάστηκαν) να αφορούν μόνο αυτό. Οι κλήσεις stat και scandir δεν
+φαίνονται στο /proc/self/io· μετρώνται τυλίγοντας τα os.stat/lstat/fstat,
+os.scandir και DirEntry.stat μέσα στο child (StatCounter). Τα is_dir/
+is_file του DirEntry δεν μετρώνται, αφού με d_type δεν κάνουν κλήση. Τα
+αρχεία είναι ήδη στην page cache μετά τη δημιουργία τους, οπότε τα MB/s
+δείχνουν κόστος CPU και όχι δίσκου.
+Τα αποτελέσματα συγκρίνονται με ένα αποθηκευμένο baseline JSON.
+
+Χρήση:
+    python -m benchmarks.run_benchmarks [--profile NAME] [--scale 0.2]
+        [--baseline benchmarks/baseline.json] [--save-baseline]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_tree import PROFILES, generate_tree  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baseline.json"
+)
+
+# Πόσο πιο αργό (σε files/sec) επιτρέπεται να είναι ένα στάδιο από το baseline
+DEFAULT_TOLERANCE = 0.15
+
+
+# -------------------------------
+# Στάδια
+# -------------------------------
+# Κάθε στάδιο είναι (setup, timed): το setup τρέχει εκτός χρονομέτρησης
+# και το αποτέλεσμά του περνά στο timed.
+
+
+def _stage_walk(root: str):
+    from pure_core.directory_scanner import scan_files
+
+    return None, lambda _: sum(1 for _ in scan_files(root))
+
+
+def _stage_stat(root: str):
+    from pure_core.duplicate_detector import iter_directory_state
+
+    return None, lambda _: len(list(iter_directory_state(root)))
+
+
+def _stage_hash(root: str):
+    from pure_core.duplicate_detector import iter_directory_state, staged_hash_pipeline
+
+    records = list(iter_directory_state(root))
+    return records, lambda recs: len(staged_hash_pipeline(recs))
+
+
+def _stage_group(root: str):
+    from pure_core.duplicate_detector import (
+        analyze_duplicate_groups,
+        group_files_by_name,
+        iter_directory_state,
+        staged_hash_pipeline,
+    )
+
+    records = staged_hash_pipeline(iter_directory_state(root))
+
+    def timed(recs):
+        name_map = group_files_by_name(recs)
+        analyze_duplicate_groups(name_map)
+        return len(name_map)
+
+    return records, timed
+
+
+def _stage_inspect(root: str):
+    from pure_core.duplicate_detector import inspect_directory_state
+
+    return None, lambda _: len(inspect_directory_state(root))
+
+
+def _stage_process_files(root: str):
+    from pure_core.__main__ import process_files
+
+    # Το process_files είναι καταστροφικό: δουλεύει σε αντίγραφο
+    work = tempfile.mkdtemp(prefix="bench_process_")
+    shutil.rmtree(work)
+    shutil.copytree(root, work, copy_function=shutil.copy2)
+
+    def timed(_):
+        try:
+            process_files(work)
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+
+    return None, timed
+
+
+STAGES: dict[str, Callable[[str], tuple]] = {
+    "walk": _stage_walk,
+    "stat": _stage_stat,
+    "hash": _stage_hash,
+    "group": _stage_group,
+    "inspect_directory_state": _stage_inspect,
+    "process_files": _stage_process_files,
+}
+
+
+# -------------------------------
+# Μετρήσεις
+# -------------------------------
+
+
+class StatCounter:
+    """
+    Μετρά τις κλήσεις stat (os.stat/lstat/fstat και την πρώτη κλήση
+    DirEntry.stat ανά εγγραφή, που είναι και η μόνη με syscall) και τα
+    os.scandir, αντικαθιστώντας προσωρινά τις συναρτήσεις του os.
+    """
+
+    _NAMES = ("stat", "lstat", "fstat", "scandir")
+
+    def __init__(self):
+        self.stats = 0
+        self.scandirs = 0
+        self._saved: dict[str, Callable] = {}
+
+    def __enter__(self) -> "StatCounter":
+        for name in self._NAMES:
+            self._saved[name] = getattr(os, name)
+        os.stat = self._counted(self._saved["stat"])
+        os.lstat = self._counted(self._saved["lstat"])
+        os.fstat = self._counted(self._saved["fstat"])
+        os.scandir = self._scandir
+        return self
+
+    def __exit__(self, *exc) -> None:
+        for name, function in self._saved.items():
+            setattr(os, name, function)
+
+    def _counted(self, function: Callable) -> Callable:
+        def counted(*args, **kwargs):  # type: ignore
+            self.stats += 1
+            return function(*args, **kwargs)
+
+        return counted
+
+    def _scandir(self, *args, **kwargs):  # type: ignore
+        self.scandirs += 1
+        return _CountingScandir(self._saved["scandir"](*args, **kwargs), self)
+
+
+class _CountingScandir:
+    def __init__(self, iterator, counter: StatCounter):  # type: ignore
+        self._iterator = iterator
+        self._counter = counter
+
+    def __iter__(self) -> "_CountingScandir":
+        return self
+
+    def __next__(self) -> "_CountingEntry":
+        return _CountingEntry(next(self._iterator), self._counter)
+
+    def __enter__(self) -> "_CountingScandir":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._iterator.close()
+
+
+class _CountingEntry:
+    """DirEntry που μετρά την πρώτη κλήση stat (ανά follow_symlinks)."""
+
+    def __init__(self, entry: os.DirEntry, counter: StatCounter):
+        self._entry = entry
+        self._counter = counter
+        self._stated: set[bool] = set()
+
+    def stat(self, *, follow_symlinks: bool = True) -> os.stat_result:
+        if follow_symlinks not in self._stated:
+            self._stated.add(follow_symlinks)
+            self._counter.stats += 1
+        return self._entry.stat(follow_symlinks=follow_symlinks)
+
+    def __fspath__(self) -> str:
+        return self._entry.path
+
+    def __getattr__(self, name: str):  # type: ignore
+        return getattr(self._entry, name)
+
+
+def _proc_io() -> Optional[dict]:
+    """Μετρητές I/O του process από το /proc/self/io (μόνο Linux)."""
+    try:
+        with open("/proc/self/io") as f:
+            return {k: int(v) for k, v in (line.split(": ") for line in f)}
+    except OSError:
+        return None
+
+
+def _peak_rss_kib() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Το macOS δίνει bytes, το Linux KiB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _run_stage_in_child(stage: str, root: str, conn) -> None:  # type: ignore
+    os.chdir(tempfile.gettempdir())
+    setup, timed = STAGES[stage](root)
+    io_before = _proc_io()
+    with StatCounter() as counter:
+        start = time.perf_counter()
+        timed(setup)
+        elapsed = time.perf_counter() - start
+    io_after = _proc_io()
+
+    result = {
+        "seconds": elapsed,
+        "peak_rss_kib": _peak_rss_kib(),
+        "stat_calls": counter.stats,
+        "scandir_calls": counter.scandirs,
+    }
+    if io_before and io_after:
+        result["read_syscalls"] = io_after["syscr"] - io_before["syscr"]
+        result["write_syscalls"] = io_after["syscw"] - io_before["syscw"]
+        result["bytes_read"] = io_after["rchar"] - io_before["rchar"]
+    conn.send(result)
+    conn.close()
+
+
+def measure_stage(stage: str, root: str, tree: dict) -> dict:
+    """Τρέχει ένα στάδιο σε child process και επιστρέφει τις μετρήσεις του."""
+    parent, child = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=_run_stage_in_child, args=(stage, root, child)
+    )
+    process.start()
+    child.close()
+    result = parent.recv()
+    process.join()
+
+    seconds = max(result["seconds"], 1e-9)
+    result["files_per_sec"] = tree["files"] / seconds
+    result["mb_per_sec"] = tree["bytes"] / (1024 * 1024) / seconds
+    return result
+
+
+def run_benchmarks(
+    profiles: list[str], stages: list[str], scale: float, seed: int
+) -> dict:
+    """Δημιουργεί κάθε προφίλ και μετρά όλα τα στάδια πάνω του."""
+    results: dict = {"scale": scale, "seed": seed, "profiles": {}}
+    for profile in profiles:
+        root = tempfile.mkdtemp(prefix=f"bench_{profile}_")
+        try:
+            tree = generate_tree(root, profile, seed, scale)
+            entry = {"tree": tree, "stages": {}}
+            for stage in stages:
+                entry["stages"][stage] = measure_stage(stage, root, tree)
+            results["profiles"][profile] = entry
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def compare_to_baseline(
+    results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE
+) -> list[str]:
+    """
+    Επιστρέφει μηνύματα για κάθε στάδιο που είναι πιο αργό από το baseline
+    ή κάνει περισσότερες κλήσεις stat (οι κλήσεις δεν έχουν θόρυβο, οπότε
+    συγκρίνονται χωρίς ανοχή).
+    """
+    regressions: list[str] = []
+    if baseline.get("scale") != results["scale"]:
+        print("⚠️ Το baseline έχει διαφορετικό scale, παραλείπεται η σύγκριση.")
+        return regressions
+    for profile, entry in results["profiles"].items():
+        base_entry = baseline.get("profiles", {}).get(profile)
+        if not base_entry:
+            continue
+        for stage, metrics in entry["stages"].items():
+            base = base_entry["stages"].get(stage)
+            if not base:
+                continue
+            ratio = metrics["files_per_sec"] / max(base["files_per_sec"], 1e-9)
+            if ratio < 1 - tolerance:
+                regressions.append(
+                    f"{profile}/{stage}: {metrics['files_per_sec']:.0f} files/s "
+                    f"έναντι {base['files_per_sec']:.0f} στο baseline ({ratio:.0%})"
+                )
+            stats, base_stats = metrics.get("stat_calls"), base.get("stat_calls")
+            if stats is not None and base_stats is not None and stats > base_stats:
+                regressions.append(
+                    f"{profile}/{stage}: {stats} κλήσεις stat έναντι {base_stats} "
+                    "στο baseline"
+                )
+    return regressions
+
+
+def print_report(results: dict) -> None:
+    header = (
+        f"{'profile':<24}{'stage':<26}{'files/s':>12}{'MB/s':>10}"
+        f"{'stat':>10}{'read sys':>10}{'RSS KiB':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    for profile, entry in results["profiles"].items():
+        for stage, m in entry["stages"].items():
+            print(
+                f"{profile:<24}{stage:<26}{m['files_per_sec']:>12.0f}{m['mb_per_sec']:>10.1f}"
+                f"{m.get('stat_calls', '-'):>10}{m.get('read_syscalls', '-'):>10}"
+                f"{m.get('peak_rss_kib') or '-':>10}"
+            )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks σάρωσης/hash/συγχώνευσης")
+    parser.add_argument("--profile", action="append", choices=sorted(PROFILES))
+    parser.add_argument("--stage", action="append", choices=list(STAGES))
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--output", help="αποθήκευση των αποτελεσμάτων σε JSON")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        args.profile or sorted(PROFILES),
+        args.stage or list(STAGES),
+        args.scale,
+        args.seed,
+    )
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Αποθηκεύτηκε baseline: {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"⚠️ Regression: {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+synthetic_tree.py
+Ντετερμινιστική δημιουργία συνθετικών δέντρων αρχείων για τα benchmarks.
+
+Κάθε προφίλ παράγει πάντα τα ίδια ονόματα, περιεχόμενα και χρόνους για
+το ίδιο seed και scale, ώστε οι μετρήσεις να συγκρίνονται μεταξύ εκτελέσεων.
+"""
+
+import os
+import random
+from typing import Callable
+
+# Σταθερός χρόνος τροποποίησης για όλα τα αρχεία (2020-01-01)
+FIXED_MTIME = 1_577_836_800
+
+
+def _write(path: str, data: bytes, mtime: int = FIXED_MTIME) -> int:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    os.utime(path, (mtime, mtime))
+    return len(data)
+
+
+def _many_small(root: str, rng: random.Random, scale: float) -> None:
+    """Πολλά μικρά αρχεία (0-4 KiB) σε πολλούς φακέλους."""
+    for i in range(int(5000 * scale)):
+        size = rng.randint(0, 4096)
+        _write(
+            os.path.join(root, f"dir{i % 50:02d}", f"small{i}.dat"), rng.randbytes(size)
+        )
+
+
+def _few_huge(root: str, rng: random.Random, scale: float) -> None:
+    """Λίγα πολύ μεγάλα αρχεία, δύο από τα οποία είναι ίδια."""
+    size = int(32 * 1024 * 1024 * scale)
+    payload = rng.randbytes(size)
+    _write(os.path.join(root, "a", "image.iso"), payload)
+    _write(os.path.join(root, "b", "image.iso"), payload)
+    # Ίδιο μέγεθος, ίδια αρχή/τέλος, διαφορετική μέση
+    middle = size // 2
+    _write(
+        os.path.join(root, "c", "image.iso"),
+        payload[:middle] + b"\x00" + payload[middle + 1 :],
+    )
+
+
+def _deep_nesting(root: str, rng: random.Random, scale: float) -> None:
+    """Βαθιά αλυσίδα φακέλων με λίγα αρχεία σε κάθε επίπεδο."""
+    path = root
+    for depth in range(int(60 * scale) or 1):
+        path = os.path.join(path, f"level{depth}")
+        for i in range(3):
+            _write(
+                os.path.join(path, f"file{i}.txt"), rng.randbytes(rng.randint(10, 2000))
+            )
+
+
+def _high_duplicates(root: str, rng: random.Random, scale: float) -> None:
+    """Υψηλό ποσοστό διπλοτύπων: λίγα πρωτότυπα σε πολλά αντίγραφα."""
+    originals = [rng.randbytes(rng.randint(1024, 65536)) for _ in range(50)]
+    for i in range(int(2000 * scale)):
+        index = i % len(originals)
+        _write(
+            os.path.join(root, f"copy{i % 40:02d}", f"doc{index}.bin"), originals[index]
+        )
+
+
+def _same_name_diff_content(root: str, rng: random.Random, scale: float) -> None:
+    """Ίδια ονόματα σε διαφορετικούς φακέλους με διαφορετικό περιεχόμενο."""
+    for i in range(int(500 * scale)):
+        for version in range(4):
+            data = f"name {i} version {version}\n".encode() * rng.randint(1, 50)
+            _write(
+                os.path.join(root, f"v{version}", f"notes{i}.txt"),
+                data,
+                FIXED_MTIME + version,
+            )
+
+
+PROFILES: dict[str, Callable[[str, random.Random, float], None]] = {
+    "many_small": _many_small,
+    "few_huge": _few_huge,
+    "deep_nesting": _deep_nesting,
+    "high_duplicates": _high_duplicates,
+    "same_name_diff_content": _same_name_diff_content,
+}
+
+
+def generate_tree(
+    root: str, profile: str, seed: int = 1234, scale: float = 1.0
+) -> dict:
+    """Δημιουργεί το δέντρο του προφίλ στο root· επιστρέφει πλήθος/μέγεθος αρχείων."""
+    PROFILES[profile](root, random.Random(f"{profile}:{seed}"), scale)
+    return tree_summary(root)
+
+
+def tree_summary(root: str) -> dict:
+    """Αριθμός αρχείων και συνολικά bytes κάτω από το root."""
+    files = total = 0
+    for current, _, names in os.walk(root):
+        for name in names:
+            files += 1
+            total += os.path.getsize(os.path.join(current, name))
+    return {"files": files, "bytes": total}
@@ -1,14 +1,72 @@
+import argparse
+import json
+import logging
 import sys
 import os
+import signal
+import tempfile
+import threading
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from collections import defaultdict
-from pure_core.duplicate_detector import inspect_directory_state
+from pure_core.action_plan import PlanWriter, execute_plan, plan_group, version_chain
+from pure_core.archive_scanner import (
+    ArchiveScanner,
+    log_archive_copies,
+    without_virtual,
+)
+from pure_core.async_scanner import DEFAULT_CONCURRENCY, scan_directory_blocking
+from pure_core.duplicate_detector import (
+    StreamingGrouper,
+    analyze_duplicate_groups,
+    hash_candidate_groups,
+    iter_directory_state,
+    save_scan_snapshot,
+    version_key,
+)
+from pure_core.directory_snapshot import DirectorySnapshot, IncrementalScanner
+from pure_core.exclusion_config import EXCLUDED_DIR_NAMES, ExclusionMatcher, set_matcher
+from pure_core.hash_backends import (
+    DEFAULT_ALGORITHM,
+    DEFAULT_READ_SIZE,
+    available_algorithms,
+    resolve_algorithm,
+)
+from pure_core.hash_cache import HashCache, default_cache_path
+from pure_core.io_budget import Budget, lower_priority, parse_rate, set_budget
+from pure_core.io_scheduler import IO_ORDERS, IOSchedule, set_io_schedule
+from pure_core.metrics import (
+    METRICS_FORMATS,
+    Metrics,
+    get_metrics,
+    profiling,
+    set_metrics,
+    write_metrics,
+)
+from pure_core.parallel import default_jobs
+from pure_core.shard_index import (
+    build_shard_index,
+    index_algorithm,
+    iter_index_groups,
+    parse_shard,
+)
+from pure_core.similarity import DEFAULT_SIMILARITY, find_near_duplicates
+from pure_core.watch_daemon import (
+    DEFAULT_DEBOUNCE,
+    DEFAULT_POLL_INTERVAL,
+    InotifyWatcher,
+    QueryServer,
+    WatchDaemon,
+    query_daemon,
+)
 from pure_core.file_sync_manager import (
+    DEDUP_MODES,
+    MERGE_STRATEGIES,
+    MERGE_TARGETS,
     delete_duplicates,
-    merge_by_version_date,
-    merge_random_conflict,
+    link_duplicates,
+    merge_version_chain,
 )
 
 
@@ -22,51 +80,721 @@ def group_files_by_name(file_infos):
 def group_files_by_hash(files):
     grouped = defaultdict(list)
     for f in files:
-        grouped[f["hash"]].append(f)
+        grouped[version_key(f)].append(f)
     return grouped
 
 
-def handle_duplicates(hashes):
+def handle_duplicates(hashes, dedup_mode="delete"):
     for group in hashes.values():
         if len(group) > 1:
-            delete_duplicates(group)
+            if dedup_mode == "delete":
+                delete_duplicates(group)
+            else:
+                link_duplicates(group, dedup_mode)
+
+
+def handle_merges(hashes, merge_strategy="append", merge_target="oldest"):
+    chain = version_chain(hashes, merge_target)
+    if len(chain) < 2:
+        return
+    try:
+        merge_version_chain(chain, merge_strategy)
+    except Exception as e:
+        logging.error(f"Σφάλμα συγχώνευσης εκδόσεων: {chain[0][1]['path']} -> {e}")
 
 
-def handle_merges(hashes):
-    remaining = [f for group in hashes.values() if len(group) == 1 for f in group]
-    while len(remaining) >= 2:
-        f1 = remaining.pop()
-        f2 = remaining.pop()
-        if f1["created"] != f2["created"]:
-            newer = f1 if f1["created"] > f2["created"] else f2
-            older = f2 if newer is f1 else f1
-            merge_by_version_date(older, newer)
-        else:
-            merge_random_conflict(f1, f2)
+def handle_name_groups(
+    groups,
+    dedup_mode="delete",
+    merge_strategy="append",
+    plan_path=None,
+    merge_target="oldest",
+    algorithm=DEFAULT_ALGORITHM,
+    touched=None,
+):
+    # Με plan_path οι ενέργειες γράφονται σε σχέδιο αντί να εκτελεστούν.
+    # Στο touched (set) μπαίνουν τα αρχεία των ομάδων όπου έγιναν ενέργειες.
+    plan = PlanWriter(plan_path) if plan_path else None
+    try:
+        for name, files in groups:
+            with get_metrics().timer("group", count=len(files)):
+                analyze_duplicate_groups({name: files})
+                hashes = group_files_by_hash(files)
+            # Τα μέλη αρχείων συμπίεσης (--archives) μόνο αναφέρονται
+            log_archive_copies(name, hashes)
+            hashes = without_virtual(hashes)
+            if plan is not None:
+                for action in plan_group(
+                    hashes, dedup_mode, merge_strategy, merge_target, algorithm
+                ):
+                    plan.write(action)
+            else:
+                handle_duplicates(hashes, dedup_mode)
+                handle_merges(hashes, merge_strategy, merge_target)
+                if touched is not None:
+                    touched.update(
+                        f["path"] for group in hashes.values() for f in group
+                    )
+    finally:
+        if plan is not None:
+            plan.close()
+            print(f"📝 Σχέδιο με {plan.count} ενέργειες: {plan_path}")
 
 
-def process_files(base_path: str):
-    file_infos = inspect_directory_state(base_path)
-    if not file_infos:
+def process_files(
+    base_path: str,
+    cache=None,
+    jobs=1,
+    use_processes=False,
+    algorithm=DEFAULT_ALGORITHM,
+    read_size=DEFAULT_READ_SIZE,
+    snapshot_path=None,
+    dedup_mode="delete",
+    merge_strategy="append",
+    plan_path=None,
+    scan_concurrency=0,
+    per_mount=None,
+    merge_target="oldest",
+    archives=False,
+):
+    scanner = None
+    rebuild = None
+    if snapshot_path:
+        # Αυξητική σάρωση: οι αμετάβλητοι φάκελοι/αρχεία έρχονται από το snapshot
+        scanner = IncrementalScanner(DirectorySnapshot.load(snapshot_path))
+        rebuild = scanner.record_for
+
+    archive_scanner = None
+    if archives:
+        # Τα μέλη των zip/tar μπαίνουν ως εικονικές εγγραφές στις ίδιες ομάδες
+        archive_scanner = ArchiveScanner(
+            cache, algorithm=algorithm, read_size=read_size, fallback=rebuild
+        )
+        rebuild = archive_scanner.record_for
+
+    grouper = StreamingGrouper(lambda f: f["name"], rebuild)
+    if scan_concurrency and scanner is None:
+        # Ασύγχρονη σάρωση για δίκτυα αρχείων (πολλά stat σε εξέλιξη μαζί)
+        infos = scan_directory_blocking(base_path, scan_concurrency, per_mount)
+    else:
+        infos = iter_directory_state(base_path, scanner)
+    if archive_scanner is not None:
+        infos = archive_scanner.scan(infos)
+    for info in infos:
+        grouper.add(info)
+    if not grouper.seen:
         print("⚠️ Δεν βρέθηκαν αρχεία προς ανάλυση.")
-        return
+        groups = iter(())
+    else:
+        groups = hash_candidate_groups(
+            grouper,
+            cache,
+            jobs,
+            use_processes,
+            algorithm=algorithm,
+            read_size=read_size,
+        )
+    # Όσα άλλαξαν οι ενέργειες δεν πρέπει να μείνουν παλιά στο snapshot
+    touched = set() if scanner is not None else None
+    handle_name_groups(
+        groups,
+        dedup_mode,
+        merge_strategy,
+        plan_path,
+        merge_target,
+        algorithm,
+        touched,
+    )
+    if archive_scanner is not None:
+        print(
+            f"📦 Αρχεία συμπίεσης: {archive_scanner.archives} "
+            f"({archive_scanner.member_count} μέλη, {archive_scanner.expanded} "
+            "αποσυμπιέστηκαν)"
+        )
 
-    grouped_by_name = group_files_by_name(file_infos)
+    if scanner is not None:
+        save_scan_snapshot(scanner, snapshot_path, touched)
+        return scanner.delta
 
-    for name, files in grouped_by_name.items():
-        if len(files) < 2:
-            continue
 
-        hashes = group_files_by_hash(files)
-        handle_duplicates(hashes)
-        handle_merges(hashes)
+def process_indexes(
+    index_paths,
+    cache=None,
+    jobs=1,
+    use_processes=False,
+    read_size=DEFAULT_READ_SIZE,
+    dedup_mode="delete",
+    merge_strategy="append",
+    plan_path=None,
+    merge_target="oldest",
+):
+    # Reducer: οι ομάδες προκύπτουν από τα μερικά ευρετήρια των shards
+    groups = iter_index_groups(
+        index_paths, cache, jobs, use_processes, read_size=read_size
+    )
+    handle_name_groups(
+        groups,
+        dedup_mode,
+        merge_strategy,
+        plan_path,
+        merge_target,
+        index_algorithm(index_paths),
+    )
 
 
-if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        target_path = sys.argv[1]
-    else:
-        target_path = os.getcwd()
+def process_roots(
+    roots,
+    cache=None,
+    jobs=1,
+    use_processes=False,
+    algorithm=DEFAULT_ALGORITHM,
+    read_size=DEFAULT_READ_SIZE,
+    dedup_mode="delete",
+    merge_strategy="append",
+    plan_path=None,
+    merge_target="oldest",
+):
+    # Πολλές ρίζες σε ένα process: ένα ευρετήριο ανά ρίζα και ο reducer
+    with tempfile.TemporaryDirectory(prefix="pure_core_shards") as tmp:
+        index_paths = []
+        for number, root in enumerate(roots):
+            index_path = os.path.join(tmp, f"root{number}.jsonl")
+            build_shard_index(
+                [root],
+                index_path,
+                cache=cache,
+                jobs=jobs,
+                use_processes=use_processes,
+                algorithm=algorithm,
+                read_size=read_size,
+            )
+            index_paths.append(index_path)
+        process_indexes(
+            index_paths,
+            cache,
+            jobs,
+            use_processes,
+            read_size,
+            dedup_mode,
+            merge_strategy,
+            plan_path,
+            merge_target,
+        )
+
 
-    result = process_files(target_path)
+def watch_files(
+    base_path,
+    cache=None,
+    algorithm=DEFAULT_ALGORITHM,
+    read_size=DEFAULT_READ_SIZE,
+    dedup_mode="delete",
+    merge_strategy="append",
+    merge_target="oldest",
+    debounce=DEFAULT_DEBOUNCE,
+    poll_interval=DEFAULT_POLL_INTERVAL,
+    use_inotify=True,
+    socket_path=None,
+):
+    # Daemon: οι ομάδες που αλλάζουν χειρίζονται όπως στην κανονική εκτέλεση
+    def on_group(name, files):
+        handle_name_groups(
+            [(name, files)], dedup_mode, merge_strategy, None, merge_target, algorithm
+        )
+
+    daemon = WatchDaemon(
+        base_path,
+        on_group,
+        cache,
+        algorithm=algorithm,
+        read_size=read_size,
+        debounce=debounce,
+        poll_interval=poll_interval,
+        use_inotify=use_inotify,
+    )
+    server = None
+    # Το SIGTERM (π.χ. από systemd) τερματίζει ομαλά, όπως το Ctrl+C
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    try:
+        # Πρώτα το socket, ώστε μια λάθος διαδρομή να φανεί πριν τη σάρωση
+        if socket_path:
+            server = QueryServer(socket_path, daemon)
+        daemon.start()
+        mode = "inotify" if isinstance(daemon.watcher, InotifyWatcher) else "polling"
+        print(f"👀 Παρακολούθηση ({mode}): {daemon.root} - Ctrl+C για τερματισμό")
+        daemon.run(stop)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.close()
+        daemon.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="pure_core", description="Καθαριστής και Συγχωνευτής αρχείων"
+    )
+    parser.add_argument(
+        "path",
+        nargs="*",
+        help="φάκελοι σάρωσης (με πολλούς οι διπλότυποι βρίσκονται ανάμεσά τους)",
+    )
+    parser.add_argument(
+        "--cache",
+        default=default_cache_path(),
+        help="αρχείο SQLite για την cache των hash",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="χωρίς μόνιμη cache των hash"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="αριθμός παράλληλων workers για το hashing (0 = αυτόματα)",
+    )
+    parser.add_argument(
+        "--processes",
+        action="store_true",
+        help="χρήση processes αντί για threads στο hashing",
+    )
+    parser.add_argument(
+        "--hash",
+        dest="algorithm",
+        default="auto",
+        choices=["auto"] + available_algorithms(),
+        help="αλγόριθμος hash για την ομαδοποίηση (auto = ο ταχύτερος διαθέσιμος)",
+    )
+    parser.add_argument(
+        "--read-size",
+        type=int,
+        default=DEFAULT_READ_SIZE,
+        metavar="BYTES",
+        help="μέγεθος ανάγνωσης ανά κλήση κατά το hashing",
+    )
+    parser.add_argument(
+        "--io-order",
+        default="scan",
+        choices=IO_ORDERS,
+        help=(
+            "σειρά ανάγνωσης στο hashing "
+            "(inode/physical: για HDD, κατά τη θέση στον δίσκο)"
+        ),
+    )
+    parser.add_argument(
+        "--fadvise",
+        action="store_true",
+        help=(
+            "readahead στο hashing και αποδέσμευση των σελίδων από την page cache μετά"
+        ),
+    )
+    parser.add_argument(
+        "--max-read-rate",
+        type=parse_rate,
+        metavar="RATE",
+        help=(
+            "όριο ανάγνωσης σε bytes/s για hashing, συγκρίσεις και συγχωνεύσεις "
+            "(π.χ. 50M)"
+        ),
+    )
+    parser.add_argument(
+        "--max-files-rate",
+        type=float,
+        metavar="N",
+        help="όριο αρχείων/s που διαβάζονται για hashing, συγκρίσεις και συγχωνεύσεις",
+    )
+    parser.add_argument(
+        "--max-latency",
+        type=float,
+        metavar="MS",
+        help=(
+            "παύσεις ανάμεσα στις αναγνώσεις όσο ο μέσος χρόνος ανάγνωσης ξεπερνά τα MS"
+        ),
+    )
+    parser.add_argument(
+        "--nice",
+        type=int,
+        default=0,
+        metavar="N",
+        help="αυξάνει το nice της διεργασίας κατά N (χαμηλότερη προτεραιότητα CPU)",
+    )
+    parser.add_argument(
+        "--idle-io",
+        action="store_true",
+        help=(
+            "κλάση I/O idle (Linux): ο δίσκος διαβάζεται μόνο όταν δεν τον θέλει "
+            "κανείς άλλος"
+        ),
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help=(
+            "κανόνας εξαίρεσης τύπου .gitignore, σχετικός με τον (πρώτο) φάκελο σάρωσης"
+        ),
+    )
+    parser.add_argument(
+        "--exclude-from",
+        action="append",
+        default=[],
+        metavar="FILE",
+        help="αρχείο κανόνων τύπου .gitignore (σχετικοί με τον φάκελό του)",
+    )
+    parser.add_argument(
+        "--exclude-ext",
+        action="append",
+        default=[],
+        metavar="EXT",
+        help="επέκταση αρχείων που αγνοούνται (π.χ. .tmp)",
+    )
+    parser.add_argument(
+        "--min-size", type=int, metavar="BYTES", help="αγνοεί μικρότερα αρχεία"
+    )
+    parser.add_argument(
+        "--max-size", type=int, metavar="BYTES", help="αγνοεί μεγαλύτερα αρχεία"
+    )
+    parser.add_argument(
+        "--async-scan",
+        dest="scan_concurrency",
+        type=int,
+        nargs="?",
+        const=DEFAULT_CONCURRENCY,
+        default=0,
+        metavar="N",
+        help="ασύγχρονη σάρωση με N λειτουργίες σε εξέλιξη (για NFS/SMB)",
+    )
+    parser.add_argument(
+        "--per-mount",
+        type=int,
+        metavar="N",
+        help="μέγιστες ταυτόχρονες λειτουργίες ανά mount με --async-scan",
+    )
+    parser.add_argument(
+        "--archives",
+        action="store_true",
+        help="βρίσκει διπλότυπα και μέσα σε zip/tar (μόνο αναφορά για τα μέλη τους)",
+    )
+    parser.add_argument(
+        "--dedup",
+        dest="dedup_mode",
+        default="delete",
+        choices=DEDUP_MODES,
+        help="διαγραφή των διπλών ή αντικατάστασή τους με hardlink/reflink",
+    )
+    parser.add_argument(
+        "--merge-strategy",
+        default="append",
+        choices=MERGE_STRATEGIES,
+        help="append: όλο το αρχείο στο τέλος, diff: μόνο οι γραμμές που λείπουν",
+    )
+    parser.add_argument(
+        "--merge-target",
+        default="oldest",
+        choices=MERGE_TARGETS,
+        help="σε ποια έκδοση συγχωνεύονται όλες οι άλλες εκδόσεις ενός ονόματος",
+    )
+    parser.add_argument(
+        "--plan",
+        metavar="PATH",
+        help=(
+            "dry-run: γράφει τις ενέργειες σε σχέδιο (JSON lines) χωρίς να τις "
+            "εκτελέσει"
+        ),
+    )
+    parser.add_argument(
+        "--apply",
+        metavar="PLAN",
+        help="εκτελεί ένα σχέδιο του --plan (χωρίς νέα σάρωση)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        metavar="PATH",
+        help="checkpoint για συνέχιση του --apply (προεπιλογή: PLAN.done)",
+    )
+    parser.add_argument(
+        "--similar",
+        type=float,
+        nargs="?",
+        const=DEFAULT_SIMILARITY,
+        metavar="THRESHOLD",
+        help="αναφορά σχεδόν-διπλότυπων σε όλο το δέντρο (χωρίς ενέργειες)",
+    )
+    parser.add_argument(
+        "--index",
+        metavar="PATH",
+        help="worker: γράφει το μερικό ευρετήριο των φακέλων (χωρίς ενέργειες)",
+    )
+    parser.add_argument(
+        "--shard",
+        default="0/1",
+        metavar="I/N",
+        help=(
+            "με --index: μόνο τα ονόματα του shard I από N (κατά hash του "
+            "ονόματος)· κάθε shard διαβάζει όλους τους φακέλους, για να "
+            "μοιραστεί και η σάρωση δώστε διαφορετικές ρίζες"
+        ),
+    )
+    parser.add_argument(
+        "--reduce",
+        nargs="+",
+        metavar="INDEX",
+        help="συγχωνεύει μερικά ευρετήρια και χειρίζεται τους διπλότυπους τους",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="daemon: αρχική σάρωση και μετά χειρισμός των αλλαγών καθώς γίνονται",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE,
+        metavar="SECONDS",
+        help="με --watch: ησυχία πριν ελεγχθεί ένα αρχείο που άλλαξε",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        metavar="SECONDS",
+        help="με --watch: διάστημα σάρωσης όταν δεν υπάρχει inotify",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="με --watch: περιοδική σάρωση αντί για inotify",
+    )
+    parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="με --watch: Unix socket για ερωτήματα (βλ. --query)",
+    )
+    parser.add_argument(
+        "--query",
+        metavar="SOCKET",
+        help="τυπώνει τις τρέχουσες ομάδες διπλοτύπων ενός --watch daemon",
+    )
+    parser.add_argument(
+        "--snapshot",
+        metavar="PATH",
+        help="snapshot για αυξητική σάρωση (δημιουργείται αν λείπει)",
+    )
+    parser.add_argument(
+        "--delta",
+        metavar="PATH",
+        help=(
+            "αποθήκευση των αλλαγών από την προηγούμενη σάρωση σε JSON (με --snapshot)"
+        ),
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="τυπώνει χρόνους, πλήθη και bytes ανά στάδιο στο τέλος",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        metavar="PATH",
+        help="γράφει τις μετρήσεις σε αρχείο (βλ. --metrics-format)",
+    )
+    parser.add_argument(
+        "--metrics-format",
+        default="json",
+        choices=METRICS_FORMATS,
+        help="μορφή του --metrics-out (prometheus = textfile του node_exporter)",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="cProfile όλης της εκτέλεσης, με τα stats στο PATH (pstats)",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="tracemalloc: μέγιστη μνήμη και μεγαλύτερες δεσμεύσεις στις μετρήσεις",
+    )
+    args = parser.parse_args(argv)
+    args.path = args.path or [os.getcwd()]
+    try:
+        args.shard = parse_shard(args.shard)
+    except ValueError as e:
+        parser.error(str(e))
+    if len(args.path) > 1 and (args.snapshot or args.similar is not None or args.watch):
+        parser.error("τα --snapshot, --similar και --watch δέχονται έναν φάκελο")
+    if args.archives and (
+        len(args.path) > 1
+        or args.index
+        or args.reduce
+        or args.watch
+        or args.similar is not None
+    ):
+        parser.error(
+            "το --archives δέχεται έναν φάκελο, χωρίς --index, --reduce, --watch ή "
+            "--similar"
+        )
+    if args.watch and args.plan:
+        parser.error("το --watch εκτελεί τις ενέργειες και δεν γράφει σχέδιο")
+    if args.delta and not args.snapshot:
+        parser.error("το --delta απαιτεί --snapshot")
+    if args.scan_concurrency and args.snapshot:
+        # Η αυξητική σάρωση έχει δικό της scanner· το --async-scan θα αγνοούνταν
+        parser.error("το --async-scan δεν συνδυάζεται με --snapshot")
+    args.algorithm = resolve_algorithm(args.algorithm)
+    if args.jobs == 0:
+        args.jobs = default_jobs()
+    return args
+
+
+def run(args):
+    target_path = args.path[0]
+
+    if args.query:
+        print(json.dumps(query_daemon(args.query), ensure_ascii=False, indent=2))
+        return 0
+
+    lower_priority(args.nice, args.idle_io)
+    set_budget(
+        Budget(
+            args.max_read_rate,
+            args.max_files_rate,
+            args.max_latency / 1000 if args.max_latency else None,
+        )
+    )
+
+    if args.apply:
+        totals = execute_plan(
+            args.apply, args.checkpoint or f"{args.apply}.done", args.jobs
+        )
+        print("Plan result:", totals)
+        return 1 if totals["error"] else 0
+
+    set_matcher(
+        ExclusionMatcher(
+            EXCLUDED_DIR_NAMES,
+            patterns=args.exclude,
+            rule_files=args.exclude_from,
+            root=target_path,
+            extensions=args.exclude_ext,
+            min_size=args.min_size,
+            max_size=args.max_size,
+        )
+    )
+
+    set_io_schedule(IOSchedule(args.io_order, args.fadvise))
+
+    cache = None if args.no_cache else HashCache(args.cache)
+    result = None
+    try:
+        if args.similar is not None:
+            for path_a, path_b, similarity in find_near_duplicates(
+                target_path, args.similar, args.jobs, cache
+            ):
+                print(f"{similarity:.0%}  {path_a} <-> {path_b}")
+            return 0
+        if args.watch:
+            watch_files(
+                target_path,
+                cache,
+                args.algorithm,
+                args.read_size,
+                args.dedup_mode,
+                args.merge_strategy,
+                args.merge_target,
+                args.debounce,
+                args.poll_interval,
+                not args.poll,
+                args.socket,
+            )
+            return 0
+        if args.index:
+            count = build_shard_index(
+                args.path,
+                args.index,
+                args.shard,
+                cache,
+                args.jobs,
+                args.processes,
+                algorithm=args.algorithm,
+                read_size=args.read_size,
+            )
+            print(f"📇 Ευρετήριο με {count} αρχεία: {args.index}")
+            return 0
+        if args.reduce:
+            process_indexes(
+                args.reduce,
+                cache,
+                args.jobs,
+                args.processes,
+                args.read_size,
+                args.dedup_mode,
+                args.merge_strategy,
+                args.plan,
+                args.merge_target,
+            )
+            return 0
+        if len(args.path) > 1:
+            process_roots(
+                args.path,
+                cache,
+                args.jobs,
+                args.processes,
+                args.algorithm,
+                args.read_size,
+                args.dedup_mode,
+                args.merge_strategy,
+                args.plan,
+                args.merge_target,
+            )
+            return 0
+        result = process_files(
+            target_path,
+            cache,
+            args.jobs,
+            args.processes,
+            algorithm=args.algorithm,
+            read_size=args.read_size,
+            snapshot_path=args.snapshot,
+            dedup_mode=args.dedup_mode,
+            merge_strategy=args.merge_strategy,
+            plan_path=args.plan,
+            scan_concurrency=args.scan_concurrency,
+            per_mount=args.per_mount,
+            merge_target=args.merge_target,
+            archives=args.archives,
+        )
+    finally:
+        if cache is not None:
+            cache.close()
+    if result is not None:
+        print(
+            f"Αλλαγές: +{len(result.added)} -{len(result.removed)} "
+            f"~{len(result.modified)}"
+        )
+        if args.delta:
+            with open(args.delta, "w", encoding="utf-8") as f:
+                json.dump(result.as_dict(), f, ensure_ascii=False, indent=2)
     print("Process result:", result, "in", target_path)
+    return 0
+
+
+def report_metrics(metrics, args):
+    if args.stats:
+        print(metrics.summary())
+    if args.metrics_out:
+        write_metrics(metrics, args.metrics_out, args.metrics_format)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    metrics = Metrics(enabled=bool(args.stats or args.metrics_out or args.trace_memory))
+    set_metrics(metrics)
+    try:
+        with profiling(args.profile, args.trace_memory, metrics):
+            exit_code = run(args)
+    finally:
+        report_metrics(metrics, args)
+    sys.exit(exit_code)
@@ -0,0 +1,366 @@
+"""
+action_plan.py
+Σχέδιο ενεργειών (dry-run) και εκτέλεσή του.
+
+Ο planner μετατρέπει τις ομάδες του process_files σε ενέργειες
+(delete / link / merge) και τις γράφει ως JSON lines, μαζί με το μέγεθος
+και το αναμενόμενο digest κάθε αρχείου, ώστε το σχέδιο να ελεγχθεί πριν
+εφαρμοστεί. Ο executor:
+- ξαναϋπολογίζει τα digests πριν από κάθε ενέργεια και παραλείπει όσα
+  αρχεία άλλαξαν από τη στιγμή του σχεδίου (το αρχείο που κρατιέται
+  επαληθεύεται μία φορά ανά ομάδα εκτέλεσης),
+- εκτελεί παράλληλα ενέργειες που δεν μοιράζονται φάκελο (οι ενέργειες
+  ενός φακέλου τρέχουν σειριακά, με τη σειρά του σχεδίου),
+- γράφει κάθε ολοκληρωμένη ενέργεια σε checkpoint, ώστε μια διακοπείσα
+  εκτέλεση να συνεχίζει από εκεί που σταμάτησε.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Iterable, Iterator, Optional
+
+from pure_core.duplicate_detector import file_digest
+from pure_core.file_sync_manager import (
+    files_identical,
+    merge_version_chain,
+    replace_with_link,
+)
+from pure_core.hash_backends import DEFAULT_ALGORITHM, is_cryptographic
+from pure_core.parallel import bounded_map, make_executor
+
+PLAN_VERSION = 2
+
+
+# -------------------------------
+# Planner
+# -------------------------------
+
+
+def version_chain(hashes: dict, target: str = "oldest") -> list[tuple[str, dict]]:
+    """
+    Η αλυσίδα εκδόσεων μιας ομάδας ονόματος: τα αρχεία με μοναδικό
+    περιεχόμενο ταξινομημένα μία φορά κατά (ctime, mtime, διαδρομή) από
+    τις εγγραφές, χωρίς νέο stat. Το πρώτο στοιχείο είναι ο στόχος (η
+    παλιότερη ή η νεότερη έκδοση) και τα υπόλοιπα ακολουθούν με σειρά
+    απόστασης από αυτόν. Το είδος είναι "random" όταν η έκδοση έχει ίδιο
+    ctime με την προηγούμενη (η σειρά τους δεν προκύπτει από τον χρόνο),
+    αλλιώς "version".
+    """
+    files = sorted(
+        (f for group in hashes.values() if len(group) == 1 for f in group),
+        key=lambda f: (f["ctime_ns"], f["mtime_ns"], f["path"]),
+    )
+    if target == "newest":
+        files.reverse()
+    return [
+        ("random" if i and f["ctime_ns"] == files[i - 1]["ctime_ns"] else "version", f)
+        for i, f in enumerate(files)
+    ]
+
+
+def file_state(info: dict, algorithm: str = DEFAULT_ALGORITHM) -> dict:
+    """
+    Η κατάσταση ενός αρχείου όπως καταγράφεται στο σχέδιο, με τον
+    αλγόριθμο της εκτέλεσης. Το digest της εγγραφής χρησιμοποιείται μόνο
+    αν είναι του ίδιου αλγορίθμου, αλλιώς το αρχείο διαβάζεται.
+    """
+    path = info["path"]
+    digest = info.get("hash") if info.get("algorithm") == algorithm else None
+    if not digest:
+        digest = file_digest(path, algorithm).hex()
+    return {
+        "path": path,
+        "size": os.path.getsize(path),
+        "digest": digest,
+        "algorithm": algorithm,
+    }
+
+
+def plan_group(
+    hashes: dict,
+    dedup_mode: str = "delete",
+    merge_strategy: str = "append",
+    merge_target: str = "oldest",
+    algorithm: str = DEFAULT_ALGORITHM,
+) -> Iterator[dict]:
+    """Οι ενέργειες για μια ομάδα ονόματος (ίδια λογική με το process_files)."""
+    for group in hashes.values():
+        if len(group) < 2:
+            continue
+        keep = file_state(group[0], algorithm)
+        for dup in group[1:]:
+            if dedup_mode != "delete" and os.path.samefile(
+                group[0]["path"], dup["path"]
+            ):
+                continue
+            action = {"action": "delete" if dedup_mode == "delete" else "link"}
+            if dedup_mode != "delete":
+                action["mode"] = dedup_mode
+            action.update(keep=keep, path=file_state(dup, algorithm))
+            yield action
+
+    chain = version_chain(hashes, merge_target)
+    if len(chain) > 1:
+        yield {
+            "action": "merge",
+            "strategy": merge_strategy,
+            "target": file_state(chain[0][1], algorithm),
+            "sources": [
+                {"kind": kind, **file_state(f, algorithm)} for kind, f in chain[1:]
+            ],
+        }
+
+
+class PlanWriter:
+    """Γράφει ενέργειες ως JSON lines, με αύξοντα αριθμό (id)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write(json.dumps({"plan_version": PLAN_VERSION}) + "\n")
+
+    def write(self, action: dict) -> None:
+        action = {"id": self.count, **action}
+        self._file.write(json.dumps(action, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "PlanWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_plan(path: str) -> Iterator[dict]:
+    """Διαβάζει τις ενέργειες ενός σχεδίου.
+
+    Raises:
+        ValueError: Αν το αρχείο δεν είναι σχέδιο γνωστής έκδοσης.
+    """
+    with open(path, encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("plan_version") != PLAN_VERSION:
+            raise ValueError(f"Μη υποστηριζόμενο σχέδιο: {path}")
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+# -------------------------------
+# Executor
+# -------------------------------
+
+
+class Checkpoint:
+    """Αρχείο με τα ids των ενεργειών που ολοκληρώθηκαν (ένα ανά γραμμή)."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.done: set[int] = set()
+        self._lock = threading.Lock()
+        self._file = None
+        if path is None:
+            return
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.done = {int(line) for line in f if line.strip()}
+        self._file = open(path, "a", encoding="utf-8")
+
+    def record(self, action_id: int) -> None:
+        with self._lock:
+            self.done.add(action_id)
+            if self._file is not None:
+                self._file.write(f"{action_id}\n")
+                self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+def verify_state(state: dict) -> bool:
+    """Ελέγχει ότι το αρχείο έχει ακόμα το μέγεθος και το digest του σχεδίου."""
+    try:
+        if os.path.getsize(state["path"]) != state["size"]:
+            return False
+        return file_digest(state["path"], state["algorithm"]).hex() == state["digest"]
+    except OSError:
+        return False
+
+
+def _state_key(state: dict) -> tuple:
+    return (state["size"], state["digest"], state["algorithm"])
+
+
+def _verify_keep(state: dict, verified: Optional[dict]) -> bool:
+    """verify_state με μνήμη: το ίδιο keep διαβάζεται μία φορά ανά ομάδα."""
+    if verified is None:
+        return verify_state(state)
+    if verified.get(state["path"]) == _state_key(state):
+        return True
+    if not verify_state(state):
+        return False
+    verified[state["path"]] = _state_key(state)
+    return True
+
+
+def _confirm_pair(keep: dict, dup: dict, verified: Optional[dict]) -> bool:
+    """
+    Επαληθεύει keep και dup και ότι είναι διπλότυπα, με μία ανάγνωση του
+    dup: με κρυπτογραφικό αλγόριθμο αρκεί το digest του (ίσο με του keep),
+    αλλιώς η σύγκριση byte-προς-byte με το επαληθευμένο keep.
+    """
+    if _state_key(keep)[1:] != _state_key(dup)[1:]:
+        return False
+    if not _verify_keep(keep, verified):
+        return False
+    if is_cryptographic(dup["algorithm"]):
+        return verify_state(dup)
+    try:
+        return os.path.getsize(dup["path"]) == dup["size"] and files_identical(
+            keep["path"], dup["path"]
+        )
+    except OSError:
+        return False
+
+
+def execute_action(action: dict, verified: Optional[dict] = None) -> str:
+    """
+    Εκτελεί μία ενέργεια αφού επαληθεύσει τα αρχεία της. Το verified
+    (διαδρομή -> κατάσταση) κρατά τα keep που επαληθεύτηκαν ήδη στην ίδια
+    σειριακή ομάδα ενεργειών.
+
+    Returns:
+        str: "done" ή "skipped" (αν κάποιο αρχείο άλλαξε από το σχέδιο).
+    """
+    kind = action["action"]
+    if kind == "merge":
+        target, sources = action["target"], action["sources"]
+        if not all(verify_state(state) for state in (target, *sources)):
+            logging.warning(
+                f"Παράλειψη συγχώνευσης (άλλαξε από το σχέδιο): {target['path']}"
+            )
+            return "skipped"
+        merge_version_chain(
+            [("version", target)] + [(state["kind"], state) for state in sources],
+            action["strategy"],
+        )
+        if verified is not None:
+            verified.pop(target["path"], None)
+        return "done"
+
+    keep, dup = action["keep"], action["path"]
+    if not _confirm_pair(keep, dup, verified):
+        logging.warning(f"Παράλειψη διπλού (άλλαξε από το σχέδιο): {dup['path']}")
+        return "skipped"
+    if verified is not None:
+        verified.pop(dup["path"], None)
+    if kind == "delete":
+        os.remove(dup["path"])
+        logging.info(f"Διαγράφηκε διπλό αρχείο (σχέδιο): {dup['path']}")
+    else:
+        used = replace_with_link(keep["path"], dup["path"], action["mode"])
+        logging.info(
+            f"Αντικαταστάθηκε με {used} (σχέδιο): {dup['path']} -> {keep['path']}"
+        )
+    return "done"
+
+
+def _action_paths(action: dict) -> list[str]:
+    if action["action"] == "merge":
+        return [action["target"]["path"]] + [
+            state["path"] for state in action["sources"]
+        ]
+    return [action["keep"]["path"], action["path"]["path"]]
+
+
+def independent_batches(actions: Iterable[dict]) -> list[list[dict]]:
+    """
+    Χωρίζει τις ενέργειες σε ομάδες που δεν μοιράζονται φάκελο (union-find
+    στους γονικούς φακέλους). Μέσα σε κάθε ομάδα κρατιέται η σειρά του σχεδίου.
+    """
+    parent: dict[str, str] = {}
+
+    def find(d: str) -> str:
+        root = d
+        while parent.setdefault(root, root) != root:
+            root = parent[root]
+        while parent[d] != root:
+            parent[d], d = root, parent[d]
+        return root
+
+    actions = list(actions)
+    for action in actions:
+        dirs = [os.path.dirname(p) for p in _action_paths(action)]
+        first = find(dirs[0])
+        for d in dirs[1:]:
+            parent[find(d)] = first
+
+    batches: dict[str, list[dict]] = {}
+    for action in actions:
+        batches.setdefault(find(os.path.dirname(_action_paths(action)[0])), []).append(
+            action
+        )
+    return list(batches.values())
+
+
+def _run_batch(batch: list[dict], checkpoint: Checkpoint) -> dict[str, int]:
+    counts = {"done": 0, "skipped": 0, "error": 0}
+    verified: dict[str, tuple] = {}
+    for action in batch:
+        try:
+            status = execute_action(action, verified)
+        except Exception as e:
+            logging.error(f"Σφάλμα εκτέλεσης ενέργειας {action['id']}: {e}")
+            counts["error"] += 1
+            continue
+        counts[status] += 1
+        checkpoint.record(action["id"])
+    return counts
+
+
+def execute_plan(
+    plan_path: str, checkpoint_path: Optional[str] = None, jobs: int = 1
+) -> dict[str, int]:
+    """
+    Εκτελεί ένα σχέδιο. Ενέργειες που υπάρχουν ήδη στο checkpoint
+    παραλείπονται· όσες απέτυχαν με σφάλμα δεν καταγράφονται, οπότε
+    ξαναδοκιμάζονται στην επόμενη εκτέλεση.
+
+    Returns:
+        dict: Πλήθος ενεργειών ανά κατάσταση (done/skipped/error/resumed).
+    """
+    checkpoint = Checkpoint(checkpoint_path)
+    totals = {"done": 0, "skipped": 0, "error": 0, "resumed": 0}
+    pending = []
+    for action in read_plan(plan_path):
+        if action["id"] in checkpoint.done:
+            totals["resumed"] += 1
+        else:
+            pending.append(action)
+
+    executor = make_executor(jobs)
+    try:
+        for batch, counts, error in bounded_map(
+            _run_batch,
+            independent_batches(pending),
+            args=lambda batch: (batch, checkpoint),
+            executor=executor,
+        ):
+            if error is not None:
+                logging.error(f"Σφάλμα εκτέλεσης σχεδίου: {error}")
+                totals["error"] += len(batch)
+                continue
+            for status, count in counts.items():
+                totals[status] += count
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        checkpoint.close()
+    return totals
@@ -0,0 +1,387 @@
+"""
+archive_scanner.py
+Σάρωση και μέσα σε αρχεία συμπίεσης (zip, tar, tar.gz/bz2/xz).
+
+Τα μέλη διαβάζονται με zipfile/tarfile ως ροή, χωρίς εξαγωγή στον δίσκο,
+και γίνονται hash σταδιακά (πλήρες και μερικό αρχής/τέλους, όπως το
+partial_file_hash). Κάθε μέλος γίνεται εικονική εγγραφή με διαδρομή
+"αρχείο!μέλος" και archive = η διαδρομή του αρχείου, και μπαίνει στην ίδια
+ομαδοποίηση με τα κανονικά αρχεία· το staged pipeline βρίσκει τα digests
+έτοιμα και δεν ξαναδιαβάζει τίποτα.
+
+Τα μέλη κάθε αρχείου αποθηκεύονται στην HashCache με κλειδί το digest του
+αρχείου συμπίεσης (το οποίο περνά κι αυτό από την cache), οπότε ένα
+αρχείο που δεν άλλαξε δεν αποσυμπιέζεται δεύτερη φορά. Όταν το digest
+του αρχείου δεν είναι γνωστό, υπολογίζεται κατά την ίδια την
+αποσυμπίεση (_HashingReader), ώστε το αρχείο να διαβάζεται μία φορά. Μόνο
+αν στην ίδια σάρωση έχει ήδη ανοιχτεί αρχείο συμπίεσης ίδιου μεγέθους
+(πιθανό αντίγραφο) γίνεται πρώτα hash, για να βρεθούν τα μέλη χωρίς
+αποσυμπίεση. Αρχεία συμπίεσης μέσα σε αρχεία συμπίεσης δεν ανοίγονται.
+
+Οι εικονικές εγγραφές είναι μόνο για αναφορά: δεν διαγράφονται, δεν
+συνδέονται και δεν συγχωνεύονται, ούτε χρησιμοποιούνται ως "το αρχείο
+που κρατιέται" για να διαγραφεί ένα πραγματικό αρχείο.
+"""
+
+import logging
+import os
+import posixpath
+import tarfile
+import time
+import zipfile
+from datetime import datetime
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
+
+from pure_core.duplicate_detector import (
+    PARTIAL_BLOCK_SIZE,
+    _cache_key,
+    file_digest,
+    get_file_metadata,
+)
+from pure_core.file_record import FileRecord
+from pure_core.hash_backends import DEFAULT_ALGORITHM, DEFAULT_READ_SIZE, new_hasher
+from pure_core.hash_cache import HashCache
+from pure_core.io_budget import get_budget
+from pure_core.metrics import get_metrics
+
+ARCHIVE_SEPARATOR = "!"
+
+# Κενό στις αναγνώσεις του zipfile (π.χ. data descriptors) που γεμίζει
+# αμέσως με ανάγνωση· μεγαλύτερα άλματα διαβάζονται στο τέλος (finish)
+HASH_GAP_LIMIT = 64 * 1024
+
+ZIP_SUFFIXES = (".zip",)
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+
+def is_archive(path: str) -> bool:
+    """True αν το αρχείο είναι zip ή tar (κατά την επέκταση)."""
+    lower = path.lower()
+    return lower.endswith(ZIP_SUFFIXES) or lower.endswith(TAR_SUFFIXES)
+
+
+def is_virtual(info: dict) -> bool:
+    """True για εγγραφή μέλους αρχείου συμπίεσης (δεν υπάρχει στον δίσκο)."""
+    return info.get("archive") is not None
+
+
+def without_virtual(hashes: dict) -> dict:
+    """Οι ομάδες περιεχομένου χωρίς τις εικονικές εγγραφές (για τις ενέργειες)."""
+    real = {}
+    for key, files in hashes.items():
+        files = [f for f in files if not is_virtual(f)]
+        if files:
+            real[key] = files
+    return real
+
+
+def log_archive_copies(name: str, hashes: dict) -> None:
+    """Καταγράφει τα αρχεία που υπάρχουν αυτούσια και μέσα σε αρχείο συμπίεσης."""
+    for files in hashes.values():
+        virtual = [f["path"] for f in files if is_virtual(f)]
+        real = [f["path"] for f in files if not is_virtual(f)]
+        if virtual and real:
+            logging.info(
+                f"Αρχείο '{name}': {', '.join(real)} υπάρχει και σε αρχείο συμπίεσης: "
+                f"{', '.join(virtual)}"
+            )
+
+
+def hash_stream(
+    stream: BinaryIO,
+    algorithm: str = DEFAULT_ALGORITHM,
+    read_size: int = DEFAULT_READ_SIZE,
+) -> tuple[bytes, Optional[bytes], int]:
+    """
+    Hash μιας ροής σε κομμάτια read_size. Επιστρέφει (digest, μερικό
+    digest, μέγεθος)· το μερικό (πρώτο + τελευταίο μπλοκ) μόνο για ροές
+    μεγαλύτερες από δύο μπλοκ, όπως στο staged pipeline.
+    """
+    hasher = new_hasher(algorithm)
+    budget = get_budget()
+    head = bytearray()
+    tail = bytearray()
+    size = 0
+    while True:
+        start = time.perf_counter()
+        chunk = stream.read(read_size)
+        if not chunk:
+            break
+        budget.charge(len(chunk), time.perf_counter() - start)
+        hasher.update(chunk)
+        size += len(chunk)
+        if len(head) < PARTIAL_BLOCK_SIZE:
+            head += chunk[: PARTIAL_BLOCK_SIZE - len(head)]
+        if len(chunk) >= PARTIAL_BLOCK_SIZE:
+            tail = bytearray(chunk[-PARTIAL_BLOCK_SIZE:])
+        else:
+            tail += chunk
+            del tail[:-PARTIAL_BLOCK_SIZE]
+    partial = None
+    if size > 2 * PARTIAL_BLOCK_SIZE:
+        partial_hasher = new_hasher(algorithm)
+        partial_hasher.update(head)
+        partial_hasher.update(tail)
+        partial = partial_hasher.digest()
+    return hasher.digest(), partial, size
+
+
+class _HashingReader:
+    """
+    Αρχείο μόνο για ανάγνωση που κάνει hash τα bytes του με τη σειρά τους,
+    όποια σειρά αναγνώσεων κι αν κάνει ο καλών. Το tarfile ("r|*") διαβάζει
+    σειριακά· το zipfile διαβάζει πρώτα τον κατάλογο στο τέλος και μετά τα
+    μέλη από την αρχή. Ό,τι δεν διαβάστηκε σειριακά διαβάζεται στο finish.
+    """
+
+    def __init__(self, raw: BinaryIO, hasher, read_size: int = DEFAULT_READ_SIZE):  # type: ignore
+        self.raw = raw
+        self.hasher = hasher
+        self.read_size = read_size
+        self.name = getattr(raw, "name", None)
+        # Μέχρι πού έχουν περάσει τα bytes στο hasher
+        self.hashed = 0
+        self._budget = get_budget()
+
+    def read(self, size: int = -1) -> bytes:
+        position = self.raw.tell()
+        if 0 < position - self.hashed <= HASH_GAP_LIMIT:
+            self.raw.seek(self.hashed)
+            self._read(position - self.hashed)
+        return self._read(size, position)
+
+    def _read(self, size: int, position: Optional[int] = None) -> bytes:
+        if position is None:
+            position = self.raw.tell()
+        start = time.perf_counter()
+        data = self.raw.read(size)
+        self._budget.charge(len(data), time.perf_counter() - start)
+        end = position + len(data)
+        if position <= self.hashed < end:
+            self.hasher.update(memoryview(data)[self.hashed - position :])
+            self.hashed = end
+        return data
+
+    def finish(self) -> bytes:
+        """Διαβάζει ό,τι έμεινε χωρίς hash και επιστρέφει το digest όλου του αρχείου."""
+        self.raw.seek(self.hashed)
+        while self._read(self.read_size):
+            pass
+        return self.hasher.digest()
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self.raw.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self.raw.tell()
+
+    def seekable(self) -> bool:
+        return True
+
+    def readable(self) -> bool:
+        return True
+
+
+def _zip_members(fileobj: BinaryIO) -> Iterator[tuple[str, int, BinaryIO]]:
+    with zipfile.ZipFile(fileobj) as archive:
+        for member in archive.infolist():
+            if member.is_dir():
+                continue
+            try:
+                mtime_ns = int(datetime(*member.date_time).timestamp() * 1e9)
+            except ValueError:
+                mtime_ns = 0
+            with archive.open(member) as stream:
+                yield member.filename, mtime_ns, stream
+
+
+def _tar_members(fileobj: BinaryIO) -> Iterator[tuple[str, int, BinaryIO]]:
+    # "r|*": σειριακή ανάγνωση με αυτόματη αποσυμπίεση, χωρίς seek
+    with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+        for member in archive:
+            if not member.isreg():
+                continue
+            stream = archive.extractfile(member)
+            if stream is not None:
+                yield member.name, int(member.mtime * 1e9), stream
+
+
+def read_members(
+    path: str,
+    algorithm: str = DEFAULT_ALGORITHM,
+    read_size: int = DEFAULT_READ_SIZE,
+    hasher=None,  # type: ignore
+) -> list[list]:
+    """
+    Αποσυμπιέζει ως ροή το αρχείο και επιστρέφει για κάθε κανονικό μέλος
+    [όνομα, μέγεθος, mtime_ns, digest hex, μερικό digest hex ή None].
+    Αν δοθεί hasher, στο τέλος περιέχει όλο το αρχείο συμπίεσης.
+    """
+    members_of = _zip_members if path.lower().endswith(ZIP_SUFFIXES) else _tar_members
+    members = []
+    with open(path, "rb") as raw:
+        fileobj = raw if hasher is None else _HashingReader(raw, hasher, read_size)
+        for member, mtime_ns, stream in members_of(fileobj):
+            with get_metrics().timer("hash") as timer:
+                digest, partial, size = hash_stream(stream, algorithm, read_size)
+                timer.nbytes = size
+            members.append(
+                [member, size, mtime_ns, digest.hex(), partial and partial.hex()]
+            )
+        if hasher is not None:
+            fileobj.finish()
+    return members
+
+
+class ArchiveScanner:
+    """
+    Προσθέτει στη ροή εγγραφών μιας σάρωσης τα μέλη των αρχείων συμπίεσης.
+
+    Οι εικονικές εγγραφές δεν κρατιούνται: για κάθε αρχείο συμπίεσης μένει
+    μόνο το digest και η συσκευή του, και το record_for ξαναφτιάχνει ένα
+    μέλος (για το StreamingGrouper) από τη λίστα μελών της HashCache. Χωρίς
+    cache οι λίστες μελών μένουν στη μνήμη, αφού αλλιώς θα χρειαζόταν νέα
+    αποσυμπίεση. Για πραγματικές διαδρομές καλείται το fallback.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[HashCache] = None,
+        *,
+        algorithm: str = DEFAULT_ALGORITHM,
+        read_size: int = DEFAULT_READ_SIZE,
+        fallback: Optional[Callable[[str], Optional[dict]]] = None,
+    ):
+        self.cache = cache
+        self.algorithm = algorithm
+        self.read_size = read_size
+        self.fallback = fallback or (
+            lambda path: get_file_metadata(path, with_hash=False)
+        )
+        self.archives = 0
+        self.expanded = 0
+        self.member_count = 0
+        # διαδρομή αρχείου συμπίεσης -> (digest, συσκευή)
+        self._archives: dict[str, tuple[bytes, int]] = {}
+        # digest αρχείου -> μέλη (μόνο χωρίς cache)
+        self._members: dict[bytes, list[list]] = {}
+        # Τα μέλη του τελευταίου αρχείου που ζήτησε το record_for, κατά όνομα
+        self._lookup: tuple[Optional[bytes], dict[str, list]] = (None, {})
+        # Μεγέθη των αρχείων συμπίεσης που έχουν ήδη ανοιχτεί (πιθανά αντίγραφα)
+        self._sizes: set[int] = set()
+
+    def scan(self, infos: Iterable[FileRecord]) -> Iterator[FileRecord]:
+        """Δίνει κάθε εγγραφή και, μετά από κάθε αρχείο συμπίεσης, τα μέλη του."""
+        for info in infos:
+            yield info
+            if is_archive(info.path):
+                yield from self.members(info)
+
+    def members(self, info: FileRecord) -> Iterator[FileRecord]:
+        """Οι εικονικές εγγραφές των μελών ενός αρχείου συμπίεσης."""
+        try:
+            digest = self._known_digest(info)
+            if digest is None and info.size in self._sizes:
+                digest = self._archive_digest(info)
+            members = None
+            if digest is not None:
+                members = self._cached_members(digest)
+            if members is None:
+                get_budget().start_file()
+                hasher = new_hasher(self.algorithm) if digest is None else None
+                members = read_members(
+                    info.path, self.algorithm, self.read_size, hasher
+                )
+                self.expanded += 1
+                if hasher is not None:
+                    digest = self._new_digest(info, hasher.digest())
+                if self.cache is not None:
+                    self.cache.put_archive(digest, members, self.algorithm)
+            if self.cache is None:
+                self._members[digest] = members
+            self._sizes.add(info.size)
+        except Exception as e:
+            logging.warning(f"Σφάλμα ανάγνωσης αρχείου συμπίεσης: {info.path} -> {e}")
+            return
+        self.archives += 1
+        self._archives[info.path] = (digest, info.device)
+        for member in members:
+            if posixpath.basename(member[0]):
+                self.member_count += 1
+                yield self._record(info.path, info.device, *member)
+
+    def record_for(self, path: str) -> Optional[dict]:
+        """Η εγγραφή μιας διαδρομής (εικονικής ή πραγματικής)."""
+        start = path.find(ARCHIVE_SEPARATOR)
+        while start != -1:
+            known = self._archives.get(path[:start])
+            if known is not None:
+                return self._member_record(path[:start], known, path[start + 1 :])
+            start = path.find(ARCHIVE_SEPARATOR, start + 1)
+        return self.fallback(path)
+
+    def _cached_members(self, digest: bytes) -> Optional[list[list]]:
+        members = self._members.get(digest)
+        if members is None and self.cache is not None:
+            members = self.cache.get_archive(digest, self.algorithm)
+        return members
+
+    def _member_record(
+        self, archive: str, known: tuple[bytes, int], member: str
+    ) -> Optional[FileRecord]:
+        digest, device = known
+        if self._lookup[0] != digest:
+            members = self._cached_members(digest) or []
+            self._lookup = (digest, {m[0]: m for m in members})
+        found = self._lookup[1].get(member)
+        return self._record(archive, device, *found) if found is not None else None
+
+    def _known_digest(self, info: FileRecord) -> Optional[bytes]:
+        """Το digest του αρχείου συμπίεσης αν υπάρχει ήδη (εγγραφή ή cache)."""
+        if info.digest is not None and info.algorithm == self.algorithm:
+            return info.digest
+        if self.cache is None:
+            return None
+        digest = self.cache.get(*_cache_key(info), algorithm=self.algorithm)
+        return None if digest is None else self._store_digest(info, digest)
+
+    def _archive_digest(self, info: FileRecord) -> bytes:
+        """Hash του αρχείου συμπίεσης χωρίς αποσυμπίεση (μόνο για πιθανά αντίγραφα)."""
+        return self._new_digest(
+            info, file_digest(info.path, self.algorithm, self.read_size, info.size)
+        )
+
+    def _new_digest(self, info: FileRecord, digest: bytes) -> bytes:
+        if self.cache is not None:
+            self.cache.put(*_cache_key(info), digest, algorithm=self.algorithm)
+        return self._store_digest(info, digest)
+
+    def _store_digest(self, info: FileRecord, digest: bytes) -> bytes:
+        info.digest = digest
+        info.algorithm = self.algorithm
+        return digest
+
+    def _record(
+        self,
+        archive: str,
+        device: int,
+        member: str,
+        size: int,
+        mtime_ns: int,
+        digest: str,
+        partial: Optional[str],
+    ) -> FileRecord:
+        record = FileRecord(
+            posixpath.basename(member),
+            f"{archive}{ARCHIVE_SEPARATOR}{member}",
+            size,
+            mtime_ns,
+            mtime_ns,
+            device,
+            digest=bytes.fromhex(digest),
+            algorithm=self.algorithm,
+            archive=archive,
+        )
+        if partial is not None:
+            record.partial_digest = bytes.fromhex(partial)
+        return record
@@ -0,0 +1,335 @@
+"""
+async_scanner.py
+Σάρωση και hashing με asyncio, για δίκτυα αρχείων με μεγάλη καθυστέρηση
+(NFS/SMB), όπου κάθε stat/open/read είναι ένα round trip.
+
+Οι blocking κλήσεις (scandir, stat, ανάγνωση) τρέχουν σε ThreadPoolExecutor
+με concurrency threads, ώστε εκατοντάδες λειτουργίες να είναι σε εξέλιξη
+ταυτόχρονα. Κάθε mount (st_dev) έχει δικό του όριο (per_mount), ώστε ένας
+αργός server να μη γεμίζει όλο το pool, και καμία φάση δεν δημιουργεί
+περισσότερες από concurrency εργασίες μαζί (backpressure).
+
+Τα αποτελέσματα είναι ίδια με του συγχρονισμένου API: ίδιες εγγραφές, με
+την ίδια σειρά και τα ίδια digests με το inspect_directory_state.
+"""
+
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, Iterable, Optional
+
+from pure_core.directory_scanner import list_directory
+from pure_core.duplicate_detector import (
+    _cache_key,
+    _compute_digest,
+    _file_identity,
+    _known_digest,
+    _partial_kind,
+    analyze_duplicate_groups,
+    empty_digest,
+    entry_metadata,
+    group_files_by_name,
+    is_valid_directory,
+)
+from pure_core.exclusion_config import ExclusionMatcher, get_matcher
+from pure_core.file_record import FileRecord
+from pure_core.hash_backends import DEFAULT_ALGORITHM, DEFAULT_READ_SIZE
+from pure_core.hash_cache import HashCache
+
+# Λειτουργίες σε εξέλιξη συνολικά (και threads του executor)
+DEFAULT_CONCURRENCY = 128
+
+
+class MountLimiter:
+    """Εκτελεί blocking κλήσεις στον executor, με όριο ταυτόχρονων ανά mount."""
+
+    def __init__(self, executor: Executor, per_mount: int):
+        self.executor = executor
+        self.per_mount = per_mount
+        self._limits: dict[Hashable, asyncio.Semaphore] = {}
+
+    async def run(self, device: Hashable, func: Callable[..., Any], *args: Any) -> Any:
+        limit = self._limits.get(device)
+        if limit is None:
+            limit = self._limits[device] = asyncio.Semaphore(self.per_mount)
+        async with limit:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, func, *args
+            )
+
+
+async def async_bounded_map(
+    func: Callable[[Any], Awaitable[Any]], items: Iterable[Any], limit: int
+) -> AsyncIterator[tuple[Any, Any, Optional[BaseException]]]:
+    """
+    Η async εκδοχή του parallel.bounded_map: (item, αποτέλεσμα, εξαίρεση)
+    με τη σειρά ολοκλήρωσης, με το πολύ limit εργασίες σε εξέλιξη.
+    """
+    in_flight: dict[asyncio.Future, Any] = {}
+    iterator = iter(items)
+    exhausted = False
+    while True:
+        while not exhausted and len(in_flight) < limit:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                exhausted = True
+                break
+            in_flight[asyncio.ensure_future(func(item))] = item
+        if not in_flight:
+            return
+        done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            item = in_flight.pop(task)
+            error = task.exception()
+            yield item, None if error else task.result(), error
+
+
+def _list_with_device(
+    directory: str, matcher: ExclusionMatcher
+) -> tuple[int, list[str], list[os.DirEntry]]:
+    device = os.stat(directory).st_dev
+    subdirs, entries = list_directory(directory, matcher=matcher)
+    return device, subdirs, entries
+
+
+async def scan_directory_async(
+    base_path: str,
+    limiter: MountLimiter,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> list[FileRecord]:
+    """
+    Οι εγγραφές (χωρίς hash) όλων των αρχείων, όπως το iter_directory_state.
+
+    Πολλοί φάκελοι διαβάζονται ταυτόχρονα και τα stat των αρχείων μπαίνουν
+    στην ίδια ουρά με τους φακέλους· στο τέλος οι εγγραφές μπαίνουν στη σειρά της
+    συγχρονισμένης σάρωσης.
+    """
+    base_path = os.path.abspath(base_path)
+    matcher = get_matcher()
+    if not is_valid_directory(base_path) or matcher.excludes_root(base_path):
+        return []
+
+    # Φάκελος -> (υποφάκελοι, εγγραφές στη σειρά του scandir· None όσα απορρίφθηκαν)
+    listings: dict[str, tuple[list[str], list[Optional[FileRecord]]]] = {}
+    # Μία ουρά για φακέλους (entry None) και stat αρχείων, ώστε σε εξέλιξη να
+    # είναι το πολύ concurrency λειτουργίες, όσοι και οι workers
+    queue: asyncio.Queue = asyncio.Queue()
+    queue.put_nowait((base_path, None, None))
+
+    async def visit(directory: str, parent_device: Optional[int]) -> None:
+        device, subdirs, entries = await limiter.run(
+            parent_device, _list_with_device, directory, matcher
+        )
+        listings[directory] = (subdirs, [None] * len(entries))
+        for item in enumerate(entries):
+            queue.put_nowait((directory, device, item))
+        for subdir in subdirs:
+            queue.put_nowait((subdir, device, None))
+
+    async def stat(directory: str, device: int, index: int, entry: os.DirEntry) -> None:
+        try:
+            record = await limiter.run(device, entry_metadata, entry)
+        except Exception:
+            return
+        if record is not None and not matcher.excludes_size(record.size):
+            listings[directory][1][index] = record
+
+    async def worker() -> None:
+        while True:
+            directory, device, item = await queue.get()
+            try:
+                if item is None:
+                    await visit(directory, device)
+                else:
+                    await stat(directory, device, *item)
+            except Exception as e:
+                logging.warning(f"Αδυναμία ανάγνωσης φακέλου: {directory} -> {e}")
+            finally:
+                queue.task_done()
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+    try:
+        await queue.join()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    # Ίδια σειρά με το scan_files (top-down, οι υποφάκελοι με τη σειρά του scandir)
+    records: list[FileRecord] = []
+    stack = [base_path]
+    while stack:
+        subdirs, dir_records = listings.pop(stack.pop(), ([], []))
+        records.extend(r for r in dir_records if r is not None)
+        stack.extend(reversed(subdirs))
+    return records
+
+
+def _colliding(
+    records: Iterable[FileRecord], key: Callable[[FileRecord], Hashable]
+) -> list[FileRecord]:
+    """Όσα μοιράζονται κλειδί με αρχείο άλλης ταυτότητας (όπως το _collisions)."""
+    groups: dict[Hashable, list[FileRecord]] = defaultdict(list)
+    for info in records:
+        groups[key(info)].append(info)
+    return [
+        info
+        for group in groups.values()
+        if len({_file_identity(i) for i in group}) > 1
+        for info in group
+    ]
+
+
+async def _hash_stage_async(
+    infos: list[FileRecord],
+    kind_of: Callable[[FileRecord], str],
+    limiter: MountLimiter,
+    concurrency: int,
+    cache: Optional[HashCache],
+    algorithm: str,
+    read_size: int,
+) -> tuple[dict[int, bytes], set[str]]:
+    """Digests ενός σταδίου (id(info) -> digest) και οι διαδρομές που απέτυχαν."""
+    digests: dict[int, bytes] = {}
+    failed: set[str] = set()
+    # Ένα inode διαβάζεται μία φορά, οι hardlinks του παίρνουν το ίδιο digest
+    by_identity: dict[Hashable, list[FileRecord]] = defaultdict(list)
+    empty = empty_digest(algorithm)
+    for info in infos:
+        kind = kind_of(info)
+        digest = empty if info.size == 0 else _known_digest(info, kind, algorithm)
+        if digest is None and cache is not None:
+            digest = cache.get(*_cache_key(info), kind=kind, algorithm=algorithm)
+        if digest is not None:
+            digests[id(info)] = digest
+        else:
+            by_identity[_file_identity(info)].append(info)
+
+    async for linked, digest, error in async_bounded_map(
+        lambda group: limiter.run(
+            group[0].device,
+            _compute_digest,
+            kind_of(group[0]),
+            group[0].path,
+            group[0].size,
+            algorithm,
+            read_size,
+        ),
+        list(by_identity.values()),
+        concurrency,
+    ):
+        if error is not None:
+            logging.warning(f"Σφάλμα hash: {linked[0].path} -> {error}")
+            failed.update(info.path for info in linked)
+            continue
+        if cache is not None:
+            cache.put(
+                *_cache_key(linked[0]),
+                digest,
+                kind=kind_of(linked[0]),
+                algorithm=algorithm,
+            )
+        for info in linked:
+            digests[id(info)] = digest
+    return digests, failed
+
+
+async def staged_hash_async(
+    records: list[FileRecord],
+    limiter: MountLimiter,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cache: Optional[HashCache] = None,
+    *,
+    algorithm: str = DEFAULT_ALGORITHM,
+    read_size: int = DEFAULT_READ_SIZE,
+) -> list[FileRecord]:
+    """Τα στάδια του staged_hash_pipeline (μέγεθος, μερικό, πλήρες hash) με asyncio."""
+    same_size = _colliding(records, lambda i: i.size)
+    partial_digests, failed = await _hash_stage_async(
+        same_size,
+        _partial_kind,
+        limiter,
+        concurrency,
+        cache,
+        algorithm,
+        read_size,
+    )
+    partial_done = []
+    for info in same_size:
+        digest = partial_digests.get(id(info))
+        if digest is None:
+            continue
+        if _partial_kind(info) == "full":
+            info.digest = digest
+            info.algorithm = algorithm
+        else:
+            info.partial_digest = digest
+            partial_done.append(info)
+
+    full_digests, full_failed = await _hash_stage_async(
+        _colliding(partial_done, lambda i: (i.size, i.partial_digest)),
+        lambda info: "full",
+        limiter,
+        concurrency,
+        cache,
+        algorithm,
+        read_size,
+    )
+    for info in partial_done:
+        digest = full_digests.get(id(info))
+        if digest is not None:
+            info.digest = digest
+            info.algorithm = algorithm
+
+    failed |= full_failed
+    if failed:
+        return [info for info in records if info.path not in failed]
+    return records
+
+
+async def inspect_directory_state_async(
+    base_path: str,
+    cache: Optional[HashCache] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    per_mount: Optional[int] = None,
+    *,
+    algorithm: str = DEFAULT_ALGORITHM,
+    read_size: int = DEFAULT_READ_SIZE,
+) -> list[FileRecord]:
+    """
+    Async εκδοχή του inspect_directory_state: ίδιες εγγραφές και ίδια
+    ανάλυση, με έως concurrency λειτουργίες σε εξέλιξη (per_mount ανά mount).
+    """
+    with ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="pure_core_async"
+    ) as executor:
+        limiter = MountLimiter(executor, per_mount or concurrency)
+        records = await scan_directory_async(base_path, limiter, concurrency)
+        records = await staged_hash_async(
+            records,
+            limiter,
+            concurrency,
+            cache,
+            algorithm=algorithm,
+            read_size=read_size,
+        )
+    analyze_duplicate_groups(group_files_by_name(records))
+    return records
+
+
+def scan_directory_blocking(
+    base_path: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    per_mount: Optional[int] = None,
+) -> list[FileRecord]:
+    """Τρέχει το scan_directory_async από συγχρονισμένο κώδικα (π.χ. process_files)."""
+
+    async def scan() -> list[FileRecord]:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            limiter = MountLimiter(executor, per_mount or concurrency)
+            return await scan_directory_async(base_path, limiter, concurrency)
+
+    return asyncio.run(scan())
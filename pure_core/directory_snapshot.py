@@ -0,0 +1,292 @@
+"""
+directory_snapshot.py
+Στιγμιότυπο (snapshot) ενός σαρωμένου δέντρου για γρήγορες επανασαρώσεις.
+
+Το snapshot κρατά για κάθε φάκελο το mtime του και τα περιεχόμενά του, και
+για κάθε αρχείο (inode, size, mtime, digest). Στην επόμενη σάρωση:
+- ξαναδιαβάζονται (scandir) μόνο οι φάκελοι που άλλαξε το mtime τους,
+- τα αρχεία των αμετάβλητων φακέλων ελέγχονται μόνο με stat,
+- τα digests των αμετάβλητων αρχείων ξαναχρησιμοποιούνται, οπότε το
+  staged_hash_pipeline κάνει hash μόνο ό,τι άλλαξε,
+και παράγεται η διαφορά (ScanDelta) από την προηγούμενη σάρωση.
+
+Όπως στο index του git, ένα mtime που πέφτει μέσα σε ένα παράθυρο
+ακρίβειας (MTIME_GRANULARITY_NS) πριν από την έναρξη της προηγούμενης
+σάρωσης δεν είναι αξιόπιστο ("racily clean"): μια αλλαγή στον ίδιο
+χρονικό κόκκο αμέσως μετά την ανάγνωση δεν θα άλλαζε το mtime. Τέτοιοι
+φάκελοι ξαναδιαβάζονται και τέτοια αρχεία ξαναπαίρνουν hash.
+"""
+
+import gzip
+import json
+import logging
+import os
+import stat as stat_module
+import time
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from pure_core.directory_scanner import is_readable_stat, list_directory
+from pure_core.exclusion_config import get_matcher
+from pure_core.file_record import FileRecord
+
+SNAPSHOT_VERSION = 2
+
+# Η χειρότερη ακρίβεια mtime που υποστηρίζουμε (FAT: 2 δευτερόλεπτα)
+MTIME_GRANULARITY_NS = 2_000_000_000
+
+
+class ScanDelta(NamedTuple):
+    """Αλλαγές από την προηγούμενη σάρωση (λίστες διαδρομών)."""
+
+    added: list[str]
+    removed: list[str]
+    modified: list[str]
+
+    def as_dict(self) -> dict:
+        return {"added": self.added, "removed": self.removed, "modified": self.modified}
+
+
+def _hex(value: Optional[bytes]) -> Optional[str]:
+    return value.hex() if value is not None else None
+
+
+def _raw(value: Optional[str]) -> Optional[bytes]:
+    return bytes.fromhex(value) if value is not None else None
+
+
+def _identity(record: FileRecord) -> tuple[int, int, int, int]:
+    return (record.device, record.inode, record.size, record.mtime_ns)
+
+
+class DirectorySnapshot:
+    """Φάκελοι (mtime, υποφάκελοι, αρχεία) και εγγραφές αρχείων μιας σάρωσης."""
+
+    def __init__(self, root: str, exclusions: Optional[str] = None):
+        self.root = root
+        # Ταυτότητα των κανόνων εξαίρεσης με τους οποίους έγινε η σάρωση
+        self.exclusions = exclusions
+        # Πότε ξεκίνησε η σάρωση (για τον έλεγχο "racily clean")
+        self.started_ns = 0
+        self.dirs: dict[str, tuple[int, list[str], list[str]]] = {}
+        self.files: dict[str, FileRecord] = {}
+
+    @classmethod
+    def load(cls, path: str) -> Optional["DirectorySnapshot"]:
+        """Φορτώνει snapshot· None αν λείπει ή δεν διαβάζεται."""
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.warning(f"Αγνοήθηκε μη έγκυρο snapshot: {path} -> {e}")
+            return None
+        if data.get("version") != SNAPSHOT_VERSION:
+            return None
+
+        snapshot = cls(data["root"], data.get("exclusions"))
+        snapshot.started_ns = data["started_ns"]
+        snapshot.dirs = {
+            d: (m, subdirs, names) for d, (m, subdirs, names) in data["dirs"].items()
+        }
+        for path_, (size, ctime, mtime, dev, ino, digest, partial, algo) in data[
+            "files"
+        ].items():
+            record = FileRecord(
+                os.path.basename(path_),
+                path_,
+                size,
+                ctime,
+                mtime,
+                dev,
+                ino,
+                _raw(digest),
+                algo,
+            )
+            record.partial_digest = _raw(partial)
+            snapshot.files[path_] = record
+        return snapshot
+
+    def save(self, path: str) -> None:
+        """Αποθηκεύει ατομικά (προσωρινό αρχείο + os.replace)."""
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "root": self.root,
+            "exclusions": self.exclusions,
+            "started_ns": self.started_ns,
+            "dirs": self.dirs,
+            "files": {
+                p: [
+                    r.size,
+                    r.ctime_ns,
+                    r.mtime_ns,
+                    r.device,
+                    r.inode,
+                    _hex(r.digest),
+                    _hex(r.partial_digest),
+                    r.algorithm,
+                ]
+                for p, r in self.files.items()
+            },
+        }
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+
+class IncrementalScanner:
+    """
+    Σάρωση που χρησιμοποιεί το προηγούμενο snapshot.
+
+    Το scan() δίνει εγγραφές όπως το iter_directory_state· μετά την
+    ολοκλήρωσή του είναι διαθέσιμα το νέο snapshot και το delta.
+    """
+
+    def __init__(self, previous: Optional[DirectorySnapshot] = None):
+        self.previous = previous
+        self.snapshot: Optional[DirectorySnapshot] = None
+        self._matcher = get_matcher()
+        self.relisted_dirs = 0
+        self.reused_dirs = 0
+        self._added: list[str] = []
+        self._modified: list[str] = []
+        # Αρχεία που άλλαξε η ίδια εκτέλεση μετά τη σάρωση (βλ. refresh)
+        self._dropped: set[str] = set()
+
+    def scan(self, base_path: str) -> Iterator[FileRecord]:
+        base_path = os.path.abspath(base_path)
+        matcher = self._matcher = get_matcher()
+        # Με άλλη ρίζα ή άλλους κανόνες εξαίρεσης το snapshot δεν ισχύει
+        if self.previous is not None and (
+            self.previous.root != base_path
+            or self.previous.exclusions != matcher.signature
+        ):
+            self.previous = None
+        self.snapshot = DirectorySnapshot(base_path, matcher.signature)
+        self.snapshot.started_ns = time.time_ns()
+        if matcher.excludes_root(base_path):
+            return
+
+        previous_dirs = self.previous.dirs if self.previous else {}
+        stack = [base_path]
+        while stack:
+            directory = stack.pop()
+            try:
+                dir_mtime = os.stat(directory).st_mtime_ns
+            except OSError as e:
+                logging.warning(f"Αδυναμία ανάγνωσης φακέλου: {directory} -> {e}")
+                continue
+
+            known = previous_dirs.get(directory)
+            if (
+                known is not None
+                and known[0] == dir_mtime
+                and not self._racy(dir_mtime)
+            ):
+                self.reused_dirs += 1
+                subdirs, names = known[1], known[2]
+                records = self._stat_known_files(directory, names)
+            else:
+                self.relisted_dirs += 1
+                subdirs, entries = list_directory(directory, matcher=matcher)
+                names = [entry.name for entry in entries]
+                records = self._records_from_entries(entries)
+
+            for record in records:
+                yield self._compare(record)
+            self.snapshot.dirs[directory] = (dir_mtime, subdirs, names)
+            stack.extend(reversed(subdirs))
+
+    @property
+    def delta(self) -> ScanDelta:
+        """Η διαφορά από το προηγούμενο snapshot (μετά το scan())."""
+        current = self.snapshot.files if self.snapshot else {}
+        previous = self.previous.files if self.previous else {}
+        removed = [p for p in previous if p not in current and p not in self._dropped]
+        return ScanDelta(list(self._added), removed, list(self._modified))
+
+    def record_for(self, path: str) -> Optional[FileRecord]:
+        """Η εγγραφή της τρέχουσας σάρωσης για μια διαδρομή (για StreamingGrouper)."""
+        return self.snapshot.files.get(path) if self.snapshot else None
+
+    def refresh(self, paths: Iterable[str]) -> None:
+        """
+        Ενημερώνει το snapshot για αρχεία που άλλαξε η ίδια εκτέλεση μετά
+        τη σάρωση (διαγραφές, συγχωνεύσεις, links), ώστε να μην αποθηκευτούν
+        εγγραφές και digests που δεν ισχύουν πια. Το delta δεν αλλάζει.
+        """
+        if self.snapshot is None:
+            return
+        for path in paths:
+            old = self.snapshot.files.get(path)
+            if old is None:
+                continue
+            try:
+                st = os.lstat(path)
+            except FileNotFoundError:
+                st = None
+            except OSError:
+                continue
+            if st is not None and stat_module.S_ISREG(st.st_mode):
+                record = FileRecord.from_stat(path, old.name, st)
+                if _identity(record) != _identity(old):
+                    self.snapshot.files[path] = record
+                continue
+            # Διαγράφηκε ή έγινε symlink: φεύγει από το snapshot
+            del self.snapshot.files[path]
+            self._dropped.add(path)
+            known = self.snapshot.dirs.get(os.path.dirname(path))
+            if known is not None and old.name in known[2]:
+                known[2].remove(old.name)
+
+    def _racy(self, mtime_ns: int) -> bool:
+        """Αν ένα mtime είναι πολύ κοντά στην προηγούμενη σάρωση για να ισχύει."""
+        return (
+            self.previous is None
+            or mtime_ns >= self.previous.started_ns - MTIME_GRANULARITY_NS
+        )
+
+    def _stat_known_files(
+        self, directory: str, names: list[str]
+    ) -> Iterator[FileRecord]:
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if (
+                stat_module.S_ISREG(st.st_mode)
+                and is_readable_stat(st)
+                and not self._matcher.excludes_size(st.st_size)
+            ):
+                yield FileRecord.from_stat(path, name, st)
+
+    def _records_from_entries(self, entries: list[os.DirEntry]) -> Iterator[FileRecord]:
+        for entry in entries:
+            try:
+                st = entry.stat()
+            except OSError as e:
+                logging.warning(
+                    f"Σφάλμα κατά την ανάγνωση του αρχείου: {entry.path} -> {e}"
+                )
+                continue
+            if is_readable_stat(st) and not self._matcher.excludes_size(st.st_size):
+                yield FileRecord.from_stat(entry.path, entry.name, st)
+
+    def _compare(self, record: FileRecord) -> FileRecord:
+        """Μεταφέρει τα digests αν το αρχείο δεν άλλαξε και ενημερώνει το delta."""
+        old = self.previous.files.get(record.path) if self.previous else None
+        if old is None:
+            self._added.append(record.path)
+        elif _identity(old) != _identity(record):
+            self._modified.append(record.path)
+        elif not self._racy(record.mtime_ns):
+            record.digest = old.digest
+            record.partial_digest = old.partial_digest
+            record.algorithm = old.algorithm
+        self.snapshot.files[record.path] = record
+        return record
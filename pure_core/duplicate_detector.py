@@ -6,23 +6,35 @@ It focuses on identifying duplicate files in a folder.
         _type_: _description_
 """
 
-import hashlib
 import logging
+import mmap
 import os
+import threading
+import time
 from asyncio.log import logger
 from collections import defaultdict
-from datetime import datetime
-
-from pure_core.exclusion_config import is_excluded_dir, is_system_path
+from concurrent.futures import Executor
+from typing import Callable, Hashable, Iterable, Iterator, Optional
+
+from pure_core.directory_scanner import is_readable_stat, scan_files
+from pure_core.directory_snapshot import (
+    DirectorySnapshot,
+    IncrementalScanner,
+    ScanDelta,
+)
+from pure_core.exclusion_config import get_matcher
+from pure_core.file_record import FileRecord, FileTable
+from pure_core.hash_backends import DEFAULT_ALGORITHM, DEFAULT_READ_SIZE, new_hasher
+from pure_core.hash_cache import HashCache
+from pure_core.io_budget import get_budget
+from pure_core.io_scheduler import get_io_schedule
+from pure_core.metrics import get_metrics, setup_queue_logging
+from pure_core.parallel import bounded_map, make_executor
 
 # -------------------------------
 # 🔧 Ρύθμιση του logging
 # -------------------------------
-logging.basicConfig(
-    filename="file_inspector.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
+setup_queue_logging()
 
 
 # -------------------------------
@@ -30,26 +42,154 @@ logging.basicConfig(
 # -------------------------------
 
 
-def file_hash(path):  # type: ignore
-    """Υπολογίζει SHA256 hash του αρχείου."""
-    hasher = hashlib.sha256()
-    with open(path, "rb") as f:  # type: ignore
-        while chunk := f.read(8192):
-            hasher.update(chunk)
-    return hasher.hexdigest()
+# Μέγεθος μπλοκ αρχής/τέλους για το μερικό hash του staged pipeline
+PARTIAL_BLOCK_SIZE = 64 * 1024
+
+# Από αυτό το μέγεθος και πάνω τα αρχεία γίνονται hash μέσω mmap
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+# Buffer ανάγνωσης ανά thread, που ξαναχρησιμοποιείται από αρχείο σε αρχείο
+_read_buffers = threading.local()
+
+
+def file_hash(path, algorithm=DEFAULT_ALGORITHM):  # type: ignore
+    """Υπολογίζει το hash του αρχείου (hex) με τον algorithm (προεπιλογή sha256)."""
+    return file_digest(path, algorithm).hex()
+
+
+def file_digest(
+    path: str,
+    algorithm: str = DEFAULT_ALGORITHM,
+    read_size: int = DEFAULT_READ_SIZE,
+    size: Optional[int] = None,
+) -> bytes:
+    """Υπολογίζει το digest του αρχείου (raw bytes) με τον επιλεγμένο αλγόριθμο.
+
+    Δεν δημιουργούνται νέα bytes ανά ανάγνωση: τα μεγάλα αρχεία
+    (>= MMAP_THRESHOLD) περνούν από mmap και τα υπόλοιπα διαβάζονται με
+    readinto σε buffer που ξαναχρησιμοποιείται. Αν το size είναι ήδη
+    γνωστό (π.χ. από το scan) γλιτώνουμε το fstat.
+    """
+    hasher = new_hasher(algorithm)
+    get_budget().start_file()
+    with open(path, "rb", buffering=0) as f:  # type: ignore
+        if size is None:
+            size = os.fstat(f.fileno()).st_size
+        with get_io_schedule().read_hints(f.fileno(), size):
+            if size < MMAP_THRESHOLD or not _update_from_mmap(hasher, f, read_size):
+                _update_from_readinto(hasher, f, read_size)
+    return hasher.digest()
+
+
+def _read_buffer(read_size: int) -> memoryview:
+    """Ο buffer ανάγνωσης του τρέχοντος thread, με μέγεθος read_size."""
+    view = getattr(_read_buffers, "view", None)
+    if view is None or len(view) != read_size:
+        view = _read_buffers.view = memoryview(bytearray(read_size))
+    return view
+
+
+def _update_from_readinto(hasher, f, read_size: int) -> None:  # type: ignore
+    view = _read_buffer(read_size)
+    budget = get_budget()
+    while True:
+        start = time.perf_counter()
+        n = f.readinto(view)
+        if not n:
+            break
+        budget.charge(n, time.perf_counter() - start)
+        hasher.update(view[:n])
+
+
+def _update_from_mmap(hasher, f, read_size: int) -> bool:  # type: ignore
+    """Hash μέσω mmap σε κομμάτια read_size. False αν το mmap δεν υποστηρίζεται."""
+    try:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return False
+    budget = get_budget()
+    with mapped:
+        view = memoryview(mapped)
+        try:
+            for offset in range(0, len(view), read_size):
+                # Ο χρόνος περιλαμβάνει τα page faults, δηλαδή την ανάγνωση
+                start = time.perf_counter()
+                with view[offset : offset + read_size] as chunk:
+                    hasher.update(chunk)
+                    nbytes = len(chunk)
+                budget.charge(nbytes, time.perf_counter() - start)
+        finally:
+            view.release()
+    return True
+
+
+def empty_digest(algorithm: str = DEFAULT_ALGORITHM) -> bytes:
+    """Digest ενός κενού αρχείου (χωρίς ανάγνωση)."""
+    return new_hasher(algorithm).digest()
 
 
-def get_file_metadata(path):  # type: ignore
-    """Επιστρέφει όνομα, διαδρομή, hash, ημερομηνία δημιουργίας/τροποποίησης."""
+def partial_file_hash(
+    path: str,
+    size: int,
+    algorithm: str = DEFAULT_ALGORITHM,
+    read_size: int = DEFAULT_READ_SIZE,
+) -> tuple[bytes, bool]:
+    """Υπολογίζει hash μόνο πάνω στο πρώτο και στο τελευταίο μπλοκ του αρχείου.
+
+    Επιστρέφει (digest, complete). Όταν το αρχείο χωράει σε δύο μπλοκ
+    διαβάζεται ολόκληρο, οπότε το digest είναι ήδη το πλήρες hash.
+    """
+    if size <= 2 * PARTIAL_BLOCK_SIZE:
+        return file_digest(path, algorithm, read_size, size), True
+    hasher = new_hasher(algorithm)
+    budget = get_budget()
+    budget.start_file()
+    with open(path, "rb") as f:
+        with get_io_schedule().read_hints(f.fileno(), size, sequential=False):
+            start = time.perf_counter()
+            hasher.update(f.read(PARTIAL_BLOCK_SIZE))
+            f.seek(size - PARTIAL_BLOCK_SIZE)
+            hasher.update(f.read(PARTIAL_BLOCK_SIZE))
+    budget.charge(2 * PARTIAL_BLOCK_SIZE, time.perf_counter() - start)
+    return hasher.digest(), False
+
+
+def cached_hash(
+    info: FileRecord,
+    compute: Callable[[], bytes],
+    cache: Optional[HashCache] = None,
+    kind: str = "full",
+    algorithm: str = DEFAULT_ALGORITHM,
+) -> bytes:
+    """Το hash από την cache αν ισχύει, αλλιώς το υπολογίζει και το αποθηκεύει."""
+    if cache is None:
+        return compute()
+    digest = cache.get(*_cache_key(info), kind=kind, algorithm=algorithm)
+    if digest is None:
+        digest = compute()
+        cache.put(*_cache_key(info), digest, kind=kind, algorithm=algorithm)
+    return digest
+
+
+def get_file_metadata(path, with_hash=True, cache=None, algorithm=DEFAULT_ALGORITHM):  # type: ignore
+    """Επιστρέφει όνομα, διαδρομή, μέγεθος, hash, ημερομηνία δημιουργίας/τροποποίησης.
+
+    Με with_hash=False γίνεται μόνο stat και το hash μένει None, ώστε να
+    το συμπληρώσει αργότερα το staged_hash_pipeline. Αν δοθεί cache
+    (HashCache), το hash διαβάζεται πρώτα από εκεί. Επιστρέφει FileRecord,
+    που δέχεται και πρόσβαση τύπου λεξικού.
+    """
     try:
         stat = os.stat(path)  # type: ignore
-        return {
-            "name": os.path.basename(path),  # type: ignore
-            "path": path,
-            "hash": file_hash(path),  # type: ignore
-            "created": datetime.fromtimestamp(stat.st_ctime),
-            "modified": datetime.fromtimestamp(stat.st_mtime),
-        }
+        if not with_hash and not is_readable_stat(stat):
+            raise PermissionError("δεν υπάρχει δικαίωμα ανάγνωσης")
+        info = metadata_from_stat(path, os.path.basename(path), stat)  # type: ignore
+        if with_hash:
+            info.digest = cached_hash(
+                info, lambda: file_digest(path, algorithm), cache, algorithm=algorithm
+            )
+            info.algorithm = algorithm
+        return info
     except Exception as e:
         logging.warning(
             f"Σφάλμα κατά\
@@ -58,26 +198,241 @@ def get_file_metadata(path):  # type: ignore
         return None
 
 
-def inspect_directory_state(base_path: str) -> list[dict]:  # type: ignore
+def metadata_from_stat(path: str, name: str, stat: os.stat_result) -> FileRecord:
+    """Φτιάχνει την εγγραφή ενός αρχείου από ήδη διαθέσιμο stat (χωρίς hash)."""
+    return FileRecord.from_stat(path, name, stat)
+
+
+def entry_metadata(entry: os.DirEntry) -> Optional[FileRecord]:
+    """Εγγραφή από DirEntry του scan_files, με το stat που κρατά το entry."""
+    try:
+        with get_metrics().timer("stat"):
+            stat = entry.stat()
+        if not is_readable_stat(stat):
+            raise PermissionError("δεν υπάρχει δικαίωμα ανάγνωσης")
+    except OSError as e:
+        logging.warning(f"Σφάλμα κατά την ανάγνωση του αρχείου: {entry.path} -> {e}")
+        return None
+    return metadata_from_stat(entry.path, entry.name, stat)
+
+
+def inspect_directory_state(
+    base_path: str,
+    cache: Optional[HashCache] = None,
+    jobs: int = 1,
+    use_processes: bool = False,
+    *,
+    algorithm: str = DEFAULT_ALGORITHM,
+    read_size: int = DEFAULT_READ_SIZE,
+    snapshot_path: Optional[str] = None,
+) -> list[dict]:  # type: ignore
     """
     Σαρώνει φάκελο και εντοπίζει αρχεία με:
     - ίδιο όνομα
     - ίδιο ή διαφορετικό περιεχόμενο (ως εκδόσεις)
     - ίδια ημερομηνία δημιουργίας
-    """
-    base_path = os.path.abspath(base_path)
-
-    if not is_valid_directory(base_path):  # pyright: ignore[reportCallIssue, reportArgumentType]
-        return []
 
-    file_info_list = collect_file_info(base_path)  # pyright: ignore[reportCallIssue, reportArgumentType]
-    log_skipped_files(base_path)  # pyright: ignore[reportCallIssue, reportArgumentType]
+    Με cache (HashCache) τα αμετάβλητα αρχεία δεν ξαναδιαβάζονται και με
+    jobs > 1 το hashing γίνεται παράλληλα (βλ. collect_file_info). Ο
+    algorithm ορίζει το hash ομαδοποίησης (βλ. hash_backends). Με
+    snapshot_path η σάρωση είναι αυξητική (βλ. rescan_directory).
+    """
+    if snapshot_path is not None:
+        file_info_list, _ = rescan_directory(
+            base_path,
+            snapshot_path,
+            cache,
+            jobs,
+            use_processes,
+            algorithm=algorithm,
+            read_size=read_size,
+        )
+    else:
+        file_info_list = staged_hash_pipeline(
+            iter_directory_state(base_path),
+            cache,
+            jobs,
+            use_processes,
+            algorithm=algorithm,
+            read_size=read_size,
+        )
     name_map = group_files_by_name(file_info_list)
     analyze_duplicate_groups(name_map)
 
     return file_info_list
 
 
+def rescan_directory(
+    base_path: str,
+    snapshot_path: str,
+    cache: Optional[HashCache] = None,
+    jobs: int = 1,
+    use_processes: bool = False,
+    *,
+    algorithm: str = DEFAULT_ALGORITHM,
+    read_size: int = DEFAULT_READ_SIZE,
+) -> tuple[list[FileRecord], ScanDelta]:
+    """
+    Αυξητική σάρωση με βάση το snapshot στο snapshot_path.
+
+    Ξαναδιαβάζονται μόνο οι φάκελοι που άλλαξαν και γίνεται hash μόνο
+    στα αρχεία που άλλαξαν· στο τέλος το snapshot ενημερώνεται. Επιστρέφει
+    τις εγγραφές και το delta (προστέθηκαν/αφαιρέθηκαν/τροποποιήθηκαν).
+    """
+    scanner = IncrementalScanner(DirectorySnapshot.load(snapshot_path))
+    file_info_list = staged_hash_pipeline(
+        iter_directory_state(base_path, scanner),
+        cache,
+        jobs,
+        use_processes,
+        algorithm=algorithm,
+        read_size=read_size,
+    )
+    save_scan_snapshot(scanner, snapshot_path)
+    return file_info_list, scanner.delta
+
+
+def save_scan_snapshot(
+    scanner: IncrementalScanner,
+    snapshot_path: str,
+    touched: Optional[Iterable[str]] = None,
+) -> None:
+    """
+    Αποθηκεύει το νέο snapshot και καταγράφει το delta. Τα touched είναι
+    αρχεία που μπορεί να άλλαξαν οι ενέργειες της ίδιας εκτέλεσης· ξανακοιτάζονται
+    πριν την αποθήκευση.
+    """
+    if scanner.snapshot is None:
+        return
+    if touched:
+        scanner.refresh(touched)
+    scanner.snapshot.save(snapshot_path)
+    delta = scanner.delta
+    logging.info(
+        f"Αυξητική σάρωση: +{len(delta.added)} -{len(delta.removed)} "
+        f"~{len(delta.modified)} αρχεία, {scanner.relisted_dirs} φάκελοι "
+        f"ξαναδιαβάστηκαν, {scanner.reused_dirs} από το snapshot"
+    )
+
+
+def iter_directory_state(
+    base_path: str, scanner: Optional[IncrementalScanner] = None
+) -> Iterator[FileRecord]:
+    """
+    Streaming εκδοχή της σάρωσης: δίνει την εγγραφή κάθε αρχείου (χωρίς
+    hash) τη στιγμή που βρίσκεται, χωρίς να κρατά λίστα στη μνήμη.
+
+    Με scanner (IncrementalScanner) η σάρωση βασίζεται στο snapshot του και
+    οι αμετάβλητες εγγραφές έχουν ήδη τα digests τους.
+    """
+    base_path = os.path.abspath(base_path)
+
+    if not is_valid_directory(base_path):
+        return
+
+    if scanner is not None:
+        yield from scanner.scan(base_path)
+    else:
+        yield from _iter_file_metadata(base_path)
+
+
+def iter_name_groups(
+    base_path: str,
+    cache: Optional[HashCache] = None,
+    jobs: int = 1,
+    use_processes: bool = False,
+    *,
+    algorithm: str = DEFAULT_ALGORITHM,
+    read_size: int = DEFAULT_READ_SIZE,
+) -> Iterator[tuple[str, list[dict]]]:
+    """
+    Δίνει (όνομα, αρχεία) για κάθε όνομα που εμφανίζεται πάνω από μία φορά,
+    με τα hash συμπληρωμένα από το staged_hash_pipeline.
+
+    Η μνήμη κλιμακώνεται με τα υποψήφια διπλότυπα και όχι με το μέγεθος
+    του δέντρου (βλ. StreamingGrouper).
+    """
+    grouper = StreamingGrouper(lambda info: info["name"])
+    for info in iter_directory_state(base_path):
+        grouper.add(info)
+    yield from hash_candidate_groups(
+        grouper, cache, jobs, use_processes, algorithm=algorithm, read_size=read_size
+    )
+
+
+def hash_candidate_groups(
+    grouper: "StreamingGrouper",
+    cache: Optional[HashCache] = None,
+    jobs: int = 1,
+    use_processes: bool = False,
+    *,
+    algorithm: str = DEFAULT_ALGORITHM,
+    read_size: int = DEFAULT_READ_SIZE,
+) -> Iterator[tuple[str, list[dict]]]:
+    """Κάνει hash μόνο τις ομάδες του grouper και τις δίνει ξανά ομαδοποιημένες.
+
+    Οι συμπτώσεις μεγέθους/hash μετρούν μόνο μέσα στην ίδια ομάδα.
+    """
+    candidates = (info for files in grouper.groups().values() for info in files)
+    hashed = staged_hash_pipeline(
+        candidates,
+        cache,
+        jobs,
+        use_processes,
+        scope=grouper.key,
+        algorithm=algorithm,
+        read_size=read_size,
+    )
+    regrouped: dict[Hashable, list[dict]] = defaultdict(list)
+    for info in hashed:
+        regrouped[grouper.key(info)].append(info)
+    for key, files in regrouped.items():
+        if len(files) > 1:
+            yield key, files
+
+
+class StreamingGrouper:
+    """
+    Σταδιακή ομαδοποίηση εγγραφών κατά κλειδί (π.χ. όνομα).
+
+    Για κλειδιά που έχουν εμφανιστεί μία φορά κρατά μόνο τη διαδρομή· η
+    πλήρης εγγραφή ξαναφτιάχνεται (ένα stat) μόνο αν βρεθεί δεύτερο αρχείο.
+    Έτσι η μνήμη μένει ανάλογη των ομάδων που μπορούν να συμπέσουν.
+    """
+
+    def __init__(
+        self,
+        key: Callable[[dict], Hashable],
+        rebuild: Optional[Callable[[str], Optional[dict]]] = None,
+    ):
+        self.key = key
+        self.rebuild = rebuild or (
+            lambda path: get_file_metadata(path, with_hash=False)
+        )
+        self.seen = 0
+        self._singletons: dict[Hashable, str] = {}
+        self._groups: dict[Hashable, list[dict]] = {}
+
+    def add(self, info: dict) -> None:
+        """Προσθέτει μια εγγραφή στην ομάδα του κλειδιού της."""
+        self.seen += 1
+        k = self.key(info)
+        group = self._groups.get(k)
+        if group is not None:
+            group.append(info)
+            return
+        first_path = self._singletons.pop(k, None)
+        if first_path is None:
+            self._singletons[k] = info["path"]
+            return
+        first = self.rebuild(first_path)
+        self._groups[k] = [first, info] if first else [info]
+
+    def groups(self) -> dict[Hashable, list[dict]]:
+        """Οι ομάδες με τουλάχιστον δύο αρχεία."""
+        return {k: files for k, files in self._groups.items() if len(files) > 1}
+
+
 def is_valid_directory(path: str) -> bool:
     """Επιστρέφει True αν η διαδρομή είναι\
     έγκυρος φάκελος, αλλιώς κάνει log και False."""
@@ -87,7 +442,15 @@ def is_valid_directory(path: str) -> bool:
     return True
 
 
-def collect_file_info(base_path: str) -> list[dict]:
+def collect_file_info(
+    base_path: str,
+    cache: Optional[HashCache] = None,
+    jobs: int = 1,
+    use_processes: bool = False,
+    *,
+    algorithm: str = DEFAULT_ALGORITHM,
+    read_size: int = DEFAULT_READ_SIZE,
+) -> list[dict]:
     """
     Επιστρέφει λίστα μεταδεδομένων για κάθε αρχείο\
     μέσα σε έναν φάκελο και τους υποφακέλους του.
@@ -101,24 +464,301 @@ def collect_file_info(base_path: str) -> list[dict]:
     Επιστρέφει:
     - Λίστα από λεξικά με πληροφορίες για κάθε έγκυρο αρχείο\
     (π.χ. όνομα, διαδρομή, μέγεθος, hash κ.ά.)
+
+    Η σάρωση γίνεται σε ένα πέρασμα (scan_files), που καταγράφει και τα
+    στοιχεία που παραλείφθηκαν. Με jobs > 1 το hashing γίνεται σε pool
+    (threads ή processes) και ξεκινά όσο η σάρωση είναι ακόμα σε εξέλιξη.
+    """
+    return staged_hash_pipeline(
+        _iter_file_metadata(base_path),
+        cache,
+        jobs,
+        use_processes,
+        algorithm=algorithm,
+        read_size=read_size,
+    )
+
+
+def collect_file_table(base_path: str) -> FileTable:
+    """
+    Μαζική σάρωση (μόνο stat) σε columnar FileTable αντί για λίστα εγγραφών.
+    Χρήσιμη για πολύ μεγάλα δέντρα, όπου χρειάζονται μόνο μέγεθος, χρόνοι
+    και inode για κάθε αρχείο.
+    """
+    table = FileTable()
+    for info in iter_directory_state(base_path):
+        table.append(info)
+    return table
+
+
+def _iter_file_metadata(base_path: str) -> Iterator[FileRecord]:
+    """Εγγραφές (χωρίς hash) για κάθε αρχείο που δίνει το scan_files."""
+    matcher = get_matcher()
+    for entry in scan_files(base_path, matcher=matcher):
+        metadata = entry_metadata(entry)
+        if metadata and not matcher.excludes_size(metadata.size):
+            yield metadata
+
+
+def staged_hash_pipeline(
+    file_infos: Iterable[FileRecord],
+    cache: Optional[HashCache] = None,
+    jobs: int = 1,
+    use_processes: bool = False,
+    scope: Optional[Callable[[FileRecord], Hashable]] = None,
+    algorithm: str = DEFAULT_ALGORITHM,
+    read_size: int = DEFAULT_READ_SIZE,
+) -> list[FileRecord]:
+    """
+    Συμπληρώνει το hash μόνο όπου χρειάζεται, σε τρία στάδια:
+
+    1. Ομαδοποίηση κατά μέγεθος - αρχεία με μοναδικό μέγεθος δεν
+       μπορούν να είναι διπλότυπα και δεν διαβάζονται καθόλου.
+    2. Μερικό hash (αρχή/τέλος) για τα αρχεία που μοιράζονται μέγεθος.
+    3. Πλήρες hash μόνο για όσα συμπίπτουν ακόμα μετά το στάδιο 2.
+
+    Τα στάδια είναι αλυσίδα generators: ένα αρχείο περνά στο επόμενο στάδιο
+    μόλις βρεθεί δεύτερο αρχείο με το ίδιο κλειδί, οπότε με jobs > 1 όλα
+    επικαλύπτονται με την ανακάλυψη των αρχείων.
+
+    Τα αρχεία που δεν χρειάστηκαν πλήρες hash κρατούν hash None και
+    ξεχωρίζουν μέσω του version_key. Hardlinks του ίδιου inode μετρούν ως
+    ένα αρχείο: δεν διαβάζονται αν δεν υπάρχει άλλο υποψήφιο, και
+    διαβάζονται μία φορά αν υπάρχει. Αρχεία που απέτυχαν στην ανάγνωση
+    αφαιρούνται από τη λίστα, όπως και στο get_file_metadata. Τα μερικά
+    και πλήρη hash περνούν από την cache, αν δοθεί. Με scope (π.χ. το
+    όνομα) οι συμπτώσεις μετρούν μόνο μέσα στην ίδια ομάδα. Ο algorithm
+    μπορεί να είναι και μη κρυπτογραφικός (π.χ. xxh3_128), αφού οι
+    διαγραφές επιβεβαιώνουν το περιεχόμενο ξεχωριστά.
+
+    Με ενεργό IOSchedule (io_scheduler) οι υποψήφιοι κάθε σταδίου
+    μαζεύονται και διαβάζονται κατά τη φυσική τους θέση στον δίσκο.
+    """
+    if scope is None:
+        scope = _global_scope
+    schedule = get_io_schedule()
+
+    records: list[FileRecord] = []
+    failed: set[str] = set()
+
+    def discovered() -> Iterator[FileRecord]:
+        for info in file_infos:
+            records.append(info)
+            yield info
+
+    def partial_done() -> Iterator[FileRecord]:
+        for info, digest, error in _hash_stage(
+            schedule.arrange(
+                _collisions(discovered(), lambda i: (scope(i), i.size), _file_identity)
+            ),
+            _partial_kind,
+            cache,
+            executor,
+            algorithm,
+            read_size,
+        ):
+            if error is not None:
+                logging.warning(f"Σφάλμα μερικού hash: {info.path} -> {error}")
+                failed.add(info.path)
+            elif _partial_kind(info) == "full":
+                info.digest = digest
+                info.algorithm = algorithm
+            else:
+                info.partial_digest = digest
+                yield info
+
+    executor = make_executor(jobs, use_processes)
+    try:
+        for info, digest, error in _hash_stage(
+            schedule.arrange(
+                _collisions(
+                    partial_done(),
+                    lambda i: (scope(i), i.size, i.partial_digest),
+                    _file_identity,
+                )
+            ),
+            lambda info: "full",
+            cache,
+            executor,
+            algorithm,
+            read_size,
+        ):
+            if error is not None:
+                logging.warning(f"Σφάλμα πλήρους hash: {info.path} -> {error}")
+                failed.add(info.path)
+            else:
+                info.digest = digest
+                info.algorithm = algorithm
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if failed:
+        return [info for info in records if info.path not in failed]
+    return records
+
+
+def _global_scope(info: FileRecord) -> None:
+    return None
+
+
+def _file_identity(info: FileRecord) -> Hashable:
+    """(device, inode) του αρχείου· η διαδρομή όταν το inode είναι άγνωστο."""
+    return (info.device, info.inode) if info.inode else info.path
+
+
+def _collisions(
+    infos: Iterable[FileRecord],
+    key: Callable[[FileRecord], Hashable],
+    identity: Optional[Callable[[FileRecord], Hashable]] = None,
+) -> Iterator[FileRecord]:
+    """
+    Δίνει κάθε αρχείο μόλις βρεθεί δεύτερο με το ίδιο κλειδί (και όλα τα επόμενα).
+
+    Με identity, αρχεία με την ίδια ταυτότητα με το πρώτο (π.χ. hardlinks)
+    κρατιούνται μαζί του και δεν αρκούν για σύμπτωση.
+    """
+    held: dict[Hashable, Optional[tuple[Hashable, list[FileRecord]]]] = {}
+    for info in infos:
+        k = key(info)
+        if k not in held:
+            held[k] = (identity(info) if identity else None, [info])
+            continue
+        entry = held[k]
+        if entry is None:
+            yield info
+            continue
+        first_identity, waiting = entry
+        if identity is not None and identity(info) == first_identity:
+            waiting.append(info)
+            continue
+        held[k] = None
+        yield from waiting
+        yield info
+
+
+def _partial_kind(info: FileRecord) -> str:
+    """Τα αρχεία που χωρούν σε δύο μπλοκ διαβάζονται ολόκληρα στο στάδιο 2."""
+    return "full" if info.size <= 2 * PARTIAL_BLOCK_SIZE else "partial"
+
+
+def _compute_digest(
+    kind: str, path: str, size: int, algorithm: str, read_size: int
+) -> bytes:
+    """Υπολογίζει το digest ενός σταδίου (module-level ώστε να περνά σε processes)."""
+    if kind == "partial":
+        with get_metrics().timer("hash", nbytes=min(size, 2 * PARTIAL_BLOCK_SIZE)):
+            return partial_file_hash(path, size, algorithm, read_size)[0]
+    with get_metrics().timer("hash", nbytes=size):
+        return file_digest(path, algorithm, read_size, size)
+
+
+def _hash_stage(
+    infos: Iterable[FileRecord],
+    kind_of: Callable[[FileRecord], str],
+    cache: Optional[HashCache],
+    executor: Optional[Executor],
+    algorithm: str = DEFAULT_ALGORITHM,
+    read_size: int = DEFAULT_READ_SIZE,
+) -> Iterator[tuple[FileRecord, Optional[bytes], Optional[BaseException]]]:
+    """
+    Ένα στάδιο hashing: κοιτά πρώτα την cache και στέλνει στο pool μόνο όσα
+    λείπουν. Κάθε inode διαβάζεται μία φορά· οι hardlinks του παίρνουν το
+    ίδιο αποτέλεσμα. Επιστρέφει (info, digest, error) καθώς ολοκληρώνονται.
     """
-    return [
-        metadata
-        for root, _, files in os.walk(base_path)
-        if not is_excluded_dir(root) and not is_system_path(root)
-        for file in files
-        if os.path.isfile(full_path := os.path.join(root, file))
-        if (metadata := get_file_metadata(full_path))  # pyright: ignore[reportArgumentType] # pyright: ignore[reportCallIssue] # pyright: ignore[reportCallIssue] # pyright: ignore[reportCallIssue] # pyright: ignore[reportCallIssue] # pyright: ignore[reportCallIssue] # pyright: ignore[reportCallIssue] # pyright: ignore[reportCallIssue] # pyright: ignore[reportCallIssue] # pyright: ignore[reportCallIssue] # pyright: ignore[reportCallIssue] # pyright: ignore[reportCallIssue] # pyright: ignore[reportCallIssue] # type: ignore
-    ]
+    resolved: list[tuple[FileRecord, bytes]] = []
+    empty = empty_digest(algorithm)
+    # inode -> hardlinks που περιμένουν το digest του πρώτου (None = έτοιμο)
+    linked: dict[Hashable, Optional[list[FileRecord]]] = {}
+    linked_digests: dict[Hashable, bytes] = {}
+
+    def misses() -> Iterator[FileRecord]:
+        for info in infos:
+            if info.size == 0:
+                resolved.append((info, empty))
+                continue
+            # Digest που ήδη υπάρχει στην εγγραφή (π.χ. από snapshot)
+            digest = _known_digest(info, kind_of(info), algorithm)
+            if digest is None and cache is not None:
+                digest = cache.get(
+                    *_cache_key(info), kind=kind_of(info), algorithm=algorithm
+                )
+            if digest is not None:
+                resolved.append((info, digest))
+                continue
+            identity = _file_identity(info)
+            if identity in linked_digests:
+                resolved.append((info, linked_digests[identity]))
+            elif identity in linked:
+                linked[identity].append(info)
+            else:
+                linked[identity] = []
+                yield info
+
+    def drain() -> Iterator[tuple[FileRecord, bytes, None]]:
+        while resolved:
+            info, digest = resolved.pop()
+            yield info, digest, None
+
+    for info, digest, error in bounded_map(
+        _compute_digest,
+        misses(),
+        args=lambda i: (kind_of(i), i.path, i.size, algorithm, read_size),
+        executor=executor,
+    ):
+        yield from drain()
+        if error is None and cache is not None:
+            cache.put(
+                *_cache_key(info), digest, kind=kind_of(info), algorithm=algorithm
+            )
+        identity = _file_identity(info)
+        followers = linked.pop(identity, None) or []
+        if error is None:
+            linked_digests[identity] = digest
+        yield info, digest, error
+        for follower in followers:
+            yield follower, digest, error
+    yield from drain()
+
+
+def _known_digest(info: FileRecord, kind: str, algorithm: str) -> Optional[bytes]:
+    if info.algorithm != algorithm:
+        return None
+    return info.partial_digest if kind == "partial" else info.digest
+
+
+def _cache_key(info: FileRecord) -> tuple[int, int, int, int]:
+    return info.device, info.inode, info.size, info.mtime_ns
+
+
+def version_key(info: dict) -> Hashable:
+    """Κλειδί ομαδοποίησης περιεχομένου για εγγραφή του staged_hash_pipeline.
+
+    Αν δεν υπάρχει πλήρες hash, το αρχείο είναι μοναδικό στο μέγεθος
+    (ή στο μερικό hash του), οπότε αυτά αρκούν ως κλειδί. Για FileRecord
+    το κλειδί είναι το raw digest, χωρίς μετατροπή σε hex.
+    """
+    if isinstance(info, FileRecord):
+        if info.digest is not None:
+            return info.digest
+        if info.partial_digest is not None:
+            return ("partial", info.size, info.partial_digest)
+        return ("size", info.size)
+    if info.get("hash"):
+        return info["hash"]
+    if info.get("partial_hash"):
+        return f"partial:{info['size']}:{info['partial_hash']}"
+    return f"size:{info['size']}"
 
 
 def log_skipped_files(base_path: str) -> None:
-    """Κάνει logging για κάθε στοιχείο που δεν είναι αρχείο."""
-    for root, _, files in os.walk(base_path):
-        for file in files:
-            full_path = os.path.join(root, file)
-            if not os.path.isfile(full_path):
-                logging.warning(f"Παραλείφθηκε (δεν είναι αρχείο): {full_path}")
+    """Κάνει logging για κάθε στοιχείο που δεν είναι αρχείο.
+
+    Το collect_file_info το κάνει ήδη στο ίδιο πέρασμα· η συνάρτηση μένει
+    για όποιον θέλει μόνο την αναφορά.
+    """
+    for _ in scan_files(base_path):
+        pass
 
 
 def group_files_by_name(file_info_list: list[dict]) -> dict[str, list[dict]]:
@@ -152,21 +792,35 @@ def log_identical_group(name: str) -> None:
     logger.info(f"Αρχείο '{name}' έχει ίδιο περιεχόμενο σε όλες τις τοποθεσίες.")
 
 
-def log_versioned_group(name: str, versions: dict[str, list[dict]]) -> None:
-    """Καταγράφει τις διαφορετικές εκδόσεις του αρχείου."""
-    logger.info(f"Αρχείο '{name}' έχει διαφορετικές εκδόσεις:")
+def log_versioned_group(name: str, versions: dict[Hashable, list[dict]]) -> None:
+    """Καταγράφει τις διαφορετικές εκδόσεις του αρχείου (ένα μήνυμα ανά ομάδα)."""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    lines = [f"Αρχείο '{name}' έχει διαφορετικές εκδόσεις:"]
     for version_hash, version_files in versions.items():
+        short_key = short_version_key(version_hash)
         for vf in version_files:
-            logger.info(
-                f"Έκδοση '{name}' | hash: {version_hash[:10]} | 🕒 {vf['modified']} | 📍 {vf['path']}"
+            lines.append(
+                f"Έκδοση '{name}' | hash: {short_key} | 🕒 {vf['modified']} | 📍 "
+                f"{vf['path']}"
             )
+    logger.info("\n".join(lines))
 
 
-def group_files_by_hash(files: list[dict]) -> dict[str, list[dict]]:
-    """Ομαδοποιεί αρχεία με βάση το hash."""
-    versions: dict[str, list[dict]] = defaultdict(list)
+def short_version_key(key: Hashable) -> str:
+    """Σύντομη μορφή ενός version_key για το log."""
+    if isinstance(key, bytes):
+        return key.hex()[:10]
+    if isinstance(key, tuple):
+        return f"{key[0]}:{key[1]}"
+    return str(key)[:10]
+
+
+def group_files_by_hash(files: list[dict]) -> dict[Hashable, list[dict]]:
+    """Ομαδοποιεί αρχεία με βάση το hash (ή το version_key όταν λείπει)."""
+    versions: dict[Hashable, list[dict]] = defaultdict(list)
     for f in files:
-        versions[f["hash"]].append(f)
+        versions[version_key(f)].append(f)
     return versions
 
 
@@ -179,18 +833,17 @@ def get_all_file_info(
         for file in files:
             full_path = os.path.join(root, file)
             try:
-                with open(full_path, "rb") as f:
-                    content = f.read()
-                    file_hash = hashlib.sha256(content).hexdigest()
-                    created = os.path.getctime(full_path)
-                    file_infos.append(
-                        {  # pyright: ignore[reportUnknownMemberType]
-                            "name": file,
-                            "path": full_path,
-                            "hash": file_hash,
-                            "created": created,
-                        }
-                    )
+                # Streaming hash (mmap/readinto) αντί για f.read() ολόκληρου του αρχείου
+                digest = file_digest(full_path).hex()
+                created = os.path.getctime(full_path)
+                file_infos.append(
+                    {  # pyright: ignore[reportUnknownMemberType]
+                        "name": file,
+                        "path": full_path,
+                        "hash": digest,
+                        "created": created,
+                    }
+                )
             except (IOError, OSError) as e:
                 logger.warning("Σφάλμα κατά την ανάγνωση αρχείου: %s", e)
                 continue  # Αν κάποιο αρχείο δεν μπορεί να διαβαστεί, απλώς το παραλείπουμε
@@ -5,12 +5,18 @@ exclusion_config.py
 που πρέπει να αγνοούνται και συνθήκες για τον εντοπισμό συστημικών διαδρομών
 ανάλογα με το λειτουργικό σύστημα.
 
+Το ExclusionMatcher συγκεντρώνει όλους τους κανόνες (ονόματα, glob,
+αρχεία τύπου .gitignore, επεκτάσεις, όρια μεγέθους) σε μεταγλωττισμένη
+μορφή· ο ενεργός matcher ορίζεται με set_matcher.
+
     Returns:
         _type_: _description_
 """
 
 import os
 import platform
+import re
+from typing import Iterable, Optional
 
 # Ονόματα φακέλων που θέλουμε πάντα να αγνοούμε
 EXCLUDED_DIR_NAMES = {
@@ -38,14 +44,221 @@ SYSTEM_PATH_PREFIXES = {
 CURRENT_OS = platform.system()
 
 
+def load_rule_file(path: str) -> list[str]:
+    """Διαβάζει κανόνες τύπου .gitignore (χωρίς κενές γραμμές και σχόλια)."""
+    rules = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            # Τα κενά στο τέλος αγνοούνται, εκτός αν έχουν escape
+            if not line.endswith("\\ "):
+                line = line.rstrip()
+            if line and not line.startswith("#"):
+                rules.append(line)
+    return rules
+
+
+def _translate_glob(pattern: str) -> str:
+    """Μετατρέπει glob τύπου .gitignore (*, ?, **, [..]) σε regex για διαδρομές με /."""
+    parts = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i) and (i == 0 or pattern[i - 1] == "/"):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif c == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif c == "?":
+            parts.append("[^/]")
+            i += 1
+        elif c == "[" and "]" in pattern[i + 2 :]:
+            end = pattern.index("]", i + 2)
+            body = pattern[i + 1 : end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end + 1
+        elif c == "\\" and i + 1 < n:
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(c))
+            i += 1
+    return "".join(parts)
+
+
+class _RuleSet:
+    """Κανόνες ενός αρχείου (ή της γραμμής εντολών) σχετικοί με έναν φάκελο βάσης."""
+
+    def __init__(self, base: str, rules: list[str]):
+        self.base = base.rstrip(os.sep)
+        self.rules: list[tuple["re.Pattern[str]", bool, bool]] = []
+        any_parts: list[str] = []
+        dir_parts: list[str] = []
+        for rule in rules:
+            negated = rule.startswith("!")
+            if negated or rule.startswith("\\!") or rule.startswith("\\#"):
+                rule = rule[1:]
+            dir_only = rule.endswith("/")
+            rule = rule.rstrip("/")
+            if not rule:
+                continue
+            # Κανόνας με / (εκτός από το τέλος) αφορά διαδρομή από τη βάση,
+            # αλλιώς ταιριάζει το όνομα σε οποιοδήποτε βάθος
+            anchored = "/" in rule
+            regex = ("" if anchored else "(?:.*/)?") + _translate_glob(rule.lstrip("/"))
+            self.rules.append((re.compile(regex + r"\Z"), dir_only, negated))
+            dir_parts.append(regex)
+            if not dir_only:
+                any_parts.append(regex)
+
+        # Χωρίς αρνήσεις όλοι οι κανόνες γίνονται ένα regex (ανά είδος στοιχείου)
+        self.combined: Optional[tuple[Optional["re.Pattern[str]"], ...]] = None
+        if not any(negated for _, _, negated in self.rules):
+            self.combined = tuple(
+                re.compile("(?:" + "|".join(p) + r")\Z") if p else None
+                for p in (any_parts, dir_parts)
+            )
+
+    def match(self, path: str, is_dir: bool) -> Optional[bool]:
+        """True/False αν κάποιος κανόνας αποφασίζει για το path, αλλιώς None."""
+        if not path.startswith(self.base + os.sep):
+            return None
+        rel = path[len(self.base) + 1 :]
+        if os.sep != "/":
+            rel = rel.replace(os.sep, "/")
+        if self.combined is not None:
+            regex = self.combined[is_dir]
+            return True if regex is not None and regex.match(rel) else None
+        # Με αρνήσεις (!) αποφασίζει ο τελευταίος κανόνας που ταιριάζει
+        for regex, dir_only, negated in reversed(self.rules):
+            if (is_dir or not dir_only) and regex.match(rel):
+                return not negated
+        return None
+
+
+class ExclusionMatcher:
+    """
+    Όλοι οι κανόνες εξαίρεσης μεταγλωττισμένοι μία φορά: σύνολο ονομάτων
+    φακέλων, προθέματα συστήματος (ένα str.startswith με tuple), κανόνες glob
+    και αρχεία τύπου .gitignore (ένα regex ανά αρχείο κανόνων), επεκτάσεις
+    και όρια μεγέθους αρχείων. Ο scanner το ρωτά για κάθε φάκελο πριν
+    μπει σε αυτόν, οπότε οι αποκλεισμένοι υποφάκελοι δεν διαβάζονται ποτέ.
+    """
+
+    def __init__(
+        self,
+        names: Iterable[str] = EXCLUDED_DIR_NAMES,
+        patterns: Iterable[str] = (),
+        rule_files: Iterable[str] = (),
+        root: Optional[str] = None,
+        extensions: Iterable[str] = (),
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        system_prefixes: Optional[Iterable[str]] = None,
+    ):
+        self.names = frozenset(names)
+        if system_prefixes is None:
+            system_prefixes = SYSTEM_PATH_PREFIXES.get(CURRENT_OS, [])
+        self.system_prefixes = tuple(os.path.abspath(p) for p in system_prefixes)
+        self.extensions = frozenset(
+            e.lower() if e.startswith(".") else f".{e.lower()}" for e in extensions
+        )
+        self.min_size = min_size
+        self.max_size = max_size
+
+        patterns = list(patterns)
+        rule_files = [os.path.abspath(p) for p in rule_files]
+        self.rule_sets: list[_RuleSet] = []
+        if patterns:
+            self.rule_sets.append(
+                _RuleSet(os.path.abspath(root or os.getcwd()), patterns)
+            )
+        for rule_file in rule_files:
+            self.rule_sets.append(
+                _RuleSet(os.path.dirname(rule_file), load_rule_file(rule_file))
+            )
+
+        # Ταυτότητα των κανόνων (π.χ. για να ακυρώνεται ένα snapshot αν αλλάξουν)
+        self.signature = repr(
+            (
+                sorted(self.names),
+                self.system_prefixes,
+                [(r.base, [x.pattern for x, _, _ in r.rules]) for r in self.rule_sets],
+                sorted(self.extensions),
+                min_size,
+                max_size,
+            )
+        )
+
+    def is_system_path(self, path: str) -> bool:
+        """Όπως το is_system_path, με τα προθέματα ήδη κανονικοποιημένα."""
+        return os.path.abspath(path).startswith(self.system_prefixes)
+
+    def excludes_root(self, path: str) -> bool:
+        """Για τον αρχικό φάκελο: κάποιο τμήμα του αποκλείεται ή είναι συστήματος."""
+        parts = os.path.normpath(path).split(os.sep)
+        return any(part in self.names for part in parts) or self.is_system_path(path)
+
+    def _rules_exclude(self, path: str, is_dir: bool) -> bool:
+        excluded = False
+        for rule_set in self.rule_sets:
+            decision = rule_set.match(path, is_dir)
+            if decision is not None:
+                excluded = decision
+        return excluded
+
+    def excludes_dir(self, path: str, name: Optional[str] = None) -> bool:
+        """
+        True αν ο υποφάκελος δεν πρέπει να διαβαστεί. Το path πρέπει να
+        είναι απόλυτο (όπως τα DirEntry.path μιας σάρωσης από απόλυτη ρίζα).
+        """
+        if (name or os.path.basename(path)) in self.names:
+            return True
+        if path.startswith(self.system_prefixes):
+            return True
+        return bool(self.rule_sets) and self._rules_exclude(path, True)
+
+    def excludes_file(self, path: str, name: Optional[str] = None) -> bool:
+        """True αν το αρχείο αποκλείεται από επέκταση ή κανόνα (χωρίς stat)."""
+        name = name or os.path.basename(path)
+        if self.extensions and os.path.splitext(name)[1].lower() in self.extensions:
+            return True
+        return bool(self.rule_sets) and self._rules_exclude(path, False)
+
+    def excludes_size(self, size: int) -> bool:
+        """True αν το μέγεθος είναι εκτός των ορίων min_size/max_size."""
+        if self.min_size is not None and size < self.min_size:
+            return True
+        return self.max_size is not None and size > self.max_size
+
+
+_active_matcher = ExclusionMatcher()
+
+
+def get_matcher() -> ExclusionMatcher:
+    """Ο matcher που χρησιμοποιούν οι σαρώσεις."""
+    return _active_matcher
+
+
+def set_matcher(matcher: Optional[ExclusionMatcher]) -> None:
+    """Ορίζει τον matcher των σαρώσεων (None = οι προεπιλεγμένοι κανόνες)."""
+    global _active_matcher
+    _active_matcher = matcher if matcher is not None else ExclusionMatcher()
+
+
 def is_excluded_dir(path: str) -> bool:
     """Επιστρέφει True αν το path περιέχει κάποιον από τους αποκλεισμένους φακέλους."""
     path_parts = os.path.normpath(path).split(os.sep)
-    return any(part in EXCLUDED_DIR_NAMES for part in path_parts)
+    names = get_matcher().names
+    return any(part in names for part in path_parts)
 
 
 def is_system_path(path: str) -> bool:
     """Επιστρέφει True αν το path ξεκινάει από system-level διαδρομή ανά OS."""
-    abs_path = os.path.abspath(path)
-    prefixes = SYSTEM_PATH_PREFIXES.get(CURRENT_OS, [])
-    return any(abs_path.startswith(os.path.abspath(p)) for p in prefixes)
+    return get_matcher().is_system_path(path)
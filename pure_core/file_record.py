@@ -0,0 +1,206 @@
+"""
+file_record.py
+Συμπαγής αναπαράσταση των μεταδεδομένων ενός αρχείου.
+
+Το FileRecord κρατά ακέραιους χρόνους (ns) και raw digests (bytes) σε
+__slots__ αντί για λεξικό με datetime και hex strings. Για συμβατότητα με
+τον υπόλοιπο κώδικα δέχεται και πρόσβαση τύπου λεξικού (record["hash"],
+record["created"] κ.λπ.), όπου τα hex και τα datetime φτιάχνονται μόνο όταν
+ζητηθούν.
+
+Το FileTable είναι προαιρετική columnar αποθήκη για μαζικές σαρώσεις:
+παράλληλοι πίνακες (array) για μέγεθος/χρόνους/inode και πίνακας
+φακέλων ώστε κάθε διαδρομή φακέλου να αποθηκεύεται μία φορά.
+"""
+
+import os
+import sys
+from array import array
+from datetime import datetime
+from typing import Any, Iterator, Optional
+
+
+def _to_digest(value: Any) -> Optional[bytes]:
+    """Δέχεται hex string ή bytes και επιστρέφει raw digest."""
+    if value is None or isinstance(value, bytes):
+        return value
+    return bytes.fromhex(value)
+
+
+class FileRecord:
+    """Μεταδεδομένα ενός αρχείου με __slots__."""
+
+    __slots__ = (
+        "name",
+        "path",
+        "size",
+        "digest",
+        "partial_digest",
+        "algorithm",
+        "ctime_ns",
+        "mtime_ns",
+        "device",
+        "inode",
+        "archive",
+    )
+
+    # Κλειδιά που υποστηρίζει η πρόσβαση τύπου λεξικού
+    KEYS = (
+        "name",
+        "path",
+        "size",
+        "hash",
+        "algorithm",
+        "created",
+        "modified",
+        "device",
+        "inode",
+        "mtime_ns",
+        "archive",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        size: int,
+        ctime_ns: int,
+        mtime_ns: int,
+        device: int = 0,
+        inode: int = 0,
+        digest: Optional[bytes] = None,
+        algorithm: str = "sha256",
+        archive: Optional[str] = None,
+    ):
+        self.name = sys.intern(name)
+        self.path = path
+        self.size = size
+        self.digest = digest
+        self.partial_digest: Optional[bytes] = None
+        self.algorithm = algorithm
+        self.ctime_ns = ctime_ns
+        self.mtime_ns = mtime_ns
+        self.device = device
+        self.inode = inode
+        # Για μέλη αρχείων συμπίεσης (βλ. archive_scanner): η διαδρομή του αρχείου
+        self.archive = archive
+
+    @classmethod
+    def from_stat(cls, path: str, name: str, stat: os.stat_result) -> "FileRecord":
+        """Φτιάχνει εγγραφή από stat (χωρίς digest)."""
+        return cls(
+            name,
+            path,
+            stat.st_size,
+            stat.st_ctime_ns,
+            stat.st_mtime_ns,
+            stat.st_dev,
+            stat.st_ino,
+        )
+
+    @property
+    def created(self) -> datetime:
+        return datetime.fromtimestamp(self.ctime_ns / 1e9)
+
+    @property
+    def modified(self) -> datetime:
+        return datetime.fromtimestamp(self.mtime_ns / 1e9)
+
+    # -------------------------------
+    # Πρόσβαση τύπου λεξικού
+    # -------------------------------
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "hash":
+            return self.digest.hex() if self.digest is not None else None
+        if key == "partial_hash":
+            return (
+                self.partial_digest.hex() if self.partial_digest is not None else None
+            )
+        if key in ("created", "modified", "ctime_ns") or key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == "hash":
+            self.digest = _to_digest(value)
+        elif key == "partial_hash":
+            self.partial_digest = _to_digest(value)
+        elif key in self.__slots__:
+            setattr(self, key, value)
+        else:
+            raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def keys(self) -> tuple[str, ...]:
+        return self.KEYS
+
+    def __repr__(self) -> str:
+        return f"FileRecord({self.path!r}, size={self.size})"
+
+
+class FileTable:
+    """Columnar αποθήκη εγγραφών για μαζικές σαρώσεις."""
+
+    def __init__(self) -> None:
+        self.sizes = array("q")
+        self.ctimes_ns = array("q")
+        self.mtimes_ns = array("q")
+        self.devices = array("Q")
+        self.inodes = array("Q")
+        self.dir_index = array("L")
+        self.names: list[str] = []
+        self.dirs: list[str] = []
+        self._dir_ids: dict[str, int] = {}
+        self.digests: dict[int, bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def append(self, record: FileRecord) -> int:
+        """Προσθέτει εγγραφή και επιστρέφει τη θέση της."""
+        directory = os.path.dirname(record.path)
+        dir_id = self._dir_ids.get(directory)
+        if dir_id is None:
+            dir_id = self._dir_ids[directory] = len(self.dirs)
+            self.dirs.append(directory)
+
+        row = len(self.sizes)
+        self.sizes.append(record.size)
+        self.ctimes_ns.append(record.ctime_ns)
+        self.mtimes_ns.append(record.mtime_ns)
+        self.devices.append(record.device)
+        self.inodes.append(record.inode)
+        self.dir_index.append(dir_id)
+        self.names.append(sys.intern(record.name))
+        if record.digest is not None:
+            self.digests[row] = record.digest
+        return row
+
+    def path(self, row: int) -> str:
+        return os.path.join(self.dirs[self.dir_index[row]], self.names[row])
+
+    def __getitem__(self, row: int) -> FileRecord:
+        return FileRecord(
+            self.names[row],
+            self.path(row),
+            self.sizes[row],
+            self.ctimes_ns[row],
+            self.mtimes_ns[row],
+            self.devices[row],
+            self.inodes[row],
+            self.digests.get(row),
+        )
+
+    def __iter__(self) -> Iterator[FileRecord]:
+        for row in range(len(self)):
+            yield self[row]
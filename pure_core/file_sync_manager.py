@@ -8,20 +8,73 @@ Args:
 import logging
 import os
 import secrets
+import shutil
+import time
 
-logging.basicConfig(
-    filename="file_inspector.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
+from pure_core.hash_backends import is_cryptographic
+from pure_core.io_budget import get_budget
+from pure_core.merge_engine import append_merge, diff_merge, merge_chain
+from pure_core.metrics import get_metrics, setup_queue_logging
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
 
-def merge_by_version_date(file_a: dict, file_b: dict) -> None:  # type: ignore
+# Μέγεθος μπλοκ για τη σύγκριση περιεχομένου byte-προς-byte
+COMPARE_CHUNK_SIZE = 1024 * 1024
+
+# Τρόποι χειρισμού των διπλότυπων: διαγραφή ή αντικατάσταση με σύνδεσμο
+DEDUP_MODES = ("delete", "hardlink", "reflink", "auto")
+
+# Στρατηγικές συγχώνευσης: ολόκληρο το άλλο αρχείο ή μόνο οι νέες γραμμές του
+MERGE_STRATEGIES = ("append", "diff")
+
+# Σε ποια έκδοση μιας αλυσίδας συγχωνεύονται οι υπόλοιπες
+MERGE_TARGETS = ("oldest", "newest")
+
+# Επικεφαλίδα που γράφεται πριν από το συγχωνευμένο περιεχόμενο, ανά είδος
+MERGE_BANNERS = {
+    "version": "# --- Merged version ---",
+    "random": "# --- Merged random conflict ---",
+}
+
+# ioctl FICLONE του Linux (_IOW(0x94, 9, int)) για reflink σε Btrfs/XFS κ.ά.
+FICLONE = 0x40049409
+
+setup_queue_logging()
+
+
+def merge_header(kind: str, source_path: str) -> str:
+    """Η επικεφαλίδα συγχώνευσης ("version" ή "random") για το source_path."""
+    source_name = os.path.basename(source_path)
+    return f"\n\n{MERGE_BANNERS[kind]}\n# Συγχώνευση από: {source_name}\n"
+
+
+def merge_into(
+    target_path: str, source_path: str, header: str, strategy: str = "append"
+) -> None:
+    """Συγχωνεύει το source_path στο target_path με τη δοσμένη στρατηγική.
+
+    Με "diff" προστίθενται μόνο οι γραμμές που λείπουν από το target_path,
+    οπότε η ξανά-συγχώνευση ίδιου ζεύγους δεν αλλάζει τίποτα.
+    """
+    get_budget().start_file()
+    with get_metrics().timer("merge", nbytes=os.path.getsize(source_path)):
+        if strategy == "diff":
+            added = diff_merge(target_path, source_path, header)
+            logging.info(f"Προστέθηκαν {added} γραμμές από: {source_path}")
+        else:
+            append_merge(target_path, source_path, header)
+
+
+def merge_by_version_date(file_a: dict, file_b: dict, strategy: str = "append") -> None:  # type: ignore
     """Συγχωνεύει δύο αρχεία με βάση την ημερομηνία δημιουργίας τους.
 
     Args:
         file_a (dict): Πληροφορίες για το πρώτο αρχείο.
         file_b (dict): Πληροφορίες για το δεύτερο αρχείο.
+        strategy (str): "append" (όλο το αρχείο) ή "diff" (μόνο νέες γραμμές).
     """
 
     try:
@@ -35,15 +88,13 @@ def merge_by_version_date(file_a: dict, file_b: dict) -> None:  # type: ignore
             base = file_b  # type: ignore
             other = file_a  # type: ignore
 
-        # Διαβάζουμε το περιεχόμενο του νεότερου αρχείου
-        with open(other["path"], "r", encoding="utf-8") as f_other:  # type: ignore
-            content_to_merge = f_other.read()
-
-        # Προσθέτουμε στο ΤΕΛΟΣ του παλιού αρχείου
-        with open(base["path"], "a", encoding="utf-8") as f_base:  # type: ignore
-            f_base.write("\n\n# --- Merged version ---\n")
-            f_base.write(f"# Συγχώνευση από: {os.path.basename(other['path'])}\n")  # type: ignore
-            f_base.write(content_to_merge)
+        # Προσθέτουμε το νεότερο αρχείο στο ΤΕΛΟΣ του παλιού (ατομικά, σε μπλοκ)
+        merge_into(
+            base["path"],  # type: ignore
+            other["path"],  # type: ignore
+            merge_header("version", other["path"]),  # type: ignore
+            strategy,
+        )
 
         # Διαγράφουμε ΜΟΝΟ το άλλο αρχείο
         os.remove(other["path"])  # type: ignore
@@ -54,25 +105,64 @@ def merge_by_version_date(file_a: dict, file_b: dict) -> None:  # type: ignore
         logging.error(f"Σφάλμα συγχώνευσης εκδόσεων: {e}")
 
 
-def merge_random_conflict(file_a: dict, file_b: dict) -> None:  # type: ignore
+def merge_version_chain(chain: list[tuple[str, dict]], strategy: str = "append") -> int:
+    """Συγχωνεύει όλες τις εκδόσεις μιας αλυσίδας στην πρώτη και τις διαγράφει.
+
+    Ο στόχος ξαναγράφεται μία φορά (βλ. merge_chain) και οι υπόλοιπες
+    διαγράφονται μόνο αφού ολοκληρωθεί η εγγραφή.
+
+    Args:
+        chain (list): (είδος, αρχείο) όπως από το version_chain· το πρώτο
+            αρχείο είναι ο στόχος.
+        strategy (str): "append" (όλο το αρχείο) ή "diff" (μόνο νέες γραμμές).
+
+    Returns:
+        int: Πόσες εκδόσεις πρόσθεσαν περιεχόμενο στον στόχο.
+
+    Raises:
+        OSError: Αν αποτύχει η εγγραφή· τότε δεν διαγράφεται τίποτα.
+    """
+    target = chain[0][1]
+    sources = [info for _, info in chain[1:]]
+    budget = get_budget()
+    for _ in sources:
+        budget.start_file()
+    with get_metrics().timer(
+        "merge", count=len(sources), nbytes=sum(info.get("size", 0) for info in sources)
+    ):
+        added = merge_chain(
+            target["path"],
+            [
+                (info["path"], merge_header(kind, info["path"]))
+                for kind, info in chain[1:]
+            ],
+            strategy,
+        )
+        for info in sources:
+            os.remove(info["path"])
+            logging.info(f"Συγχωνεύθηκε έκδοση: {info['path']} -> {target['path']}")
+    return added
+
+
+def merge_random_conflict(file_a: dict, file_b: dict, strategy: str = "append") -> None:  # type: ignore
     """Συγχωνεύει δύο αρχεία τυχαία.
 
     Args:
         file_a (dict): Πληροφορίες για το πρώτο αρχείο.
         file_b (dict): Πληροφορίες για το δεύτερο αρχείο.
+        strategy (str): "append" (όλο το αρχείο) ή "diff" (μόνο νέες γραμμές).
     """
     chosen, discarded = (
         (file_a, file_b) if secrets.choice([True, False]) else (file_b, file_a)
     )  # type: ignore
 
     try:
-        with open(discarded["path"], "r", encoding="utf-8") as f_disc:  # type: ignore
-            content_to_merge = f_disc.read()
-
-        with open(chosen["path"], "a", encoding="utf-8") as f_chosen:  # type: ignore
-            f_chosen.write("\n\n# --- Merged random conflict ---\n")
-            f_chosen.write(f"# Συγχώνευση από: {os.path.basename(discarded['path'])}\n")  # type: ignore
-            f_chosen.write(content_to_merge)
+        merge_into(
+            chosen["path"],  # type: ignore
+            discarded["path"],  # type: ignore
+            merge_header("random", discarded["path"]),  # type: ignore
+            strategy,
+        )
 
         os.remove(discarded["path"])  # type: ignore
         logging.info(f"Τυχαία συγχώνευση: {discarded['path']} -> {chosen['path']}")
@@ -81,16 +171,159 @@ def merge_random_conflict(file_a: dict, file_b: dict) -> None:  # type: ignore
         logging.error(f"Σφάλμα τυχαίας συγχώνευσης: {e}")
 
 
+def files_identical(path_a: str, path_b: str) -> bool:
+    """Συγκρίνει δύο αρχεία byte-προς-byte, σταματώντας στην πρώτη διαφορά."""
+    if os.path.getsize(path_a) != os.path.getsize(path_b):
+        return False
+    budget = get_budget()
+    budget.start_file()
+    with open(path_a, "rb") as fa, open(path_b, "rb") as fb:
+        while True:
+            start = time.perf_counter()
+            chunk_a = fa.read(COMPARE_CHUNK_SIZE)
+            chunk_b = fb.read(COMPARE_CHUNK_SIZE)
+            budget.charge(len(chunk_a) + len(chunk_b), time.perf_counter() - start)
+            if chunk_a != chunk_b:
+                return False
+            if not chunk_a:
+                return True
+
+
+def confirmed_duplicate(original: dict, dup: dict) -> bool:
+    """Επιβεβαιώνει ότι το dup έχει ίδιο περιεχόμενο με το original.
+
+    Αρκεί το digest μόνο αν και τα δύο προέρχονται από τον ίδιο
+    κρυπτογραφικό αλγόριθμο (sha256/blake2b/blake3). Διαφορετικά (π.χ.
+    xxhash ή εγγραφές χωρίς hash) γίνεται σύγκριση byte-προς-byte. Τα μέλη
+    αρχείων συμπίεσης (archive) δεν επιβεβαιώνονται ποτέ.
+    """
+    if original.get("archive") or dup.get("archive"):
+        return False
+    if os.path.samefile(original["path"], dup["path"]):
+        return True
+    algorithm = original.get("algorithm") or "sha256"
+    if (
+        original.get("hash")
+        and original.get("hash") == dup.get("hash")
+        and algorithm == (dup.get("algorithm") or "sha256")
+        and is_cryptographic(algorithm)
+    ):
+        return True
+    return files_identical(original["path"], dup["path"])
+
+
 def delete_duplicates(duplicate_files: list[dict]) -> None:  # type: ignore
     """Διαγράφει τα διπλά αρχεία.
 
+    Κρατά το πρώτο αρχείο και διαγράφει τα υπόλοιπα μόνο αφού επιβεβαιωθεί
+    ότι έχουν ίδιο περιεχόμενο (βλ. confirmed_duplicate).
+
     Args:
         duplicate_files (list[dict]): Λίστα με πληροφορίες για τα διπλά αρχεία.
     """
-    duplicate_files[0]  # type: ignore
+    original = duplicate_files[0]  # type: ignore
     for dup in duplicate_files[1:]:  # type: ignore
         try:
-            os.remove(dup["path"])  # type: ignore
+            with get_metrics().timer("delete", count=0) as timer:
+                if not confirmed_duplicate(original, dup):
+                    logging.warning(
+                        f"Δεν διαγράφηκε (διαφορετικό περιεχόμενο): {dup['path']}"
+                    )
+                    continue
+                size = os.path.getsize(dup["path"])  # type: ignore
+                os.remove(dup["path"])  # type: ignore
+                timer.count, timer.nbytes = 1, size
             logging.info(f"Διαγράφηκε διπλό αρχείο: {dup['path']}")
         except Exception as e:
             logging.error(f"Σφάλμα διαγραφής διπλού: {dup['path']} -> {e}")
+
+
+def reflink_file(src: str, dst: str) -> None:
+    """Δημιουργεί το dst ως reflink (κοινά blocks, copy-on-write) του src.
+
+    Raises:
+        OSError: Αν το σύστημα αρχείων ή η πλατφόρμα δεν υποστηρίζει reflink.
+    """
+    if fcntl is None:
+        raise OSError("Το reflink δεν υποστηρίζεται σε αυτή την πλατφόρμα")
+    with open(src, "rb") as f_src, open(dst, "wb") as f_dst:
+        fcntl.ioctl(f_dst.fileno(), FICLONE, f_src.fileno())
+
+
+def replace_with_link(original_path: str, dup_path: str, mode: str = "hardlink") -> str:
+    """Αντικαθιστά ατομικά το dup_path με σύνδεσμο στο original_path.
+
+    Ο σύνδεσμος δημιουργείται σε προσωρινό όνομα στον ίδιο φάκελο και
+    μετονομάζεται με os.replace, οπότε η διαδρομή δεν μένει ποτέ κενή.
+    Με mode "auto" δοκιμάζεται πρώτα reflink και μετά hardlink.
+
+    Returns:
+        str: Ο τρόπος που χρησιμοποιήθηκε ("hardlink" ή "reflink").
+    """
+    directory, name = os.path.split(dup_path)
+    tmp_path = os.path.join(directory, f".{name}.{secrets.token_hex(4)}.tmp")
+    try:
+        if mode in ("reflink", "auto"):
+            try:
+                reflink_file(original_path, tmp_path)
+                # Το reflink είναι νέο inode: κρατά τα δικαιώματα/χρόνους του dup
+                shutil.copystat(dup_path, tmp_path)
+                used = "reflink"
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                if mode == "reflink":
+                    raise
+                os.link(original_path, tmp_path)
+                used = "hardlink"
+        else:
+            os.link(original_path, tmp_path)
+            used = "hardlink"
+        os.replace(tmp_path, dup_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return used
+
+
+def link_duplicates(duplicate_files: list[dict], mode: str = "hardlink") -> None:  # type: ignore
+    """Αντικαθιστά τα διπλά αρχεία με hardlink/reflink στο πρώτο.
+
+    Όπως το delete_duplicates, αλλά οι διαδρομές των αντιγράφων παραμένουν
+    έγκυρες. Αρχεία που είναι ήδη το ίδιο inode με το πρώτο παραλείπονται
+    χωρίς ανάγνωση, οπότε μια νέα εκτέλεση σε ήδη συνδεδεμένο δέντρο δεν
+    κοστίζει τίποτα.
+
+    Args:
+        duplicate_files (list[dict]): Λίστα με πληροφορίες για τα διπλά αρχεία.
+        mode (str): "hardlink", "reflink" ή "auto".
+    """
+    original = duplicate_files[0]  # type: ignore
+    try:
+        original_stat = os.stat(original["path"])  # type: ignore
+    except OSError as e:
+        logging.error(f"Σφάλμα σύνδεσης διπλών: {original['path']} -> {e}")
+        return
+
+    for dup in duplicate_files[1:]:  # type: ignore
+        try:
+            dup_stat = os.stat(dup["path"])  # type: ignore
+            if os.path.samestat(original_stat, dup_stat):
+                continue
+            if dup_stat.st_dev != original_stat.st_dev:
+                logging.warning(f"Δεν συνδέθηκε (άλλο σύστημα αρχείων): {dup['path']}")
+                continue
+            with get_metrics().timer("link", count=0) as timer:
+                if not confirmed_duplicate(original, dup):
+                    logging.warning(
+                        f"Δεν συνδέθηκε (διαφορετικό περιεχόμενο): {dup['path']}"
+                    )
+                    continue
+                used = replace_with_link(original["path"], dup["path"], mode)  # type: ignore
+                timer.count, timer.nbytes = 1, dup_stat.st_size
+            logging.info(
+                f"Αντικαταστάθηκε με {used}: {dup['path']} -> {original['path']}"
+            )
+        except Exception as e:
+            logging.error(f"Σφάλμα σύνδεσης διπλού: {dup['path']} -> {e}")
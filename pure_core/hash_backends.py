@@ -0,0 +1,72 @@
+"""
+hash_backends.py
+Επιλογή αλγορίθμου hash για την ομαδοποίηση αρχείων.
+
+Πάντα διαθέσιμοι: sha256 και blake2b (stdlib). Αν είναι εγκατεστημένα τα
+προαιρετικά πακέτα, προστίθενται blake3 και xxh3_128/xxh64 (xxhash).
+Οι μη κρυπτογραφικοί αλγόριθμοι (xxhash) αρκούν για ομαδοποίηση, αλλά
+πριν από κάθε διαγραφή γίνεται επιβεβαίωση byte-προς-byte
+(βλ. file_sync_manager.delete_duplicates).
+"""
+
+import hashlib
+from typing import Any, Callable
+
+try:
+    import xxhash  # type: ignore
+except ImportError:  # pragma: no cover - προαιρετική εξάρτηση
+    xxhash = None
+
+try:
+    import blake3  # type: ignore
+except ImportError:  # pragma: no cover - προαιρετική εξάρτηση
+    blake3 = None
+
+DEFAULT_ALGORITHM = "sha256"
+
+# Μέγεθος ανάγνωσης ανά κλήση· μεγάλα buffers μειώνουν το κόστος ανά read
+DEFAULT_READ_SIZE = 1024 * 1024
+
+# Αλγόριθμοι των οποίων το digest θεωρείται αρκετό για διαγραφή χωρίς
+# επιπλέον σύγκριση περιεχομένου
+CRYPTOGRAPHIC_ALGORITHMS = {"sha256", "blake2b", "blake3"}
+
+_FACTORIES: dict[str, Callable[[], Any]] = {
+    "sha256": hashlib.sha256,
+    "blake2b": lambda: hashlib.blake2b(digest_size=32),
+}
+if blake3 is not None:
+    _FACTORIES["blake3"] = blake3.blake3
+if xxhash is not None:
+    _FACTORIES["xxh3_128"] = xxhash.xxh3_128
+    _FACTORIES["xxh64"] = xxhash.xxh64
+
+# Σειρά προτίμησης για "auto": ο ταχύτερος διαθέσιμος
+_AUTO_PREFERENCE = ("blake3", "xxh3_128", "blake2b")
+
+
+def available_algorithms() -> list[str]:
+    """Οι αλγόριθμοι που μπορούν να χρησιμοποιηθούν σε αυτό το περιβάλλον."""
+    return sorted(_FACTORIES)
+
+
+def resolve_algorithm(name: str) -> str:
+    """Μετατρέπει το "auto" στον ταχύτερο διαθέσιμο και ελέγχει το όνομα."""
+    if name == "auto":
+        return next(a for a in _AUTO_PREFERENCE if a in _FACTORIES)
+    if name not in _FACTORIES:
+        raise ValueError(
+            f"Άγνωστος ή μη εγκατεστημένος αλγόριθμος hash: {name} "
+            f"(διαθέσιμοι: {', '.join(available_algorithms())})"
+        )
+    return name
+
+
+def new_hasher(name: str = DEFAULT_ALGORITHM) -> Any:
+    """Νέο αντικείμενο hash με update()/digest(), όπως στο hashlib."""
+    return _FACTORIES[resolve_algorithm(name)]()
+
+
+def is_cryptographic(name: str) -> bool:
+    """True αν το digest του αλγορίθμου αρκεί ως απόδειξη ίδιου περιεχομένου."""
+    return name in CRYPTOGRAPHIC_ALGORITHMS
@@ -0,0 +1,250 @@
+"""
+hash_cache.py
+Μόνιμη cache για τα hash των αρχείων, ώστε οι επαναλαμβανόμενες σαρώσεις
+ενός φακέλου που δεν έχει αλλάξει να κάνουν μόνο stat και όχι ανάγνωση.
+
+Το κλειδί είναι (device, inode, size, mtime_ns): αν αλλάξει οτιδήποτε από
+αυτά, η εγγραφή θεωρείται άκυρη και αντικαθίσταται στο επόμενο put.
+
+Τα μέλη των αρχείων συμπίεσης (archive_scanner) αποθηκεύονται ξεχωριστά,
+με κλειδί το digest του αρχείου: ένα αρχείο που δεν άλλαξε, ακόμα και
+αν μετακινήθηκε ή αντιγράφηκε, δεν αποσυμπιέζεται ξανά.
+
+Το last_used (για το eviction) δεν γράφεται σε κάθε hit: ανανεώνεται μόνο
+αν είναι παλιότερο από LAST_USED_RESOLUTION, και οι ανανεώσεις μαζεύονται
+και γράφονται με ένα executemany σε κάθε commit.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+# Μέγιστος αριθμός εγγραφών πριν γίνει eviction των λιγότερο πρόσφατων
+DEFAULT_MAX_ENTRIES = 2_000_000
+
+# Μέγιστος αριθμός αρχείων συμπίεσης με αποθηκευμένα μέλη
+DEFAULT_MAX_ARCHIVES = 10_000
+
+# Κάθε πόσες εγγραφές γίνεται commit στη βάση
+COMMIT_EVERY = 1000
+
+# Ακρίβεια του last_used (δευτερόλεπτα): για το eviction αρκεί μία ημέρα
+LAST_USED_RESOLUTION = 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    device INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest BLOB NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (device, inode, kind, algorithm)
+)
+"""
+
+_ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archive_members (
+    digest BLOB NOT NULL,
+    algorithm TEXT NOT NULL,
+    members TEXT NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (digest, algorithm)
+)
+"""
+
+
+def default_cache_path() -> str:
+    """Επιστρέφει τη διαδρομή της cache στον φάκελο cache του χρήστη."""
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+    return os.path.join(base, "file_cleaner_merger", "hashes.sqlite")
+
+
+class HashCache:
+    """Cache hash αρχείων σε SQLite, ασφαλής για χρήση από πολλά threads."""
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._now = int(time.time())
+        # Ανανεώσεις last_used που περιμένουν το επόμενο commit
+        self._touched: list[tuple] = []
+        self._touched_archives: list[tuple] = []
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute(_ARCHIVE_SCHEMA)
+
+    def __enter__(self) -> "HashCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get(
+        self,
+        device: int,
+        inode: int,
+        size: int,
+        mtime_ns: int,
+        kind: str = "full",
+        algorithm: str = "sha256",
+    ) -> Optional[bytes]:
+        """Επιστρέφει το αποθηκευμένο digest ή None αν λείπει ή είναι παλιό."""
+        if not inode:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest, last_used FROM hashes WHERE device=? AND inode=?"
+                " AND kind=? AND algorithm=? AND size=? AND mtime_ns=?",
+                (device, inode, kind, algorithm, size, mtime_ns),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if self._stale(row[1]):
+                self._touched.append((self._now, device, inode, kind, algorithm))
+                self._maybe_commit()
+            return row[0]
+
+    def put(
+        self,
+        device: int,
+        inode: int,
+        size: int,
+        mtime_ns: int,
+        digest: bytes,
+        kind: str = "full",
+        algorithm: str = "sha256",
+    ) -> None:
+        """Αποθηκεύει digest, αντικαθιστώντας τυχόν παλιά εγγραφή του inode."""
+        if not inode:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (device, inode, kind, algorithm, size, mtime_ns, digest, self._now),
+            )
+            self._maybe_commit()
+
+    def get_archive(self, digest: bytes, algorithm: str = "sha256") -> Optional[list]:
+        """Τα αποθηκευμένα μέλη του αρχείου συμπίεσης με αυτό το digest, ή None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT members, last_used FROM archive_members"
+                " WHERE digest=? AND algorithm=?",
+                (digest, algorithm),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if self._stale(row[1]):
+                self._touched_archives.append((self._now, digest, algorithm))
+                self._maybe_commit()
+            return json.loads(row[0])
+
+    def put_archive(
+        self, digest: bytes, members: list, algorithm: str = "sha256"
+    ) -> None:
+        """Αποθηκεύει τα μέλη (λίστα JSON) ενός αρχείου συμπίεσης."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO archive_members VALUES (?, ?, ?, ?)",
+                (digest, algorithm, json.dumps(members, ensure_ascii=False), self._now),
+            )
+            self._maybe_commit()
+
+    def invalidate(self, device: int, inode: int) -> None:
+        """Διαγράφει όλες τις εγγραφές ενός inode."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM hashes WHERE device=? AND inode=?", (device, inode)
+            )
+            self._maybe_commit()
+
+    def evict(self) -> int:
+        """
+        Κρατά μόνο τις max_entries πιο πρόσφατα χρησιμοποιημένες εγγραφές
+        (και τα DEFAULT_MAX_ARCHIVES πιο πρόσφατα αρχεία συμπίεσης).
+        """
+        removed = 0
+        with self._lock:
+            # Οι εκκρεμείς ανανεώσεις μετρούν για τη σειρά του eviction
+            self._flush_touched()
+            for table, limit in (
+                ("hashes", self.max_entries),
+                ("archive_members", DEFAULT_MAX_ARCHIVES),
+            ):
+                (count,) = self._conn.execute(
+                    f"SELECT COUNT(*) FROM {table}"
+                ).fetchone()
+                excess = count - limit
+                if excess <= 0:
+                    continue
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE rowid IN"
+                    f" (SELECT rowid FROM {table} ORDER BY last_used ASC LIMIT ?)",
+                    (excess,),
+                )
+                removed += excess
+            if not removed:
+                return 0
+            self._conn.commit()
+            self._pending = 0
+        logging.info(f"Hash cache: αφαιρέθηκαν {removed} παλιές εγγραφές")
+        return removed
+
+    def close(self) -> None:
+        """Κάνει eviction, commit και κλείνει τη βάση."""
+        self.evict()
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+
+    def _stale(self, last_used: int) -> bool:
+        return last_used < self._now - LAST_USED_RESOLUTION
+
+    def _flush_touched(self) -> None:
+        """Γράφει τις εκκρεμείς ανανεώσεις last_used (με κρατημένο το lock)."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE hashes SET last_used=? WHERE device=? AND inode=?"
+                " AND kind=? AND algorithm=?",
+                self._touched,
+            )
+            self._touched = []
+        if self._touched_archives:
+            self._conn.executemany(
+                "UPDATE archive_members SET last_used=? WHERE digest=? AND algorithm=?",
+                self._touched_archives,
+            )
+            self._touched_archives = []
+
+    def _maybe_commit(self) -> None:
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self._flush_touched()
+            self._conn.commit()
+            self._pending = 0
@@ -0,0 +1,208 @@
+"""
+io_budget.py
+Όρια I/O και CPU, ώστε μια σάρωση να τρέχει δίπλα σε φορτίο παραγωγής.
+
+Ο ενεργός Budget (set_budget) χρεώνεται από το hashing, τη σύγκριση
+περιεχομένου και τη συγχώνευση:
+
+- bytes/s και αρχεία/s με token bucket (επιτρέπεται ριπή ενός
+  δευτερολέπτου, μετά το thread περιμένει),
+- προσαρμοστική καθυστέρηση: αν ο μέσος χρόνος μιας ανάγνωσης (EWMA)
+  ξεπεράσει το max_latency, ανάμεσα στις αναγνώσεις μπαίνει παύση
+  ανάλογη του χρόνου τους (έως BACKOFF_MAX_PAUSE φορές), που μειώνεται
+  ξανά όταν ο δίσκος ησυχάσει.
+
+Τα όρια ισχύουν για όλη τη διεργασία (τα threads μοιράζονται τα buckets).
+Με processes (--processes) κάθε worker έχει το δικό του αντίγραφο μετά το
+fork. Ο προεπιλεγμένος Budget είναι ανενεργός.
+
+Το lower_priority ρίχνει την προτεραιότητα CPU (os.nice) και I/O (κλάση
+idle του ioprio_set στο Linux· την τηρούν οι schedulers BFQ/CFQ). Και τα
+δύο κληρονομούνται από threads και processes που δημιουργούνται μετά.
+"""
+
+import ctypes
+import logging
+import os
+import platform
+import threading
+import time
+from typing import Optional
+
+from pure_core.metrics import get_metrics
+
+# Εξομάλυνση του EWMA του χρόνου ανάγνωσης
+LATENCY_SMOOTHING = 0.2
+
+# Κάθε πόσο (s) επιτρέπεται αλλαγή της προσαρμοστικής παύσης
+BACKOFF_INTERVAL = 0.25
+
+# Μέγιστη παύση, ως πολλαπλάσιο του χρόνου της ανάγνωσης
+BACKOFF_MAX_PAUSE = 15.0
+
+# Αναγνώσεις μικρότερες από αυτό δεν μετρούν στο EWMA (π.χ. τέλος αρχείου)
+LATENCY_MIN_BYTES = 64 * 1024
+
+_RATE_SUFFIXES = {"k": 1024, "m": 1024**2, "g": 1024**3}
+
+# ioprio_set: αριθμός κλήσης συστήματος ανά αρχιτεκτονική
+_SYS_IOPRIO_SET = {
+    "x86_64": 251,
+    "amd64": 251,
+    "i386": 289,
+    "i686": 289,
+    "aarch64": 30,
+    "arm64": 30,
+    "riscv64": 30,
+    "armv7l": 314,
+    "ppc64le": 273,
+    "s390x": 282,
+}
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_CLASS_IDLE = 3
+IOPRIO_CLASS_SHIFT = 13
+
+
+def parse_rate(value: str) -> float:
+    """ "50M" -> 52428800. Δέχεται επιθήματα K/M/G (δυνάμεις του 1024)."""
+    text = value.strip().lower().removesuffix("/s").removesuffix("b")
+    factor = _RATE_SUFFIXES.get(text[-1:], 1)
+    if factor != 1:
+        text = text[:-1]
+    try:
+        rate = float(text) * factor
+    except ValueError:
+        raise ValueError(f"Μη έγκυρος ρυθμός: {value}") from None
+    if rate <= 0:
+        raise ValueError(f"Ο ρυθμός πρέπει να είναι θετικός: {value}")
+    return rate
+
+
+class TokenBucket:
+    """Token bucket με ριπή ενός δευτερολέπτου (thread-safe)."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Χρεώνει amount· επιστρέφει πόσα δευτερόλεπτα πρέπει να περιμένει ο καλών."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+
+class Budget:
+    """Όρια ρυθμού και προσαρμοστική καθυστέρηση των αναγνώσεων."""
+
+    def __init__(
+        self,
+        bytes_per_sec: Optional[float] = None,
+        files_per_sec: Optional[float] = None,
+        max_latency: Optional[float] = None,
+    ):
+        self.bytes_bucket = TokenBucket(bytes_per_sec) if bytes_per_sec else None
+        self.files_bucket = TokenBucket(files_per_sec) if files_per_sec else None
+        self.max_latency = max_latency
+        self.enabled = bool(self.bytes_bucket or self.files_bucket or max_latency)
+        self.latency: Optional[float] = None
+        # Παύση ανά ανάγνωση, ως πολλαπλάσιο του χρόνου της
+        self.pause = 0.0
+        self._adjusted = 0.0
+        self._lock = threading.Lock()
+
+    def start_file(self) -> None:
+        """Χρέωση ενός αρχείου στο όριο αρχείων/s."""
+        if self.files_bucket is not None:
+            self._sleep(self.files_bucket.reserve(1))
+
+    def charge(self, nbytes: int, seconds: float = 0.0) -> None:
+        """
+        Χρέωση nbytes που μόλις διαβάστηκαν (σε seconds). Περιμένει όσο
+        χρειάζεται για το όριο bytes/s και την προσαρμοστική παύση.
+        """
+        if not self.enabled:
+            return
+        delay = (
+            self.bytes_bucket.reserve(nbytes) if self.bytes_bucket is not None else 0.0
+        )
+        if self.max_latency is not None and nbytes >= LATENCY_MIN_BYTES:
+            delay = max(delay, seconds * self._observe(seconds))
+        self._sleep(delay)
+
+    def _observe(self, seconds: float) -> float:
+        """Ενημερώνει το EWMA και την παύση· επιστρέφει την τρέχουσα παύση."""
+        with self._lock:
+            if self.latency is None:
+                self.latency = seconds
+            else:
+                self.latency += LATENCY_SMOOTHING * (seconds - self.latency)
+            now = time.monotonic()
+            if now - self._adjusted >= BACKOFF_INTERVAL:
+                self._adjusted = now
+                if self.latency > self.max_latency:
+                    self.pause = min(BACKOFF_MAX_PAUSE, self.pause * 2 + 1)
+                else:
+                    self.pause = max(0.0, (self.pause - 1) / 2)
+            return self.pause
+
+    @staticmethod
+    def _sleep(seconds: float) -> None:
+        if seconds > 0:
+            get_metrics().add("throttle", 1, 0, seconds)
+            time.sleep(seconds)
+
+
+_active_budget = Budget()
+
+
+def get_budget() -> Budget:
+    """Τα όρια που χρεώνουν το hashing και οι ενέργειες."""
+    return _active_budget
+
+
+def set_budget(budget: Optional[Budget]) -> None:
+    """Ορίζει τα ενεργά όρια (None = χωρίς όρια)."""
+    global _active_budget
+    _active_budget = budget if budget is not None else Budget()
+
+
+def lower_priority(nice: int = 0, idle_io: bool = False) -> None:
+    """
+    Χαμηλώνει την προτεραιότητα της διεργασίας: os.nice(nice) για CPU και,
+    με idle_io, κλάση I/O idle (Linux). Οι αποτυχίες καταγράφονται.
+    """
+    if nice and hasattr(os, "nice"):
+        try:
+            os.nice(nice)
+        except OSError as e:
+            logging.warning(f"Αποτυχία os.nice({nice}): {e}")
+    if idle_io:
+        try:
+            set_idle_io_priority()
+        except OSError as e:
+            logging.warning(f"Αποτυχία κλάσης I/O idle: {e}")
+
+
+def set_idle_io_priority() -> None:
+    """
+    Κλάση I/O idle για το τρέχον thread και όσα δημιουργηθούν μετά.
+
+    Raises:
+        OSError: Εκτός Linux, σε άγνωστη αρχιτεκτονική ή αν αποτύχει η κλήση.
+    """
+    number = _SYS_IOPRIO_SET.get(platform.machine().lower())
+    if platform.system() != "Linux" or number is None:
+        raise OSError("το ioprio_set δεν υποστηρίζεται εδώ")
+    libc = ctypes.CDLL(None, use_errno=True)
+    result = libc.syscall(
+        number, IOPRIO_WHO_PROCESS, 0, IOPRIO_CLASS_IDLE << IOPRIO_CLASS_SHIFT
+    )
+    if result != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, f"ioprio_set: {os.strerror(err)}")
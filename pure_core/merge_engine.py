@@ -0,0 +1,436 @@
+"""
+merge_engine.py
+Συγχώνευση αρχείων με σταθερή μνήμη και ατομική αντικατάσταση.
+
+Το αποτέλεσμα γράφεται σε προσωρινό αρχείο στον ίδιο φάκελο με τον
+στόχο (αρχικό περιεχόμενο + επικεφαλίδα + περιεχόμενο του άλλου),
+γίνεται fsync και αντικαθιστά τον στόχο με os.replace. Έτσι ένα σφάλμα
+ή μια διακοπή στη μέση δεν αφήνει ποτέ μισογραμμένο αρχείο. Το νέο
+αρχείο κρατά τα δικαιώματα και, όπου επιτρέπεται, τον ιδιοκτήτη και την
+ομάδα του στόχου.
+
+Στόχος με πολλά hardlinks (st_nlink > 1, π.χ. μετά από --dedup
+hardlink) δεν αντικαθίσταται, γιατί τα άλλα ονόματα θα έμεναν στο παλιό
+inode. Εκεί η προσθήκη γίνεται στο ίδιο αρχείο με fsync, και αν
+αποτύχει το αρχείο κόβεται πίσω στο αρχικό του μέγεθος· μια διακοπή της
+διεργασίας στη μέση μπορεί όμως να αφήσει μέρος της προσθήκης.
+
+Η αντιγραφή γίνεται σε binary, με os.copy_file_range ή os.sendfile όταν
+τα υποστηρίζει ο kernel (τα δεδομένα δεν περνούν από τη μνήμη της
+Python) και αλλιώς με read/write σε μπλοκ MERGE_CHUNK_SIZE. Έτσι η
+μνήμη μένει O(1) και το περιεχόμενο δεν χρειάζεται να είναι UTF-8.
+Κάθε μπλοκ χρεώνεται στα όρια I/O (io_budget).
+
+Το diff_merge προσθέτει μόνο τις γραμμές που φέρνει το άλλο αρχείο. Οι
+γραμμές συγκρίνονται ως digests blake2b των 128 bit (όχι το κείμενο)
+με patience diff: οι γραμμές που εμφανίζονται μία φορά και στα δύο αρχεία
+γίνονται άγκυρες (LIS), και μόνο τα μικρά κενά ανάμεσά τους περνούν από
+το difflib.SequenceMatcher. Μια γραμμή που δεν ευθυγραμμίζεται αλλά
+υπάρχει σε γραμμή του στόχου εκτός ευθυγράμμισης (π.χ. σε τμήμα που
+πρόσθεσε προηγούμενη συγχώνευση) δεν ξαναπροστίθεται, οπότε μια δεύτερη
+συγχώνευση του ίδιου ζεύγους δεν αλλάζει τίποτα. Οι νέες γραμμές
+διαβάζονται ξανά από το αρχείο κατά την εγγραφή.
+
+Το merge_chain συγχωνεύει πολλές εκδόσεις στον ίδιο στόχο με μία μόνο
+εγγραφή, αντί για μία ατομική αντικατάσταση ανά ζεύγος.
+"""
+
+import bisect
+import difflib
+import errno
+import logging
+import os
+import secrets
+import shutil
+import time
+from hashlib import blake2b
+from typing import BinaryIO, Callable
+
+from pure_core.io_budget import get_budget
+
+# Μέγεθος (bytes) του digest κάθε γραμμής στο diff
+LINE_DIGEST_SIZE = 16
+
+# Μέγεθος μπλοκ για την αντιγραφή όταν δεν υπάρχει αντιγραφή από τον kernel
+MERGE_CHUNK_SIZE = 1024 * 1024
+
+# Μέγιστο γινόμενο γραμμών για SequenceMatcher σε κενό χωρίς άγκυρες·
+# πάνω από αυτό οι γραμμές ταιριάζουν απλώς ως σύνολο
+DIFF_FALLBACK_LIMIT = 4_000_000
+
+# Σφάλματα που σημαίνουν "δεν υποστηρίζεται εδώ", οπότε δοκιμάζεται άλλος τρόπος
+_UNSUPPORTED_ERRNOS = {
+    errno.ENOSYS,
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+    errno.EBADF,
+}
+
+
+def _kernel_copy(src_fd: int, dst_fd: int) -> bool:
+    """
+    Αντιγράφει από την τρέχουσα θέση του src_fd ως το τέλος του, μέσα
+    στον kernel. Επιστρέφει False αν δεν υποστηρίζεται (όσα γράφτηκαν
+    μέχρι τότε μένουν και οι θέσεις των fd έχουν ήδη προχωρήσει).
+    """
+    budget = get_budget()
+    for copy in (getattr(os, "copy_file_range", None), _sendfile):
+        if copy is None:
+            continue
+        try:
+            while True:
+                start = time.perf_counter()
+                copied = copy(src_fd, dst_fd, MERGE_CHUNK_SIZE)
+                if not copied:
+                    return True
+                budget.charge(copied, time.perf_counter() - start)
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+    return False
+
+
+def _sendfile(src_fd: int, dst_fd: int, count: int) -> int:
+    if not hasattr(os, "sendfile") or os.name == "nt":
+        raise OSError(errno.ENOSYS, "sendfile")
+    return os.sendfile(dst_fd, src_fd, None, count)
+
+
+def copy_stream(src: BinaryIO, dst: BinaryIO) -> None:
+    """Αντιγράφει το υπόλοιπο του src στο dst (αρχεία ανοιχτά χωρίς buffering)."""
+    if _kernel_copy(src.fileno(), dst.fileno()):
+        return
+    budget = get_budget()
+    while True:
+        start = time.perf_counter()
+        chunk = src.read(MERGE_CHUNK_SIZE)
+        if not chunk:
+            return
+        budget.charge(len(chunk), time.perf_counter() - start)
+        write_all(dst, chunk)
+
+
+def write_all(out: BinaryIO, data: bytes) -> None:
+    """Γράφει όλα τα data· ένα αρχείο χωρίς buffering μπορεί να γράψει λιγότερα."""
+    with memoryview(data) as view:
+        offset = 0
+        while offset < len(view):
+            written = out.write(view[offset:])
+            if written is None:
+                raise BlockingIOError(errno.EAGAIN, "η εγγραφή θα μπλόκαρε")
+            offset += written
+
+
+def _fsync_directory(directory: str) -> None:
+    """Κάνει fsync τον φάκελο ώστε να διατηρηθεί η μετονομασία (POSIX)."""
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _rewrite_with_tail(
+    target_path: str, write_tail: Callable[[BinaryIO], None]
+) -> None:
+    """
+    Ξαναγράφει ατομικά το target_path ως: αρχικό περιεχόμενο + write_tail.
+    Για στόχο με πολλά hardlinks η προσθήκη γίνεται στο ίδιο inode.
+    """
+    st = os.stat(target_path)
+    if st.st_nlink > 1:
+        _append_in_place(target_path, write_tail)
+        return
+    directory, name = os.path.split(os.path.abspath(target_path))
+    tmp_path = os.path.join(directory, f".{name}.{secrets.token_hex(4)}.merge")
+    try:
+        with open(tmp_path, "wb", buffering=0) as out:
+            with open(target_path, "rb", buffering=0) as target:
+                copy_stream(target, out)
+            write_tail(out)
+            os.fsync(out.fileno())
+        # Πρώτα ο ιδιοκτήτης: το chown καθαρίζει τα bits setuid/setgid
+        _copy_owner(st, tmp_path)
+        shutil.copymode(target_path, tmp_path)
+        os.replace(tmp_path, target_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_directory(directory)
+
+
+def _append_in_place(target_path: str, write_tail: Callable[[BinaryIO], None]) -> None:
+    with open(target_path, "r+b", buffering=0) as out:
+        size = out.seek(0, os.SEEK_END)
+        try:
+            write_tail(out)
+            os.fsync(out.fileno())
+        except BaseException:
+            out.truncate(size)
+            raise
+
+
+def _copy_owner(st: os.stat_result, path: str) -> None:
+    """Ιδιοκτήτης και ομάδα του st στο path (αν δεν επιτρέπεται, προειδοποίηση)."""
+    if not hasattr(os, "chown"):
+        return
+    current = os.stat(path)
+    if (current.st_uid, current.st_gid) == (st.st_uid, st.st_gid):
+        return
+    try:
+        os.chown(path, st.st_uid, st.st_gid)
+    except OSError as e:
+        logging.warning(f"Αδυναμία διατήρησης ιδιοκτήτη: {path} -> {e}")
+
+
+def append_merge(target_path: str, source_path: str, header: str) -> None:
+    """
+    Προσθέτει στο τέλος του target_path την επικεφαλίδα και το περιεχόμενο
+    του source_path, ατομικά. Το source_path δεν αλλάζει· τα δικαιώματα
+    του target_path διατηρούνται.
+
+    Raises:
+        OSError: Αν αποτύχει η ανάγνωση ή η εγγραφή. Ο στόχος μένει ως είχε.
+    """
+
+    def write_tail(out: BinaryIO) -> None:
+        write_all(out, header.encode("utf-8"))
+        with open(source_path, "rb", buffering=0) as source:
+            copy_stream(source, out)
+
+    _rewrite_with_tail(target_path, write_tail)
+
+
+def _line_hashes(path: str) -> list[bytes]:
+    """
+    Ένα digest 128 bit ανά γραμμή. Όχι το hash() της Python: μια σύγκρουση
+    των 64 bit θα έκανε μια αλλαγμένη γραμμή να μετρά ως "υπάρχει ήδη" και
+    θα χανόταν μαζί με την πηγή που διαγράφεται μετά τη συγχώνευση.
+    """
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        hashes = [blake2b(line, digest_size=LINE_DIGEST_SIZE).digest() for line in f]
+        get_budget().charge(f.tell(), time.perf_counter() - start)
+    return hashes
+
+
+def _unique_anchors(
+    a: list[bytes], alo: int, ahi: int, b: list[bytes], blo: int, bhi: int
+) -> list[tuple[int, int]]:
+    """
+    Ζεύγη (i, j) γραμμών μοναδικών και στα δύο διαστήματα, στη μέγιστη
+    αύξουσα σειρά (LIS).
+    """
+    counts: dict[bytes, list[int]] = {}
+    for i in range(alo, ahi):
+        entry = counts.get(a[i])
+        if entry is None:
+            counts[a[i]] = [1, 0, i]
+        else:
+            entry[0] += 1
+    for j in range(blo, bhi):
+        entry = counts.get(b[j])
+        if entry is not None and entry[0] == 1:
+            entry[1] += 1
+            entry.append(j)
+    pairs = sorted(
+        (entry[3], entry[2])
+        for entry in counts.values()
+        if entry[0] == 1 and entry[1] == 1
+    )
+
+    # Patience sorting πάνω στα i, με τα ζεύγη ταξινομημένα κατά j
+    tails: list[int] = []
+    tail_index: list[int] = []
+    previous: list[int] = []
+    for index, (_, i) in enumerate(pairs):
+        pos = bisect.bisect_left(tails, i)
+        if pos == len(tails):
+            tails.append(i)
+            tail_index.append(index)
+        else:
+            tails[pos] = i
+            tail_index[pos] = index
+        previous.append(tail_index[pos - 1] if pos else -1)
+
+    anchors: list[tuple[int, int]] = []
+    index = tail_index[-1] if tail_index else -1
+    while index >= 0:
+        j, i = pairs[index]
+        anchors.append((i, j))
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+def _align(a: list[bytes], b: list[bytes]) -> tuple[bytearray, bytearray]:
+    """Σημαίες 1 για τις γραμμές του a και του b που ευθυγραμμίζονται (patience)."""
+    matched_a = bytearray(len(a))
+    matched = bytearray(len(b))
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+        # Κοινή αρχή και τέλος
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            matched_a[alo] = matched[blo] = 1
+            alo += 1
+            blo += 1
+        while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+            matched_a[ahi] = matched[bhi] = 1
+        if alo == ahi or blo == bhi:
+            continue
+
+        anchors = _unique_anchors(a, alo, ahi, b, blo, bhi)
+        if anchors:
+            for i, j in anchors:
+                matched_a[i] = matched[j] = 1
+                stack.append((alo, i, blo, j))
+                alo, blo = i + 1, j + 1
+            stack.append((alo, ahi, blo, bhi))
+        elif (ahi - alo) * (bhi - blo) <= DIFF_FALLBACK_LIMIT:
+            matcher = difflib.SequenceMatcher(
+                None, a[alo:ahi], b[blo:bhi], autojunk=False
+            )
+            for i, j, size in matcher.get_matching_blocks():
+                matched_a[alo + i : alo + i + size] = b"\x01" * size
+                matched[blo + j : blo + j + size] = b"\x01" * size
+        else:
+            present = set(a[alo:ahi])
+            for j in range(blo, bhi):
+                if b[j] in present:
+                    matched[j] = 1
+            present = set(b[blo:bhi])
+            for i in range(alo, ahi):
+                if a[i] in present:
+                    matched_a[i] = 1
+    return matched_a, matched
+
+
+def matched_source_lines(a: list[bytes], b: list[bytes]) -> bytearray:
+    """Σημαία 1 για κάθε γραμμή του b που αντιστοιχεί σε γραμμή του a (patience)."""
+    return _align(a, b)[1]
+
+
+def _unmatched_ranges(
+    target_lines: list[bytes], source_lines: list[bytes]
+) -> list[tuple[int, int]]:
+    if target_lines == source_lines:
+        return []
+    matched_target, matched = _align(target_lines, source_lines)
+    # Γραμμές του στόχου εκτός ευθυγράμμισης, π.χ. όσες πρόσθεσε μια
+    # προηγούμενη συγχώνευση της ίδιας πηγής στο τέλος
+    loose = {line for line, flag in zip(target_lines, matched_target) if not flag}
+    if loose:
+        for j, line in enumerate(source_lines):
+            if not matched[j] and line in loose:
+                matched[j] = 1
+    ranges: list[tuple[int, int]] = []
+    j = matched.find(0)
+    while j != -1:
+        end = matched.find(1, j)
+        if end == -1:
+            end = len(matched)
+        ranges.append((j, end))
+        j = matched.find(0, end)
+    return ranges
+
+
+def added_line_ranges(target_path: str, source_path: str) -> list[tuple[int, int]]:
+    """
+    Διαστήματα [j1, j2) γραμμών του source_path που δεν υπάρχουν στην
+    αντίστοιχη θέση του target_path (γραμμές που προστέθηκαν ή άλλαξαν)
+    ούτε σε γραμμή του target_path εκτός ευθυγράμμισης.
+    """
+    return _unmatched_ranges(_line_hashes(target_path), _line_hashes(source_path))
+
+
+def _write_line_ranges(
+    out: BinaryIO, source_path: str, ranges: list[tuple[int, int]]
+) -> None:
+    """Γράφει τις γραμμές των διαστημάτων του source_path, σε μπλοκ MERGE_CHUNK_SIZE."""
+    pending = bytearray()
+    current = iter(ranges)
+    start, end = next(current)
+    began = time.perf_counter()
+    with open(source_path, "rb") as source:
+        for index, line in enumerate(source):
+            if index >= end:
+                start, end = next(current, (None, None))
+                if start is None:
+                    break
+            if index >= start:
+                pending += line
+                if len(pending) >= MERGE_CHUNK_SIZE:
+                    write_all(out, pending)
+                    pending.clear()
+        get_budget().charge(source.tell(), time.perf_counter() - began)
+    write_all(out, pending)
+
+
+def diff_merge(target_path: str, source_path: str, header: str) -> int:
+    """
+    Προσθέτει στο τέλος του target_path, μετά την επικεφαλίδα, μόνο τις
+    γραμμές του source_path που λείπουν από αυτό. Αν δεν λείπει καμία, το
+    target_path δεν αγγίζεται. Η εγγραφή είναι ατομική όπως στο append_merge.
+
+    Returns:
+        int: Πόσες γραμμές προστέθηκαν.
+    """
+    ranges = added_line_ranges(target_path, source_path)
+    if not ranges:
+        return 0
+
+    def write_tail(out: BinaryIO) -> None:
+        write_all(out, header.encode("utf-8"))
+        _write_line_ranges(out, source_path, ranges)
+
+    _rewrite_with_tail(target_path, write_tail)
+    return sum(end - start for start, end in ranges)
+
+
+def merge_chain(
+    target_path: str, sources: list[tuple[str, str]], strategy: str = "append"
+) -> int:
+    """
+    Συγχωνεύει πολλά αρχεία (source_path, επικεφαλίδα) στο target_path με
+    μία ατομική εγγραφή: κάθε πηγή διαβάζεται σειριακά και προστίθεται με
+    τη σειρά της λίστας. Με "diff" κάθε πηγή συγκρίνεται με τον στόχο μαζί
+    με όσες γραμμές πρόσθεσαν οι προηγούμενες πηγές, και πηγές που δεν
+    φέρνουν τίποτα νέο παραλείπονται (χωρίς επικεφαλίδα).
+
+    Returns:
+        int: Πόσες πηγές πρόσθεσαν περιεχόμενο (0 = ο στόχος δεν άλλαξε).
+    """
+    if strategy != "diff":
+        contributions = [(path, header, None) for path, header in sources]
+    else:
+        present = _line_hashes(target_path)
+        contributions = []
+        for path, header in sources:
+            source_lines = _line_hashes(path)
+            ranges = _unmatched_ranges(present, source_lines)
+            if ranges:
+                contributions.append((path, header, ranges))
+                for start, end in ranges:
+                    present.extend(source_lines[start:end])
+    if not contributions:
+        return 0
+
+    def write_tail(out: BinaryIO) -> None:
+        for path, header, ranges in contributions:
+            write_all(out, header.encode("utf-8"))
+            if ranges is None:
+                with open(path, "rb", buffering=0) as source:
+                    copy_stream(source, out)
+            else:
+                _write_line_ranges(out, path, ranges)
+
+    _rewrite_with_tail(target_path, write_tail)
+    return len(contributions)
@@ -0,0 +1,290 @@
+"""
+metrics.py
+Μετρήσεις ανά στάδιο (σάρωση, stat, hash, ομαδοποίηση, διαγραφή,
+σύνδεση, συγχώνευση, αναμονή λόγω ορίων I/O), profiling και logging
+μέσω ουράς.
+
+Κάθε στάδιο μετρά πλήθος, bytes και χρόνο. Ο ενεργός Metrics ορίζεται
+με set_metrics· ο προεπιλεγμένος είναι ανενεργός, οπότε στα hot paths
+το κόστος είναι ένας έλεγχος του enabled. Οι χρόνοι είναι αθροίσματα
+ανά κλήση (με πολλά threads ξεπερνούν τον συνολικό χρόνο) και τα στάδια
+επικαλύπτονται, αφού το pipeline τρέχει τη σάρωση μαζί με το hashing.
+Με processes (--processes) το hashing γίνεται σε άλλη διεργασία και δεν
+μετριέται.
+
+Τα logs περνούν από QueueHandler: το thread που γράφει το μήνυμα απλώς
+το βάζει σε ουρά και ένα QueueListener το γράφει στο αρχείο.
+"""
+
+import atexit
+import cProfile
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+# Τα στάδια με τη σειρά που εμφανίζονται στην αναφορά
+STAGES = ("walk", "stat", "hash", "group", "delete", "link", "merge", "throttle")
+
+METRICS_FORMATS = ("json", "prometheus")
+
+LOG_FILE = "file_inspector.log"
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+# Πόσες θέσεις δέσμευσης μνήμης δείχνει η αναφορά του tracemalloc
+TRACEMALLOC_TOP = 10
+
+
+class StageStats:
+    """Σύνολα ενός σταδίου."""
+
+    __slots__ = ("count", "bytes", "seconds")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+
+class _Timer:
+    """Μετρά τον χρόνο ενός with και τον προσθέτει στο στάδιο."""
+
+    __slots__ = ("metrics", "stage", "count", "nbytes", "_start")
+
+    def __init__(self, metrics: "Metrics", stage: str, count: int, nbytes: int):
+        self.metrics = metrics
+        self.stage = stage
+        self.count = count
+        self.nbytes = nbytes
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.metrics.add(
+            self.stage, self.count, self.nbytes, time.perf_counter() - self._start
+        )
+
+
+class _NullTimer:
+    __slots__ = ("count", "nbytes")
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """Μετρητές και χρονόμετρα ανά στάδιο (thread-safe)."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.stages: dict[str, StageStats] = {}
+        self.memory_peak: Optional[int] = None
+        self.top_allocations: list[str] = []
+        self._lock = threading.Lock()
+
+    def add(
+        self, stage: str, count: int = 1, nbytes: int = 0, seconds: float = 0.0
+    ) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats()
+            stats.count += count
+            stats.bytes += nbytes
+            stats.seconds += seconds
+
+    def timer(self, stage: str, count: int = 1, nbytes: int = 0) -> Any:
+        """
+        Context manager που μετρά το σώμα του with ως μία κλήση του σταδίου.
+        Τα count/nbytes του αντικειμένου μπορούν να αλλάξουν πριν τη λήξη.
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, stage, count, nbytes)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            stages = {
+                name: {
+                    "count": s.count,
+                    "bytes": s.bytes,
+                    "seconds": round(s.seconds, 6),
+                }
+                for name, s in sorted(
+                    self.stages.items(), key=lambda kv: _stage_order(kv[0])
+                )
+            }
+        data: dict[str, Any] = {
+            "elapsed_seconds": round(self.elapsed, 6),
+            "stages": stages,
+        }
+        if self.memory_peak is not None:
+            data["memory_peak_bytes"] = self.memory_peak
+            data["top_allocations"] = self.top_allocations
+        return data
+
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Μορφή textfile του node_exporter."""
+        data = self.as_dict()
+        lines = []
+        for field, kind, help_text in (
+            ("count", "items", "Items processed per stage"),
+            ("bytes", "bytes", "Bytes processed per stage"),
+            ("seconds", "seconds", "Time spent per stage"),
+        ):
+            metric = f"pure_core_stage_{kind}_total"
+            lines.append(f"# HELP {metric} {help_text}.")
+            lines.append(f"# TYPE {metric} counter")
+            for stage, values in data["stages"].items():
+                lines.append(f'{metric}{{stage="{stage}"}} {values[field]}')
+        lines.append("# HELP pure_core_elapsed_seconds Wall-clock duration of the run.")
+        lines.append("# TYPE pure_core_elapsed_seconds gauge")
+        lines.append(f"pure_core_elapsed_seconds {data['elapsed_seconds']}")
+        if self.memory_peak is not None:
+            lines.append(
+                "# HELP pure_core_memory_peak_bytes Peak traced Python memory."
+            )
+            lines.append("# TYPE pure_core_memory_peak_bytes gauge")
+            lines.append(f"pure_core_memory_peak_bytes {self.memory_peak}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """Πίνακας για την οθόνη (--stats)."""
+        data = self.as_dict()
+        lines = [
+            f"{'Στάδιο':<8} {'Πλήθος':>10} {'MB':>10} {'Χρόνος (s)':>11} {'MB/s':>9}"
+        ]
+        for stage, values in data["stages"].items():
+            mb = values["bytes"] / 1e6
+            rate = (
+                f"{mb / values['seconds']:.1f}"
+                if values["bytes"] and values["seconds"]
+                else "-"
+            )
+            lines.append(
+                f"{stage:<8} {values['count']:>10} {mb:>10.1f} "
+                f"{values['seconds']:>11.3f} {rate:>9}"
+            )
+        lines.append(f"Συνολικός χρόνος: {data['elapsed_seconds']:.3f} s")
+        if self.memory_peak is not None:
+            lines.append(
+                f"Μέγιστη μνήμη (tracemalloc): {self.memory_peak / 1e6:.1f} MB"
+            )
+            lines.extend(f"  {line}" for line in self.top_allocations)
+        return "\n".join(lines)
+
+
+def _stage_order(stage: str) -> tuple[int, str]:
+    return (STAGES.index(stage) if stage in STAGES else len(STAGES), stage)
+
+
+_active_metrics = Metrics(enabled=False)
+
+
+def get_metrics() -> Metrics:
+    """Οι μετρήσεις που ενημερώνουν τα στάδια."""
+    return _active_metrics
+
+
+def set_metrics(metrics: Optional[Metrics]) -> None:
+    """Ορίζει τις ενεργές μετρήσεις (None = ανενεργές)."""
+    global _active_metrics
+    _active_metrics = metrics if metrics is not None else Metrics(enabled=False)
+
+
+def write_metrics(metrics: Metrics, path: str, fmt: str = "json") -> None:
+    """
+    Γράφει τις μετρήσεις σε JSON ή σε μορφή Prometheus textfile. Το αρχείο
+    αντικαθίσταται ατομικά, ώστε ο collector να μη διαβάσει μισό αρχείο.
+    """
+    content = (
+        metrics.to_prometheus() if fmt == "prometheus" else metrics.to_json() + "\n"
+    )
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def profiling(
+    profile_path: Optional[str] = None,
+    trace_memory: bool = False,
+    metrics: Optional[Metrics] = None,
+) -> Iterator[None]:
+    """
+    Προαιρετικό profiling του σώματος του with: cProfile (τα stats
+    γράφονται στο profile_path, για pstats/snakeviz) και tracemalloc (η
+    μέγιστη μνήμη και οι μεγαλύτερες δεσμεύσεις μπαίνουν στο metrics).
+    """
+    profiler = cProfile.Profile() if profile_path else None
+    if trace_memory:
+        tracemalloc.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+        if trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            if metrics is not None:
+                metrics.memory_peak = peak
+                metrics.top_allocations = [
+                    str(stat)
+                    for stat in snapshot.statistics("lineno")[:TRACEMALLOC_TOP]
+                ]
+
+
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_queue_logging(
+    filename: str = LOG_FILE, level: int = logging.INFO
+) -> Optional[logging.handlers.QueueListener]:
+    """
+    Όπως το logging.basicConfig(filename=...), αλλά η εγγραφή στο αρχείο
+    γίνεται από το thread ενός QueueListener. Δεν κάνει τίποτα αν ο root
+    logger έχει ήδη handlers. Το αρχείο δημιουργείται με το πρώτο μήνυμα.
+    """
+    global _log_listener
+    root = logging.getLogger()
+    if root.handlers:
+        return _log_listener
+    file_handler = logging.FileHandler(filename, encoding="utf-8", delay=True)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _log_listener = logging.handlers.QueueListener(log_queue, file_handler)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    return _log_listener
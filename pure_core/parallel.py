@@ -0,0 +1,85 @@
+"""
+parallel.py
+Βοηθητικά για παράλληλη εκτέλεση (hashing κ.λπ.) με περιορισμένο αριθμό
+εργασιών σε εξέλιξη, ώστε η μνήμη να μένει σταθερή όσο μεγάλο κι αν είναι
+το δέντρο αρχείων.
+
+Τα threads είναι η προεπιλογή: το hashlib απελευθερώνει το GIL για
+μεγάλα buffers, οπότε το hashing κλιμακώνεται σε πολλούς πυρήνες.
+"""
+
+import os
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+# Πόσες εργασίες ανά worker επιτρέπεται να περιμένουν στην ουρά
+IN_FLIGHT_PER_WORKER = 4
+
+
+def default_jobs() -> int:
+    """Προεπιλεγμένος αριθμός workers, με βάση τους διαθέσιμους πυρήνες."""
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def make_executor(jobs: int, use_processes: bool = False) -> Optional[Executor]:
+    """Δημιουργεί pool για jobs > 1, αλλιώς None (σειριακή εκτέλεση)."""
+    if jobs <= 1:
+        return None
+    if use_processes:
+        return ProcessPoolExecutor(max_workers=jobs)
+    return ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="pure_core")
+
+
+def bounded_map(
+    func: Callable[..., Any],
+    items: Iterable[Any],
+    args: Callable[[Any], tuple] = lambda item: (item,),
+    executor: Optional[Executor] = None,
+    max_in_flight: Optional[int] = None,
+) -> Iterator[tuple[Any, Any, Optional[BaseException]]]:
+    """
+    Εφαρμόζει func(*args(item)) σε κάθε item και επιστρέφει
+    (item, αποτέλεσμα, εξαίρεση) με τη σειρά που ολοκληρώνονται.
+
+    Τα items καταναλώνονται τεμπέλικα: ποτέ δεν υπάρχουν περισσότερες από
+    max_in_flight εργασίες σε εξέλιξη, οπότε η ανακάλυψη αρχείων (π.χ. ένας
+    generator πάνω στο os.walk) επικαλύπτεται με το hashing. Χωρίς executor
+    όλα εκτελούνται σειριακά στο τρέχον thread.
+    """
+    if executor is None:
+        for item in items:
+            try:
+                yield item, func(*args(item)), None
+            except Exception as e:
+                yield item, None, e
+        return
+
+    if max_in_flight is None:
+        workers = getattr(executor, "_max_workers", None) or default_jobs()
+        max_in_flight = workers * IN_FLIGHT_PER_WORKER
+
+    in_flight: dict[Future, Any] = {}
+    iterator = iter(items)
+    exhausted = False
+    while True:
+        while not exhausted and len(in_flight) < max_in_flight:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                exhausted = True
+                break
+            in_flight[executor.submit(func, *args(item))] = item
+        if not in_flight:
+            return
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            item = in_flight.pop(future)
+            error = future.exception()
+            yield item, None if error else future.result(), error
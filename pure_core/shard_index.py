@@ -0,0 +1,340 @@
+"""
+shard_index.py
+Σάρωση σε κομμάτια (shards) και συγχώνευση των μερικών αποτελεσμάτων.
+
+Κάθε worker (process ή μηχάνημα) σαρώνει τις ρίζες του και γράφει ένα
+μερικό ευρετήριο: μία γραμμή JSON ανά αρχείο (όνομα, μέγεθος, διαδρομή,
+digests και τα στοιχεία του stat), ταξινομημένη κατά (όνομα, μέγεθος,
+διαδρομή). Η δουλειά μοιράζεται με δύο τρόπους, που συνδυάζονται:
+- κατά υποδέντρο: κάθε worker παίρνει διαφορετικές ρίζες,
+- κατά εύρος hash του ονόματος (shard I/N): κάθε worker κρατά μόνο τα
+  αρχεία με crc32(όνομα) % N == I. Οι ομάδες είναι ανά όνομα, άρα κάθε
+  ομάδα ανήκει ολόκληρη σε ένα shard και το hashing μοιράζεται χωρίς
+  επικάλυψη. Το όνομα είναι γνωστό από το scandir, οπότε stat γίνεται
+  μόνο στα αρχεία του shard· όμως κάθε shard διαβάζει όλους τους
+  φακέλους του δέντρου, άρα για να μοιραστεί και η ανάγνωση καταλόγων
+  χρειάζεται διαμοιρασμός κατά υποδέντρο.
+
+Ο worker ταξινομεί εξωτερικά (runs των SHARD_RUN_SIZE εγγραφών σε
+προσωρινά αρχεία, που συγχωνεύονται στο τέλος) και κάνει hash όσα
+αρχεία συμπίπτουν μέσα στο κομμάτι του. Ο reducer συγχωνεύει τα
+ευρετήρια με k-way merge (heapq.merge) χωρίς να τα φορτώνει στη μνήμη,
+ξαναδιαβάζει το stat των υποψηφίων (τα αρχεία μπορεί να άλλαξαν ή να
+σαρώθηκαν από άλλο μηχάνημα) και συμπληρώνει τα digests που λείπουν,
+δηλαδή των αρχείων που συνέπεσαν μόνο ανάμεσα σε shards.
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import os
+import tempfile
+import zlib
+from typing import IO, Iterable, Iterator, Optional
+
+from pure_core.directory_scanner import scan_files
+from pure_core.duplicate_detector import (
+    entry_metadata,
+    is_valid_directory,
+    staged_hash_pipeline,
+)
+from pure_core.exclusion_config import get_matcher
+from pure_core.file_record import FileRecord
+from pure_core.hash_backends import DEFAULT_ALGORITHM, DEFAULT_READ_SIZE
+from pure_core.hash_cache import HashCache
+
+SHARD_INDEX_VERSION = 1
+
+# Εγγραφές στη μνήμη ανά run της ταξινόμησης και ανά παρτίδα hashing
+SHARD_RUN_SIZE = 100_000
+
+
+def shard_of(name: str, count: int) -> int:
+    """Το shard ενός ονόματος (σταθερό ανάμεσα σε processes και μηχανήματα)."""
+    return zlib.crc32(name.encode("utf-8", "surrogateescape")) % count
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Διαβάζει ένα shard της μορφής "I/N" (0 <= I < N).
+
+    Raises:
+        ValueError: Αν η μορφή δεν είναι έγκυρη.
+    """
+    index, sep, count = spec.partition("/")
+    if not sep or not index.isdigit() or not count.isdigit():
+        raise ValueError(f"Μη έγκυρο shard (αναμένεται I/N): {spec}")
+    if not 0 <= int(index) < int(count):
+        raise ValueError(f"Μη έγκυρο shard (αναμένεται I/N): {spec}")
+    return int(index), int(count)
+
+
+# -------------------------------
+# Μορφή γραμμών
+# -------------------------------
+
+
+def _to_row(info: FileRecord) -> list:
+    return [
+        info.name,
+        info.size,
+        info.path,
+        info.digest.hex() if info.digest is not None else None,
+        info.partial_digest.hex() if info.partial_digest is not None else None,
+        info.ctime_ns,
+        info.mtime_ns,
+        info.device,
+        info.inode,
+    ]
+
+
+def _from_row(row: list, algorithm: str) -> FileRecord:
+    name, size, path, digest, partial, ctime_ns, mtime_ns, device, inode = row
+    info = FileRecord(
+        name, path, size, ctime_ns, mtime_ns, device, inode, algorithm=algorithm
+    )
+    info["hash"] = digest
+    info["partial_hash"] = partial
+    return info
+
+
+def _row_key(row: list) -> tuple:
+    return row[0], row[1], row[2]
+
+
+def _write_rows(f: IO[str], rows: Iterable[list]) -> int:
+    count = 0
+    for row in rows:
+        f.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n")
+        count += 1
+    return count
+
+
+def _read_rows(path: str, skip_header: bool = False) -> Iterator[list]:
+    with open(path, encoding="utf-8") as f:
+        if skip_header:
+            f.readline()
+        for line in f:
+            yield json.loads(line)
+
+
+def read_index_header(path: str) -> dict:
+    """Η επικεφαλίδα ενός μερικού ευρετηρίου.
+
+    Raises:
+        ValueError: Αν το αρχείο δεν είναι ευρετήριο γνωστής έκδοσης.
+    """
+    with open(path, encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+    if header.get("shard_index_version") != SHARD_INDEX_VERSION:
+        raise ValueError(f"Μη υποστηριζόμενο ευρετήριο: {path}")
+    return header
+
+
+def _name_batches(rows: Iterable[list], limit: int) -> Iterator[list[list[list]]]:
+    """
+    Ομάδες ίδιου ονόματος από ταξινομημένες γραμμές, σε παρτίδες των
+    περίπου limit γραμμών (μια ομάδα δεν χωρίζεται ποτέ). Η ίδια διαδρομή
+    από επικαλυπτόμενες ρίζες ή shards κρατιέται μία φορά.
+    """
+    batch: list[list[list]] = []
+    size = 0
+    for _, group_rows in itertools.groupby(rows, key=lambda row: row[0]):
+        group: list[list] = []
+        for row in group_rows:
+            if not group or row[2] != group[-1][2]:
+                group.append(row)
+        batch.append(group)
+        size += len(group)
+        if size >= limit:
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+
+def _name(info: FileRecord) -> str:
+    return info.name
+
+
+# -------------------------------
+# Worker
+# -------------------------------
+
+
+def _sorted_runs(
+    records: Iterable[FileRecord], directory: str, run_size: int
+) -> list[str]:
+    """Πρώτη φάση της εξωτερικής ταξινόμησης: ταξινομημένα runs σε αρχεία."""
+    runs = []
+    records = iter(records)
+    while True:
+        rows = [_to_row(info) for info in itertools.islice(records, run_size)]
+        if not rows:
+            return runs
+        rows.sort(key=_row_key)
+        path = os.path.join(directory, f"run{len(runs)}.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            _write_rows(f, rows)
+        runs.append(path)
+
+
+def build_shard_index(
+    roots: Iterable[str],
+    index_path: str,
+    shard: tuple[int, int] = (0, 1),
+    cache: Optional[HashCache] = None,
+    jobs: int = 1,
+    use_processes: bool = False,
+    *,
+    algorithm: str = DEFAULT_ALGORITHM,
+    read_size: int = DEFAULT_READ_SIZE,
+    run_size: int = SHARD_RUN_SIZE,
+) -> int:
+    """
+    Σαρώνει τις ρίζες και γράφει το μερικό ευρετήριο του shard (I, N),
+    με hash στα αρχεία που συμπίπτουν σε όνομα και μέγεθος μέσα σε αυτό.
+    Το ευρετήριο γράφεται σε προσωρινό αρχείο και αντικαθιστά ατομικά το
+    index_path.
+
+    Returns:
+        int: Πόσα αρχεία γράφτηκαν στο ευρετήριο.
+    """
+    index, count = shard
+    roots = [os.path.abspath(root) for root in roots]
+
+    def shard_records() -> Iterator[FileRecord]:
+        matcher = get_matcher()
+        for root in roots:
+            if not is_valid_directory(root):
+                continue
+            for entry in scan_files(root, matcher=matcher):
+                # Φιλτράρισμα με το όνομα του scandir, πριν από το stat
+                if count > 1 and shard_of(entry.name, count) != index:
+                    continue
+                info = entry_metadata(entry)
+                if info and not matcher.excludes_size(info.size):
+                    yield info
+
+    directory = os.path.dirname(os.path.abspath(index_path))
+    tmp_path = f"{index_path}.part"
+    written = 0
+    with tempfile.TemporaryDirectory(prefix=".pure_core_shard", dir=directory) as tmp:
+        runs = _sorted_runs(shard_records(), tmp, run_size)
+        rows = heapq.merge(*(_read_rows(run) for run in runs), key=_row_key)
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as out:
+                header = {
+                    "shard_index_version": SHARD_INDEX_VERSION,
+                    "shard": f"{index}/{count}",
+                    "roots": roots,
+                    "algorithm": algorithm,
+                }
+                out.write(json.dumps(header, ensure_ascii=False) + "\n")
+                for batch in _name_batches(rows, run_size):
+                    records = [
+                        _from_row(row, algorithm) for group in batch for row in group
+                    ]
+                    hashed = staged_hash_pipeline(
+                        records,
+                        cache,
+                        jobs,
+                        use_processes,
+                        scope=_name,
+                        algorithm=algorithm,
+                        read_size=read_size,
+                    )
+                    written += _write_rows(out, (_to_row(info) for info in hashed))
+            os.replace(tmp_path, index_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    logging.info(f"Ευρετήριο shard {index}/{count}: {written} αρχεία -> {index_path}")
+    return written
+
+
+# -------------------------------
+# Reducer
+# -------------------------------
+
+
+def _refresh(info: FileRecord) -> Optional[FileRecord]:
+    """
+    Η εγγραφή με το τοπικό stat (device/inode αυτού του μηχανήματος). Τα
+    digests κρατιούνται μόνο αν μέγεθος και mtime δεν άλλαξαν.
+    """
+    try:
+        current = FileRecord.from_stat(info.path, info.name, os.stat(info.path))
+    except OSError as e:
+        logging.warning(f"Παράλειψη αρχείου ευρετηρίου: {info.path} -> {e}")
+        return None
+    current.algorithm = info.algorithm
+    if (current.size, current.mtime_ns) == (info.size, info.mtime_ns):
+        current.digest = info.digest
+        current.partial_digest = info.partial_digest
+    return current
+
+
+def index_algorithm(index_paths: Iterable[str]) -> str:
+    """
+    Ο αλγόριθμος hash με τον οποίο φτιάχτηκαν τα ευρετήρια.
+
+    Raises:
+        ValueError: Αν κάποιο αρχείο δεν είναι ευρετήριο ή αν τα ευρετήρια
+            έχουν φτιαχτεί με διαφορετικό αλγόριθμο hash.
+    """
+    algorithms = {read_index_header(path).get("algorithm") for path in index_paths}
+    if len(algorithms) > 1:
+        raise ValueError(
+            f"Ευρετήρια με διαφορετικούς αλγορίθμους: {sorted(algorithms)}"
+        )
+    return algorithms.pop() if algorithms else DEFAULT_ALGORITHM
+
+
+def iter_index_groups(
+    index_paths: Iterable[str],
+    cache: Optional[HashCache] = None,
+    jobs: int = 1,
+    use_processes: bool = False,
+    *,
+    read_size: int = DEFAULT_READ_SIZE,
+    run_size: int = SHARD_RUN_SIZE,
+) -> Iterator[tuple[str, list[FileRecord]]]:
+    """
+    Συγχωνεύει μερικά ευρετήρια και δίνει (όνομα, αρχεία) για κάθε όνομα
+    που εμφανίζεται πάνω από μία φορά σε όλες τις ρίζες, με τα hash
+    συμπληρωμένα όπως στο hash_candidate_groups.
+
+    Raises:
+        ValueError: Αν κάποιο αρχείο δεν είναι ευρετήριο ή αν τα ευρετήρια
+            έχουν φτιαχτεί με διαφορετικό αλγόριθμο hash.
+    """
+    index_paths = list(index_paths)
+    algorithm = index_algorithm(index_paths)
+
+    rows = heapq.merge(
+        *(_read_rows(path, skip_header=True) for path in index_paths), key=_row_key
+    )
+    for batch in _name_batches(rows, run_size):
+        candidates = []
+        for group in batch:
+            if len(group) < 2:
+                continue
+            for row in group:
+                info = _refresh(_from_row(row, algorithm))
+                if info is not None:
+                    candidates.append(info)
+        hashed = staged_hash_pipeline(
+            candidates,
+            cache,
+            jobs,
+            use_processes,
+            scope=_name,
+            algorithm=algorithm,
+            read_size=read_size,
+        )
+        for name, files in itertools.groupby(hashed, key=_name):
+            files = list(files)
+            if len(files) > 1:
+                yield name, files
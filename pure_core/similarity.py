@@ -0,0 +1,258 @@
+"""
+similarity.py
+Ανίχνευση σχεδόν-διπλότυπων σε όλο το δέντρο, ανεξάρτητα από το όνομα.
+
+Κάθε αρχείο χωρίζεται σε chunks με content-defined chunking: υποψήφια
+όρια είναι οι θέσεις μετά από λίγα "σημαδιακά" bytes (αλλαγή γραμμής,
+κενό και τρία σπάνια bytes για binary δεδομένα), που βρίσκονται με regex
+σε C. Ένα υποψήφιο όριο γίνεται όριο όταν το crc32 των τελευταίων
+CDC_WINDOW bytes διαιρείται με το CDC_MODULUS, με ελάχιστο και μέγιστο
+μέγεθος chunk όπως στο FastCDC. Τα όρια εξαρτώνται μόνο από το τοπικό
+περιεχόμενο, άρα μια προσθήκη στην αρχή του αρχείου αλλάζει μόνο τα
+πρώτα chunks. Ένα gear hash byte-προς-byte (FastCDC) σε Python θα ήταν
+τάξεις μεγέθους πιο αργό, αφού το κόστος εδώ είναι ανά υποψήφιο όριο.
+
+Τα fingerprints των chunks συνοψίζονται σε υπογραφή MinHash (one
+permutation hashing: το ελάχιστο fingerprint σε κάθε bin) και οι
+υπογραφές μπαίνουν σε LSH (bands), οπότε συγκρίνονται μόνο τα ζεύγη
+που μοιράζονται κάποιο band και όχι όλα με όλα.
+
+Με HashCache οι υπογραφές αποθηκεύονται στον πίνακα hashes, με το ίδιο
+κλειδί (device, inode, size, mtime_ns) και kind "minhash<bins>", οπότε
+μια επόμενη σάρωση διαβάζει μόνο τα αρχεία που άλλαξαν.
+"""
+
+import hashlib
+import logging
+import re
+import struct
+import zlib
+from collections import defaultdict
+from typing import Iterable, Iterator, Optional
+
+from pure_core.duplicate_detector import _cache_key, iter_directory_state
+from pure_core.file_record import FileRecord
+from pure_core.hash_cache import HashCache
+from pure_core.parallel import bounded_map, make_executor
+
+# Ελάχιστο/μέγιστο μέγεθος chunk (bytes)
+CDC_MIN_SIZE = 2 * 1024
+CDC_MAX_SIZE = 64 * 1024
+
+# Bytes μετά από τα οποία μπορεί να μπει όριο (όχι το 0x00, ώστε περιοχές
+# με μηδενικά να κόβονται στο μέγιστο μέγεθος και όχι στο ελάχιστο)
+CDC_ANCHORS = re.compile(b"[\n \x17\x8f\xe5]")
+
+# Bytes πριν από το υποψήφιο όριο που κρίνουν αν θα γίνει όριο
+CDC_WINDOW = 16
+
+# Ένα στα CDC_MODULUS υποψήφια όρια γίνεται όριο (κατά μέσο όρο)
+CDC_MODULUS = 64
+
+# Μπλοκ ανάγνωσης για το chunking (η μνήμη ανά αρχείο μένει ~READ + MAX)
+CDC_READ_SIZE = 4 * 1024 * 1024
+
+# MinHash/LSH: bins της υπογραφής = LSH_BANDS * LSH_ROWS
+LSH_BANDS = 32
+LSH_ROWS = 4
+
+DEFAULT_SIMILARITY = 0.8
+
+# "Αλγόριθμος" των υπογραφών στην HashCache· αλλάζει αν αλλάξει το chunking
+SIGNATURE_ALGORITHM = "cdc1"
+
+
+def _find_boundary(
+    buffer: bytes, view: memoryview, start: int, stop: int
+) -> Optional[int]:
+    for match in CDC_ANCHORS.finditer(buffer, start, stop):
+        end = match.end()
+        if zlib.crc32(view[end - CDC_WINDOW : end]) % CDC_MODULUS == 0:
+            return end
+    return None
+
+
+def iter_chunk_fingerprints(
+    path: str, min_size: int = CDC_MIN_SIZE, max_size: int = CDC_MAX_SIZE
+) -> Iterator[int]:
+    """Δίνει ένα fingerprint (64-bit) για κάθε content-defined chunk του αρχείου."""
+    buffer = b""
+    eof = False
+    with open(path, "rb") as f:
+        while True:
+            if not eof and len(buffer) < max_size:
+                block = f.read(CDC_READ_SIZE)
+                eof = not block
+                buffer += block
+                continue
+            if not buffer:
+                return
+            view = memoryview(buffer)
+            start = 0
+            while start < len(buffer):
+                limit = start + max_size
+                if limit > len(buffer) and not eof:
+                    break
+                limit = min(limit, len(buffer))
+                end = _find_boundary(
+                    buffer, view, start + max(min_size, CDC_WINDOW), limit
+                )
+                if end is None:
+                    end = limit
+                yield int.from_bytes(
+                    hashlib.blake2b(view[start:end], digest_size=8).digest(), "little"
+                )
+                start = end
+            view.release()
+            buffer = buffer[start:]
+            if eof and not buffer:
+                return
+
+
+def minhash_signature(
+    fingerprints: Iterable[int], num_bins: int = LSH_BANDS * LSH_ROWS
+) -> tuple[Optional[int], ...]:
+    """Υπογραφή MinHash με one permutation hashing (None για άδειο bin)."""
+    signature: list[Optional[int]] = [None] * num_bins
+    for fp in fingerprints:
+        slot = fp % num_bins
+        current = signature[slot]
+        if current is None or fp < current:
+            signature[slot] = fp
+    return tuple(signature)
+
+
+def estimate_similarity(a: tuple, b: tuple) -> float:
+    """Εκτίμηση Jaccard από δύο υπογραφές (bins που δεν είναι άδεια και στις δύο)."""
+    used = equal = 0
+    for x, y in zip(a, b):
+        if x is None and y is None:
+            continue
+        used += 1
+        equal += x == y
+    return equal / used if used else 0.0
+
+
+class SimilarityIndex:
+    """Υπογραφές MinHash ανά αρχείο με LSH buckets για υποψήφια ζεύγη."""
+
+    def __init__(self, bands: int = LSH_BANDS, rows: int = LSH_ROWS):
+        self.bands = bands
+        self.rows = rows
+        self.signatures: dict[str, tuple] = {}
+        self._buckets: dict[tuple, list[str]] = defaultdict(list)
+
+    @property
+    def num_bins(self) -> int:
+        return self.bands * self.rows
+
+    def add(self, path: str, signature: tuple) -> None:
+        """Προσθέτει την υπογραφή (minhash_signature με num_bins bins) ενός αρχείου."""
+        self.signatures[path] = signature
+        for band in range(self.bands):
+            rows = signature[band * self.rows : (band + 1) * self.rows]
+            # Band χωρίς chunks θα ταίριαζε με κάθε μικρό αρχείο
+            if any(r is not None for r in rows):
+                self._buckets[(band, rows)].append(path)
+
+    def candidate_pairs(self) -> set[tuple[str, str]]:
+        pairs: set[tuple[str, str]] = set()
+        for paths in self._buckets.values():
+            for i, a in enumerate(paths):
+                for b in paths[i + 1 :]:
+                    pairs.add((a, b) if a < b else (b, a))
+        return pairs
+
+    def near_duplicates(
+        self, threshold: float = DEFAULT_SIMILARITY
+    ) -> list[tuple[str, str, float]]:
+        """Ζεύγη (a, b, ομοιότητα) με ομοιότητα >= threshold, φθίνουσα σειρά."""
+        results = []
+        for a, b in self.candidate_pairs():
+            similarity = estimate_similarity(self.signatures[a], self.signatures[b])
+            if similarity >= threshold:
+                results.append((a, b, similarity))
+        results.sort(key=lambda r: (-r[2], r[0], r[1]))
+        return results
+
+
+def file_signature(path: str, num_bins: int = LSH_BANDS * LSH_ROWS) -> tuple:
+    """Η υπογραφή MinHash των chunks ενός αρχείου."""
+    return minhash_signature(iter_chunk_fingerprints(path), num_bins)
+
+
+def pack_signature(signature: tuple) -> bytes:
+    """Υπογραφή -> bytes: bitmap των bins που δεν είναι άδεια και οι τιμές τους."""
+    used = 0
+    values = []
+    for slot, value in enumerate(signature):
+        if value is not None:
+            used |= 1 << slot
+            values.append(value)
+    mask = used.to_bytes((len(signature) + 7) // 8, "little")
+    return mask + struct.pack(f"<{len(values)}Q", *values)
+
+
+def unpack_signature(data: bytes, num_bins: int) -> tuple:
+    """Το αντίστροφο του pack_signature."""
+    mask_size = (num_bins + 7) // 8
+    used = int.from_bytes(data[:mask_size], "little")
+    values = iter(struct.unpack(f"<{(len(data) - mask_size) // 8}Q", data[mask_size:]))
+    return tuple(next(values) if used >> slot & 1 else None for slot in range(num_bins))
+
+
+def _signature_kind(num_bins: int) -> str:
+    return f"minhash{num_bins}"
+
+
+def find_near_duplicates(
+    base_path: str,
+    threshold: float = DEFAULT_SIMILARITY,
+    jobs: int = 1,
+    cache: Optional[HashCache] = None,
+) -> list[tuple[str, str, float]]:
+    """
+    Σαρώνει το base_path και επιστρέφει ζεύγη αρχείων με εκτιμώμενη
+    ομοιότητα περιεχομένου >= threshold, όποιο κι αν είναι το όνομά τους.
+    Τα άδεια αρχεία αγνοούνται. Με cache διαβάζονται μόνο τα αρχεία χωρίς
+    αποθηκευμένη υπογραφή.
+    """
+    index = SimilarityIndex()
+    kind = _signature_kind(index.num_bins)
+
+    def uncached() -> Iterator[FileRecord]:
+        for info in iter_directory_state(base_path):
+            if not info.size:
+                continue
+            if cache is not None:
+                data = cache.get(
+                    *_cache_key(info), kind=kind, algorithm=SIGNATURE_ALGORITHM
+                )
+                if data is not None:
+                    index.add(info.path, unpack_signature(data, index.num_bins))
+                    continue
+            yield info
+
+    executor = make_executor(jobs)
+    try:
+        for info, signature, error in bounded_map(
+            file_signature,
+            uncached(),
+            args=lambda info: (info.path, index.num_bins),
+            executor=executor,
+        ):
+            if error is not None:
+                logging.warning(f"Σφάλμα chunking: {info.path} -> {error}")
+                continue
+            if cache is not None:
+                cache.put(
+                    *_cache_key(info),
+                    pack_signature(signature),
+                    kind=kind,
+                    algorithm=SIGNATURE_ALGORITHM,
+                )
+            index.add(info.path, signature)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return index.near_duplicates(threshold)
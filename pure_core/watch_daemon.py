@@ -0,0 +1,653 @@
+"""
+watch_daemon.py
+Συνεχής λειτουργία (daemon): μία αρχική σάρωση και μετά ενημέρωση ενός
+ευρετηρίου στη μνήμη από τις αλλαγές του δέντρου.
+
+Οι αλλαγές έρχονται από το inotify του Linux (μέσω ctypes, χωρίς
+εξωτερικές βιβλιοθήκες) ή, όπου δεν υπάρχει, από περιοδική αυξητική
+σάρωση (IncrementalScanner). Κάθε διαδρομή που αλλάζει περνά από
+debounce: ελέγχεται μόνο αφού μείνει ήσυχη για debounce δευτερόλεπτα,
+ώστε μια σειρά εγγραφών στο ίδιο αρχείο να κοστίζει ένα stat και ένα
+hash. Hash γίνεται μόνο στα αρχεία που δημιουργήθηκαν ή άλλαξαν και
+μόνο αν το όνομά τους υπάρχει και αλλού· για τα υπόλοιπα αρχεία της
+ομάδας χρησιμοποιούνται τα digests που ήδη υπάρχουν στο ευρετήριο.
+
+Οι ομάδες που άλλαξαν δίνονται στο on_group (π.χ. διαγραφή διπλών και
+συγχώνευση εκδόσεων, όπως στην κανονική εκτέλεση). Οι τρέχουσες ομάδες
+διπλοτύπων διαβάζονται από άλλη διεργασία μέσω Unix socket
+(QueryServer / query_daemon).
+"""
+
+import copy
+import ctypes
+import ctypes.util
+import errno
+import json
+import logging
+import os
+import select
+import socket
+import socketserver
+import stat as stat_module
+import struct
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Iterable, Iterator, Optional
+
+from pure_core.directory_scanner import is_readable_stat, scan_files
+from pure_core.directory_snapshot import IncrementalScanner
+from pure_core.duplicate_detector import staged_hash_pipeline, version_key
+from pure_core.exclusion_config import get_matcher
+from pure_core.file_record import FileRecord
+from pure_core.hash_backends import DEFAULT_ALGORITHM, DEFAULT_READ_SIZE
+from pure_core.hash_cache import HashCache
+
+# Δευτερόλεπτα ησυχίας πριν ελεγχθεί μια διαδρομή που άλλαξε
+DEFAULT_DEBOUNCE = 2.0
+
+# Διάστημα ανάμεσα στις σαρώσεις όταν δεν υπάρχει inotify
+DEFAULT_POLL_INTERVAL = 30.0
+
+# Σημαίες του inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_ONLYDIR
+)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _identity(record: FileRecord) -> tuple[int, int, int, int]:
+    """(συσκευή, inode, μέγεθος, mtime): αν δεν αλλάξει, τα digests ισχύουν."""
+    return (record.device, record.inode, record.size, record.mtime_ns)
+
+
+class LiveIndex:
+    """Εγγραφές όλων των αρχείων, ανά διαδρομή, ανά όνομα και ανά φάκελο."""
+
+    def __init__(self) -> None:
+        self.files: dict[str, FileRecord] = {}
+        self.by_name: dict[str, set[str]] = defaultdict(set)
+        # Φάκελος -> τα αρχεία του και φάκελος -> οι υποφάκελοι με αρχεία,
+        # ώστε το remove_tree να μην περνά από όλο το ευρετήριο
+        self.by_dir: dict[str, set[str]] = {}
+        self.subdirs: dict[str, set[str]] = {}
+
+    def update(self, record: FileRecord) -> bool:
+        """
+        Προσθέτει ή ενημερώνει μια εγγραφή. Αν το αρχείο δεν άλλαξε (inode,
+        μέγεθος, mtime) κρατά τα digests του και επιστρέφει False. Ένα νέο
+        hardlink παίρνει τα digests του inode από την ομάδα του.
+        """
+        key = _identity(record)
+        old = self.files.get(record.path)
+        if old is not None and _identity(old) == key:
+            return False
+        paths = self.by_name[record.name]
+        for path in paths:
+            other = self.files[path]
+            if other.digest is not None and _identity(other) == key:
+                record.digest = other.digest
+                record.partial_digest = other.partial_digest
+                record.algorithm = other.algorithm
+                break
+        if old is None:
+            self._link(record.path)
+        self.files[record.path] = record
+        paths.add(record.path)
+        return True
+
+    def remove(self, path: str) -> Optional[str]:
+        """Αφαιρεί μια διαδρομή· επιστρέφει το όνομά της αν υπήρχε."""
+        record = self.files.pop(path, None)
+        if record is None:
+            return None
+        paths = self.by_name[record.name]
+        paths.discard(path)
+        if not paths:
+            del self.by_name[record.name]
+        self._unlink(path)
+        return record.name
+
+    def remove_tree(self, directory: str) -> set[str]:
+        """Αφαιρεί όλα τα αρχεία κάτω από έναν φάκελο· επιστρέφει τα ονόματά τους."""
+        doomed: list[str] = []
+        stack = [directory.rstrip(os.sep) or os.sep]
+        while stack:
+            current = stack.pop()
+            doomed.extend(self.by_dir.get(current, ()))
+            stack.extend(self.subdirs.get(current, ()))
+        return {name for name in map(self.remove, doomed) if name is not None}
+
+    def _link(self, path: str) -> None:
+        """Καταχωρεί το αρχείο στον φάκελό του και τον φάκελο στους προγόνους του."""
+        directory = os.path.dirname(path)
+        files = self.by_dir.get(directory)
+        if files is None:
+            files = self.by_dir[directory] = set()
+            child, parent = directory, os.path.dirname(directory)
+            while parent != child:
+                children = self.subdirs.setdefault(parent, set())
+                if child in children:
+                    break
+                children.add(child)
+                child, parent = parent, os.path.dirname(parent)
+        files.add(path)
+
+    def _unlink(self, path: str) -> None:
+        """Το αντίστροφο του _link· οι φάκελοι που άδειασαν αφαιρούνται."""
+        directory = os.path.dirname(path)
+        files = self.by_dir.get(directory)
+        if files is None:
+            return
+        files.discard(path)
+        if files:
+            return
+        del self.by_dir[directory]
+        while directory not in self.by_dir and not self.subdirs.get(directory):
+            self.subdirs.pop(directory, None)
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                break
+            children = self.subdirs.get(parent)
+            if children is not None:
+                children.discard(directory)
+            directory = parent
+
+    def publish(self, records: Iterable[FileRecord]) -> None:
+        """
+        Αντιγράφει τα digests από αντίγραφα που έγιναν hash εκτός lock,
+        μόνο σε εγγραφές που δεν άλλαξαν στο μεταξύ.
+        """
+        for record in records:
+            current = self.files.get(record.path)
+            if current is None or _identity(current) != _identity(record):
+                continue
+            current.digest = record.digest
+            current.partial_digest = record.partial_digest
+            current.algorithm = record.algorithm
+
+    def group(self, name: str) -> list[FileRecord]:
+        return [self.files[p] for p in sorted(self.by_name.get(name, ()))]
+
+    def duplicate_groups(self) -> dict[str, list[list[str]]]:
+        """Για κάθε όνομα με πολλά αρχεία: οι διαδρομές ανά version_key."""
+        groups = {}
+        for name, paths in self.by_name.items():
+            if len(paths) < 2:
+                continue
+            versions: dict = defaultdict(list)
+            for path in sorted(paths):
+                versions[version_key(self.files[path])].append(path)
+            groups[name] = sorted(versions.values())
+        return dict(sorted(groups.items()))
+
+
+class Debouncer:
+    """
+    Κρατά διαδρομές μέχρι να μείνουν ήσυχες για delay δευτερόλεπτα. Μια
+    διαδρομή μένει σημειωμένη ως φάκελος αν έστω ένα γεγονός της ήταν φακέλου.
+    """
+
+    def __init__(self, delay: float = DEFAULT_DEBOUNCE):
+        self.delay = delay
+        self._pending: dict[str, tuple[float, bool]] = {}
+
+    def touch(
+        self, path: str, now: Optional[float] = None, is_dir: bool = False
+    ) -> None:
+        previous = self._pending.get(path)
+        if previous is not None:
+            is_dir = is_dir or previous[1]
+        self._pending[path] = (time.monotonic() if now is None else now, is_dir)
+
+    def ready(self, now: Optional[float] = None) -> list[tuple[str, bool]]:
+        """(διαδρομή, φάκελος) χωρίς γεγονός για delay δευτερόλεπτα (αφαιρούνται)."""
+        now = time.monotonic() if now is None else now
+        due = [
+            (path, is_dir)
+            for path, (last, is_dir) in self._pending.items()
+            if now - last >= self.delay
+        ]
+        for path, _ in due:
+            del self._pending[path]
+        return due
+
+    def next_deadline(self) -> Optional[float]:
+        if not self._pending:
+            return None
+        return min(last for last, _ in self._pending.values()) + self.delay
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+# -------------------------------
+# Πηγές αλλαγών
+# -------------------------------
+
+
+class InotifyWatcher:
+    """
+    Παρακολουθεί αναδρομικά ένα δέντρο με inotify. Οι αποκλεισμένοι
+    φάκελοι (ExclusionMatcher) δεν παρακολουθούνται.
+
+    Raises:
+        OSError: Αν το inotify δεν είναι διαθέσιμο (άλλο OS, όριο watches).
+    """
+
+    def __init__(self, root: str):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError(errno.ENOSYS, "Δεν βρέθηκε η libc για το inotify")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "Το inotify δεν υποστηρίζεται")
+        self.root = os.path.abspath(root)
+        self._matcher = get_matcher()
+        self._dirs: dict[int, str] = {}
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        try:
+            self._watch_tree(self.root)
+        except BaseException:
+            self.close()
+            raise
+
+    def _add_watch(self, directory: str) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            code = ctypes.get_errno()
+            if code == errno.ENOSPC:
+                raise OSError(
+                    code,
+                    "Εξαντλήθηκαν τα inotify watches (fs.inotify.max_user_watches)",
+                )
+            logging.warning(
+                f"Αδυναμία παρακολούθησης φακέλου: {directory} -> {os.strerror(code)}"
+            )
+            return
+        self._dirs[wd] = directory
+
+    def _watch_tree(self, top: str) -> None:
+        self._add_watch(top)
+        stack = [top]
+        while stack:
+            try:
+                entries = list(os.scandir(stack.pop()))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir(
+                    follow_symlinks=False
+                ) and not self._matcher.excludes_dir(entry.path, entry.name):
+                    self._add_watch(entry.path)
+                    stack.append(entry.path)
+
+    def _files_under(self, directory: str) -> Iterator[str]:
+        return (
+            entry.path
+            for entry in scan_files(directory, lambda path: None, self._matcher)
+        )
+
+    def poll(self, timeout: float) -> Optional[list[tuple[str, bool]]]:
+        """
+        (διαδρομή, φάκελος) για ό,τι άλλαξε (αρχεία, ή φάκελοι που
+        αφαιρέθηκαν), ή None αν χάθηκαν γεγονότα (overflow) και χρειάζεται
+        πλήρης έλεγχος.
+        """
+        ready, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not ready:
+            return []
+        changed: list[tuple[str, bool]] = []
+        overflow = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, name)
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        if not self._matcher.excludes_dir(path, name):
+                            self._watch_tree(path)
+                            changed.extend((p, False) for p in self._files_under(path))
+                    elif mask & (IN_DELETE | IN_MOVED_FROM):
+                        changed.append((path, True))
+                else:
+                    changed.append((path, False))
+        return None if overflow else changed
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """Εναλλακτική του inotify: αυξητική σάρωση κάθε interval δευτερόλεπτα."""
+
+    def __init__(
+        self,
+        root: str,
+        interval: float = DEFAULT_POLL_INTERVAL,
+        scanner: Optional[IncrementalScanner] = None,
+    ):
+        self.root = os.path.abspath(root)
+        self.interval = interval
+        self._snapshot = scanner.snapshot if scanner is not None else None
+        self._next_scan = time.monotonic() + interval
+
+    def poll(self, timeout: float) -> Optional[list[tuple[str, bool]]]:
+        wait = self._next_scan - time.monotonic()
+        if wait > timeout:
+            time.sleep(max(timeout, 0))
+            return []
+        time.sleep(max(wait, 0))
+        scanner = IncrementalScanner(self._snapshot)
+        for _ in scanner.scan(self.root):
+            pass
+        self._snapshot = scanner.snapshot
+        self._next_scan = time.monotonic() + self.interval
+        delta = scanner.delta
+        return [(path, False) for path in delta.added + delta.modified + delta.removed]
+
+    def close(self) -> None:
+        pass
+
+
+# -------------------------------
+# Daemon
+# -------------------------------
+
+
+class WatchDaemon:
+    """
+    Ευρετήριο ενός δέντρου που μένει ενημερωμένο από τις αλλαγές του.
+
+    Args:
+        root: Ο φάκελος που παρακολουθείται.
+        on_group: Καλείται με (όνομα, αρχεία με hash) για κάθε ομάδα
+            ονόματος που άλλαξε και έχει πάνω από ένα αρχείο.
+        use_inotify: False για να χρησιμοποιηθεί μόνο η περιοδική σάρωση.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        on_group: Optional[Callable[[str, list[FileRecord]], None]] = None,
+        cache: Optional[HashCache] = None,
+        *,
+        algorithm: str = DEFAULT_ALGORITHM,
+        read_size: int = DEFAULT_READ_SIZE,
+        debounce: float = DEFAULT_DEBOUNCE,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        use_inotify: bool = True,
+    ):
+        self.root = os.path.abspath(root)
+        self.on_group = on_group
+        self.cache = cache
+        self.algorithm = algorithm
+        self.read_size = read_size
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.index = LiveIndex()
+        self.debouncer = Debouncer(debounce)
+        self.lock = threading.Lock()
+        self.watcher = None
+        self._matcher = get_matcher()
+
+    def start(self) -> None:
+        """Ξεκινά την παρακολούθηση, κάνει την αρχική σάρωση και χειρίζεται ομάδες."""
+        # Το watch μπαίνει πριν τη σάρωση, ώστε να μη χαθούν αλλαγές ανάμεσα
+        if self.use_inotify:
+            try:
+                self.watcher = InotifyWatcher(self.root)
+            except OSError as e:
+                logging.warning(
+                    f"Χωρίς inotify ({e}), περιοδική σάρωση ανά {self.poll_interval}s"
+                )
+        scanner = IncrementalScanner()
+        with self.lock:
+            for record in scanner.scan(self.root):
+                self.index.update(record)
+            names = [
+                name for name, paths in self.index.by_name.items() if len(paths) > 1
+            ]
+        if self.watcher is None:
+            self.watcher = PollingWatcher(self.root, self.poll_interval, scanner)
+        logging.info(f"Watch: {len(self.index.files)} αρχεία στο {self.root}")
+        self._refresh_names(names)
+
+    def step(self, timeout: float = 1.0) -> int:
+        """
+        Περιμένει αλλαγές έως timeout και χειρίζεται όσες διαδρομές έμειναν
+        ήσυχες για debounce. Επιστρέφει πόσες διαδρομές ελέγχθηκαν.
+        """
+        deadline = self.debouncer.next_deadline()
+        if deadline is not None:
+            timeout = min(timeout, max(deadline - time.monotonic(), 0))
+        changed = self.watcher.poll(timeout)
+        if changed is None:
+            logging.warning("Watch: χάθηκαν γεγονότα, πλήρης έλεγχος του δέντρου")
+            self._resync_all()
+            return 0
+        now = time.monotonic()
+        for path, is_dir in changed:
+            self.debouncer.touch(path, now, is_dir)
+        ready = self.debouncer.ready()
+        if ready:
+            self._apply_paths(ready)
+        return len(ready)
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        """Εκτελεί step() μέχρι να οριστεί το stop (ή για πάντα)."""
+        while stop is None or not stop.is_set():
+            self.step()
+
+    def close(self) -> None:
+        if self.watcher is not None:
+            self.watcher.close()
+
+    def duplicate_groups(self) -> dict[str, list[list[str]]]:
+        with self.lock:
+            return self.index.duplicate_groups()
+
+    def _record(self, path: str) -> Optional[FileRecord]:
+        """Η εγγραφή ενός αρχείου από stat, ή None αν δεν υπάρχει ή αποκλείεται."""
+        try:
+            st = os.stat(path, follow_symlinks=False)
+        except OSError:
+            return None
+        name = os.path.basename(path)
+        if (
+            not stat_module.S_ISREG(st.st_mode)
+            or not is_readable_stat(st)
+            or self._matcher.excludes_file(path, name)
+            or self._matcher.excludes_size(st.st_size)
+        ):
+            return None
+        return FileRecord.from_stat(path, name, st)
+
+    def _apply_paths(self, paths: Iterable[tuple[str, bool]]) -> None:
+        """Ενημερώνει το ευρετήριο για (διαδρομή, φάκελος) που έμειναν ήσυχες."""
+        changed_names: set[str] = set()
+        with self.lock:
+            for path, is_dir in paths:
+                # Μόνο φάκελος που αφαιρέθηκε ή μετακινήθηκε αφορά όλο το υποδέντρο
+                if is_dir:
+                    changed_names |= self.index.remove_tree(path)
+                record = self._record(path)
+                if record is not None:
+                    if self.index.update(record):
+                        changed_names.add(record.name)
+                    continue
+                name = self.index.remove(path)
+                if name is not None:
+                    changed_names.add(name)
+        self._refresh_names(changed_names)
+
+    def _resync_all(self) -> None:
+        """
+        Πλήρης σάρωση σε νέο ευρετήριο, που αντικαθιστά το παλιό με μία
+        ανάθεση υπό το lock· τα ερωτήματα δεν περιμένουν τη σάρωση. Το
+        παλιό ευρετήριο διαβάζεται χωρίς lock, αφού το αλλάζει μόνο αυτό
+        το thread.
+        """
+        old = self.index
+        index = LiveIndex()
+        changed_names: set[str] = set()
+        for record in IncrementalScanner().scan(self.root):
+            known = old.files.get(record.path)
+            if known is not None and _identity(known) == _identity(record):
+                record = known
+            else:
+                changed_names.add(record.name)
+            index.update(record)
+        changed_names.update(
+            record.name for path, record in old.files.items() if path not in index.files
+        )
+        with self.lock:
+            self.index = index
+        self._refresh_names(changed_names)
+
+    def _refresh_names(self, names: Iterable[str]) -> None:
+        """Hash στα αρχεία χωρίς digest των ομάδων και χειρισμός τους με το on_group."""
+        for name in sorted(names):
+            files = self._hash_group(name)
+            if len(files) < 2 or self.on_group is None:
+                continue
+            self.on_group(name, files)
+            # Οι ενέργειες (διαγραφή/σύνδεση/συγχώνευση) αλλάζουν την ομάδα·
+            # το ευρετήριο ενημερώνεται χωρίς να ξανακληθεί το on_group
+            with self.lock:
+                for info in files:
+                    record = self._record(info.path)
+                    if record is None:
+                        self.index.remove(info.path)
+                    else:
+                        self.index.update(record)
+            self._hash_group(name)
+
+    def _hash_group(self, name: str) -> list[FileRecord]:
+        """
+        Η ομάδα ενός ονόματος, με hash μόνο στα αρχεία που δεν έχουν digest.
+        Το hash γίνεται σε αντίγραφα χωρίς το lock (ώστε τα ερωτήματα να μην
+        περιμένουν τις αναγνώσεις) και τα digests περνούν στο ευρετήριο μετά.
+        """
+        with self.lock:
+            files = [copy.copy(record) for record in self.index.group(name)]
+        if len(files) < 2:
+            return files
+        files = staged_hash_pipeline(
+            files, self.cache, algorithm=self.algorithm, read_size=self.read_size
+        )
+        with self.lock:
+            self.index.publish(files)
+        return files
+
+
+# -------------------------------
+# Ερωτήματα μέσω Unix socket
+# -------------------------------
+
+
+class _QueryHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        command = self.rfile.readline().decode("utf-8").strip() or "groups"
+        daemon: WatchDaemon = self.server.daemon_ref  # type: ignore[attr-defined]
+        if command == "groups":
+            reply = {"groups": daemon.duplicate_groups()}
+        elif command == "stats":
+            with daemon.lock:
+                reply = {
+                    "files": len(daemon.index.files),
+                    "names": len(daemon.index.by_name),
+                    "pending": len(daemon.debouncer),
+                }
+        else:
+            reply = {"error": f"Άγνωστη εντολή: {command}"}
+        self.wfile.write((json.dumps(reply, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+class QueryServer:
+    """
+    Unix socket που απαντά σε "groups" / "stats" με JSON (σε δικό του thread).
+
+    Raises:
+        FileExistsError: Αν στη διαδρομή υπάρχει κάτι που δεν είναι socket
+            (ένα socket που έμεινε από προηγούμενη εκτέλεση αφαιρείται).
+    """
+
+    def __init__(self, path: str, daemon: WatchDaemon):
+        self.path = path
+        try:
+            st = os.lstat(path)
+        except FileNotFoundError:
+            pass
+        else:
+            if not stat_module.S_ISSOCK(st.st_mode):
+                raise FileExistsError(
+                    errno.EEXIST, "Η διαδρομή υπάρχει και δεν είναι socket", path
+                )
+            os.remove(path)
+        self._server = socketserver.ThreadingUnixStreamServer(path, _QueryHandler)
+        self._server.daemon_threads = True
+        self._server.daemon_ref = daemon  # type: ignore[attr-defined]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="pure_core_query", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def query_daemon(path: str, command: str = "groups", timeout: float = 10.0) -> dict:
+    """Στέλνει εντολή σε daemon που τρέχει και επιστρέφει την απάντηση."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(f"{command}\n".encode("utf-8"))
+        with sock.makefile("rb") as reply:
+            return json.loads(reply.readline() or b"{}")
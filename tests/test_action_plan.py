@@ -0,0 +1,192 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import platform
+from unittest import mock
+
+if platform.system() == "Darwin":
+    raise unittest.SkipTest("Skipping all tests on macOS")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pure_core import action_plan  # type: ignore
+from pure_core.action_plan import (  # type: ignore
+    PlanWriter,
+    execute_plan,
+    independent_batches,
+    plan_group,
+    read_plan,
+    version_chain,
+)
+from pure_core.duplicate_detector import get_file_metadata, group_files_by_hash  # type: ignore
+
+
+class TestActionPlan(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.plan_path = os.path.join(self.test_dir, "plan.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, rel, content):  # type: ignore
+        path = os.path.join(self.test_dir, "tree", rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return get_file_metadata(path)
+
+    def _plan(self, files, **kwargs):  # type: ignore
+        with PlanWriter(self.plan_path) as plan:
+            for action in plan_group(group_files_by_hash(files), **kwargs):
+                plan.write(action)
+        return list(read_plan(self.plan_path))
+
+    def test_plan_is_dry_run_with_digests(self):
+        a = self._write("a/dup.txt", "same")
+        b = self._write("b/dup.txt", "same")
+
+        actions = self._plan([a, b])
+
+        self.assertEqual([x["action"] for x in actions], ["delete"])
+        self.assertEqual(actions[0]["path"]["digest"], b["hash"])
+        self.assertTrue(os.path.exists(a["path"]) and os.path.exists(b["path"]))
+
+    def test_plan_uses_run_algorithm(self):
+        a = self._write("a/dup.txt", "same")
+        b = self._write("b/dup.txt", "same")
+
+        actions = self._plan([a, b], algorithm="blake2b")
+
+        expected = action_plan.file_digest(b["path"], "blake2b").hex()
+        self.assertEqual(actions[0]["path"]["algorithm"], "blake2b")
+        self.assertEqual(actions[0]["path"]["digest"], expected)
+        self.assertEqual(actions[0]["keep"]["digest"], expected)
+
+    def test_execute_plan_applies_actions(self):
+        a = self._write("a/dup.txt", "same")
+        b = self._write("b/dup.txt", "same")
+        old = self._write("c/notes.txt", "old\n")
+        new = self._write("d/notes.txt", "old\nnew\n")
+        old.ctime_ns, new.ctime_ns = 1, 2
+        self._plan([a, b])
+        actions = list(read_plan(self.plan_path))
+        with open(self.plan_path, "a", encoding="utf-8") as f:
+            for action in plan_group(
+                group_files_by_hash([old, new]), merge_strategy="diff"
+            ):
+                f.write(json.dumps({"id": len(actions), **action}) + "\n")
+
+        totals = execute_plan(self.plan_path, jobs=2)
+
+        self.assertEqual(totals["done"], 2)
+        self.assertFalse(os.path.exists(b["path"]))
+        self.assertFalse(os.path.exists(new["path"]))
+        with open(old["path"], encoding="utf-8") as f:
+            self.assertEqual(f.read().count("old"), 1)
+
+    def test_execute_plan_skips_changed_files(self):
+        a = self._write("a/dup.txt", "same")
+        b = self._write("b/dup.txt", "same")
+        self._plan([a, b])
+        with open(b["path"], "w", encoding="utf-8") as f:
+            f.write("changed")
+
+        totals = execute_plan(self.plan_path)
+
+        self.assertEqual(totals["skipped"], 1)
+        self.assertTrue(os.path.exists(b["path"]))
+
+    def test_execute_plan_verifies_keep_once_per_batch(self):
+        files = [self._write(f"{d}/dup.txt", "same") for d in "abcd"]
+        self._plan(files)
+        digest = action_plan.file_digest
+
+        with mock.patch.object(action_plan, "file_digest", wraps=digest) as calls:
+            totals = execute_plan(self.plan_path)
+        self.assertEqual(totals["done"], 3)
+        # Το keep μία φορά και κάθε διπλό μία φορά
+        self.assertEqual(calls.call_count, 4)
+
+    def test_execute_plan_non_cryptographic_compares_bytes_once(self):
+        files = [self._write(f"{d}/dup.txt", "same") for d in "abc"]
+        self._plan(files)
+        digest = action_plan.file_digest
+
+        with (
+            mock.patch.object(action_plan, "is_cryptographic", return_value=False),
+            mock.patch.object(action_plan, "file_digest", wraps=digest) as calls,
+        ):
+            totals = execute_plan(self.plan_path)
+        self.assertEqual(totals["done"], 2)
+        self.assertEqual(calls.call_count, 1)
+
+    def test_execute_plan_resumes_from_checkpoint(self):
+        files = [self._write(f"{d}/dup.txt", "same") for d in "abc"]
+        self._plan(files)
+        checkpoint = os.path.join(self.test_dir, "plan.done")
+
+        with mock.patch.object(
+            action_plan, "execute_action", side_effect=["done", KeyboardInterrupt()]
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                execute_plan(self.plan_path, checkpoint)
+
+        totals = execute_plan(self.plan_path, checkpoint)
+        self.assertEqual(totals["resumed"], 1)
+        self.assertEqual(totals["done"], 1)
+
+    def test_independent_batches_split_by_directory(self):
+        def action(keep, path):  # type: ignore
+            return {"action": "delete", "keep": {"path": keep}, "path": {"path": path}}
+
+        batches = independent_batches(
+            [action("/a/x", "/b/x"), action("/c/y", "/d/y"), action("/b/z", "/e/z")]
+        )
+        self.assertEqual(sorted(len(b) for b in batches), [1, 2])
+
+    def test_version_chain_orders_once_by_recorded_times(self):
+        files = [self._write(f"{d}/notes.txt", f"version {d}\n") for d in "abcd"]
+        for info, ctime in zip(files, (30, 10, 20, 10)):
+            info.ctime_ns = ctime
+        hashes = group_files_by_hash(files)
+
+        with mock.patch("os.stat", side_effect=AssertionError("stat")):
+            oldest = version_chain(hashes)
+        self.assertEqual(
+            [f["path"] for _, f in oldest], [files[i]["path"] for i in (1, 3, 2, 0)]
+        )
+        self.assertEqual(
+            [kind for kind, _ in oldest], ["version", "random", "version", "version"]
+        )
+
+        newest = version_chain(hashes, "newest")
+        self.assertEqual(
+            [f["path"] for _, f in newest], [f["path"] for _, f in reversed(oldest)]
+        )
+
+    def test_plan_merges_version_chain_in_one_action(self):
+        files = [self._write(f"{d}/notes.txt", f"shared\n{d}\n") for d in "abc"]
+        for ctime, info in enumerate(files):
+            info.ctime_ns = ctime
+        self._plan(files, merge_strategy="diff")
+
+        (action,) = read_plan(self.plan_path)
+        self.assertEqual(action["target"]["path"], files[0]["path"])
+        self.assertEqual(
+            [s["path"] for s in action["sources"]], [f["path"] for f in files[1:]]
+        )
+
+        totals = execute_plan(self.plan_path)
+        self.assertEqual(totals["done"], 1)
+        self.assertFalse(any(os.path.exists(f["path"]) for f in files[1:]))
+        with open(files[0]["path"], encoding="utf-8") as f:
+            merged = f.read()
+        self.assertEqual(merged.count("shared"), 1)
+        self.assertTrue(all(d in merged for d in "abc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import unittest
+import zipfile
+import platform
+from unittest import mock
+
+if platform.system() == "Darwin":
+    raise unittest.SkipTest("Skipping all tests on macOS")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pure_core import archive_scanner  # type: ignore
+from pure_core.archive_scanner import (  # type: ignore
+    ArchiveScanner,
+    hash_stream,
+    is_archive,
+    is_virtual,
+    without_virtual,
+)
+from pure_core.duplicate_detector import (  # type: ignore
+    file_digest,
+    group_files_by_hash,
+    iter_directory_state,
+    partial_file_hash,
+    staged_hash_pipeline,
+)
+from pure_core.file_sync_manager import confirmed_duplicate, delete_duplicates  # type: ignore
+from pure_core.hash_cache import HashCache  # type: ignore
+
+
+class TestArchiveScanner(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.big = os.urandom(300_000)
+        self.live = self._write("live/big.bin", self.big)
+        self._write("live/note.txt", b"hello\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, rel, content):  # type: ignore
+        path = os.path.join(self.test_dir, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def _zip(self, rel):  # type: ignore
+        path = os.path.join(self.test_dir, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("docs/big.bin", self.big)
+            archive.writestr("docs/", b"")
+            archive.writestr("other.txt", b"other\n")
+        return path
+
+    def _tar(self, rel):  # type: ignore
+        path = os.path.join(self.test_dir, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tarfile.open(path, "w:gz") as archive:
+            archive.add(os.path.join(self.test_dir, "live"), arcname="live")
+        return path
+
+    def _records(self, scanner):  # type: ignore
+        return list(scanner.scan(iter_directory_state(self.test_dir)))
+
+    def test_is_archive(self):
+        self.assertTrue(is_archive("/x/a.ZIP"))
+        self.assertTrue(is_archive("/x/a.tar.gz"))
+        self.assertFalse(is_archive("/x/a.gz"))
+
+    def test_hash_stream_matches_file_hashes(self):
+        with open(self.live, "rb") as f:
+            digest, partial, size = hash_stream(f, read_size=40_000)
+        self.assertEqual(size, len(self.big))
+        self.assertEqual(digest, file_digest(self.live))
+        self.assertEqual(partial, partial_file_hash(self.live, size)[0])
+
+    def test_members_become_virtual_records(self):
+        zip_path = self._zip("backup/a.zip")
+        tar_path = self._tar("backup/b.tar.gz")
+        records = self._records(ArchiveScanner())
+        virtual = {r.path: r for r in records if is_virtual(r)}
+        self.assertEqual(
+            sorted(virtual),
+            sorted(
+                [
+                    f"{zip_path}!docs/big.bin",
+                    f"{zip_path}!other.txt",
+                    f"{tar_path}!live/big.bin",
+                    f"{tar_path}!live/note.txt",
+                ]
+            ),
+        )
+        member = virtual[f"{zip_path}!docs/big.bin"]
+        self.assertEqual(
+            (member.name, member.size, member.archive), ("big.bin", 300_000, zip_path)
+        )
+        self.assertEqual(member.digest, file_digest(self.live))
+
+    def test_pipeline_groups_members_with_live_files(self):
+        self._zip("backup/a.zip")
+        tar_path = self._tar("backup/b.tar.gz")
+        scanner = ArchiveScanner()
+        records = staged_hash_pipeline(
+            scanner.scan(iter_directory_state(self.test_dir))
+        )
+        big = [r for r in records if r.name == "big.bin"]
+        hashes = group_files_by_hash(big)
+        self.assertEqual(len(hashes), 1)
+        self.assertEqual(len(big), 3)
+        real = without_virtual(hashes)
+        self.assertEqual(list(real), [file_digest(self.live)])
+        self.assertEqual([r.path for r in real[file_digest(self.live)]], [self.live])
+        note = next(r for r in records if r.path == f"{tar_path}!live/note.txt")
+        rebuilt = scanner.record_for(note.path)
+        self.assertEqual(
+            (rebuilt.name, rebuilt.size, rebuilt.digest, rebuilt.archive),
+            (note.name, note.size, note.digest, note.archive),
+        )
+        self.assertIsNone(scanner.record_for(f"{tar_path}!live/missing.txt"))
+
+    def test_unchanged_archives_are_not_decompressed_again(self):
+        zip_path = self._zip("backup/a.zip")
+        shutil.copy(zip_path, os.path.join(self.test_dir, "backup/copy.zip"))
+        cache_path = os.path.join(self.test_dir, "cache.sqlite")
+        with HashCache(cache_path) as cache:
+            scanner = ArchiveScanner(cache)
+            first = self._records(scanner)
+        self.assertEqual((scanner.archives, scanner.expanded), (2, 1))
+        with HashCache(cache_path) as cache:
+            scanner = ArchiveScanner(cache)
+            second = self._records(scanner)
+            # Με cache δεν μένουν μέλη στη μνήμη· το record_for τα ξαναβρίσκει
+            self.assertEqual(scanner._members, {})
+            copy_path = os.path.join(self.test_dir, "backup/copy.zip")
+            member = scanner.record_for(f"{copy_path}!other.txt")
+            self.assertEqual((member.archive, member.name), (copy_path, "other.txt"))
+        self.assertEqual((scanner.archives, scanner.expanded), (2, 0))
+        self.assertEqual(
+            sorted((r.path, r.digest) for r in first if is_virtual(r)),
+            sorted((r.path, r.digest) for r in second if is_virtual(r)),
+        )
+
+    def test_archive_digest_is_computed_while_streaming(self):
+        zip_path = self._zip("backup/a.zip")
+        tar_path = self._tar("backup/b.tar.gz")
+        # Μέλος με data descriptor (γραμμένο σε ροή χωρίς seek)
+        with zipfile.ZipFile(self._zip("backup/c.zip"), "a") as archive:
+            with archive.open("streamed.bin", "w", force_zip64=True) as member:
+                member.write(self.big[:70_000])
+        expected = {p: file_digest(p) for p in (zip_path, tar_path)}
+        expected[os.path.join(self.test_dir, "backup/c.zip")] = file_digest(
+            os.path.join(self.test_dir, "backup/c.zip")
+        )
+        cache_path = os.path.join(self.test_dir, "cache.sqlite")
+        with HashCache(cache_path) as cache:
+            scanner = ArchiveScanner(cache)
+            with mock.patch.object(
+                archive_scanner,
+                "file_digest",
+                side_effect=AssertionError("δεύτερη ανάγνωση"),
+            ):
+                records = self._records(scanner)
+            archives = {r.path: r.digest for r in records if r.path in expected}
+            self.assertEqual(archives, expected)
+            self.assertEqual(cache.get(*self._key(zip_path)), expected[zip_path])
+        self.assertEqual(scanner.expanded, 3)
+
+    @staticmethod
+    def _key(path):  # type: ignore
+        st = os.stat(path)
+        return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+    def test_broken_archive_is_skipped(self):
+        self._write("backup/broken.zip", b"not a zip")
+        scanner = ArchiveScanner()
+        records = self._records(scanner)
+        self.assertFalse(any(is_virtual(r) for r in records))
+        self.assertEqual(scanner.archives, 0)
+
+    def test_virtual_records_are_never_acted_on(self):
+        zip_path = self._zip("backup/a.zip")
+        scanner = ArchiveScanner()
+        self._records(scanner)
+        member = scanner.record_for(f"{zip_path}!docs/big.bin")
+        live = scanner.record_for(self.live)
+        self.assertFalse(confirmed_duplicate(member, live))
+        self.assertFalse(confirmed_duplicate(live, member))
+        delete_duplicates([member, live])
+        delete_duplicates([live, member])
+        self.assertTrue(os.path.exists(self.live))
+        self.assertTrue(os.path.exists(zip_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
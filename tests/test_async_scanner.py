@@ -0,0 +1,118 @@
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import platform
+from concurrent.futures import ThreadPoolExecutor
+
+if platform.system() == "Darwin":
+    raise unittest.SkipTest("Skipping all tests on macOS")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pure_core.async_scanner import (  # type: ignore
+    MountLimiter,
+    inspect_directory_state_async,
+    scan_directory_async,
+    scan_directory_blocking,
+)
+from pure_core.duplicate_detector import inspect_directory_state, iter_directory_state  # type: ignore
+
+
+class TestAsyncScanner(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        files = {
+            "a/same.txt": "duplicate",
+            "b/same.txt": "duplicate",
+            "b/deep/er/other.txt": "duplicate",
+            "c/unique.txt": "unique content",
+            "c/big1.bin": "x" * 200_000,
+            "c/big2.bin": "x" * 199_999 + "y",
+            "root.txt": "",
+            "node_modules/ignored.txt": "duplicate",
+        }
+        for rel, content in files.items():
+            path = os.path.join(self.test_dir, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(content)
+        os.link(
+            os.path.join(self.test_dir, "a", "same.txt"),
+            os.path.join(self.test_dir, "a", "same_link.txt"),
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    @staticmethod
+    def _summary(records):  # type: ignore
+        return [(r.path, r.size, r.digest, r.partial_digest) for r in records]
+
+    def test_scan_matches_sync_order(self):
+        self.assertEqual(
+            [r.path for r in scan_directory_blocking(self.test_dir, concurrency=8)],
+            [r.path for r in iter_directory_state(self.test_dir)],
+        )
+
+    def test_scan_stays_within_concurrency(self):
+        active = 0
+        peak = 0
+
+        class CountingLimiter(MountLimiter):
+            async def run(self, device, func, *args):  # type: ignore
+                nonlocal active, peak
+                active += 1
+                peak = max(peak, active)
+                try:
+                    return await super().run(device, func, *args)
+                finally:
+                    active -= 1
+
+        async def run():  # type: ignore
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                limiter = CountingLimiter(executor, per_mount=16)
+                return await scan_directory_async(self.test_dir, limiter, concurrency=2)
+
+        records = asyncio.run(run())
+        self.assertEqual(
+            [r.path for r in records],
+            [r.path for r in iter_directory_state(self.test_dir)],
+        )
+        self.assertLessEqual(peak, 2)
+
+    def test_inspect_matches_sync_api(self):
+        expected = self._summary(inspect_directory_state(self.test_dir))
+        result = asyncio.run(
+            inspect_directory_state_async(self.test_dir, concurrency=4)
+        )
+        self.assertEqual(self._summary(result), expected)
+
+    def test_per_mount_limit(self):
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def blocking():  # type: ignore
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.01)
+            with lock:
+                active -= 1
+
+        async def run():  # type: ignore
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                limiter = MountLimiter(executor, per_mount=3)
+                await asyncio.gather(*(limiter.run(1, blocking) for _ in range(12)))
+
+        asyncio.run(run())
+        self.assertEqual(peak, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
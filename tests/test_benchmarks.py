@@ -0,0 +1,87 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import platform
+
+if platform.system() == "Darwin":
+    raise unittest.SkipTest("Skipping all tests on macOS")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.run_benchmarks import StatCounter, compare_to_baseline  # type: ignore
+from benchmarks.synthetic_tree import generate_tree  # type: ignore
+
+
+class TestSyntheticTree(unittest.TestCase):
+    def setUp(self):
+        self.dirs = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+
+    def tearDown(self):
+        for d in self.dirs:
+            shutil.rmtree(d)
+
+    def _snapshot(self, root):  # type: ignore
+        result = {}
+        for current, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(current, name)
+                with open(path, "rb") as f:
+                    result[os.path.relpath(path, root)] = (
+                        f.read(),
+                        os.stat(path).st_mtime,
+                    )
+        return result
+
+    def test_generation_is_deterministic(self):
+        for root in self.dirs:
+            generate_tree(root, "same_name_diff_content", seed=7, scale=0.02)
+        self.assertEqual(self._snapshot(self.dirs[0]), self._snapshot(self.dirs[1]))
+
+
+class TestBaselineComparison(unittest.TestCase):
+    def _results(self, files_per_sec, stat_calls=10):  # type: ignore
+        stage = {"files_per_sec": files_per_sec, "stat_calls": stat_calls}
+        return {"scale": 1.0, "profiles": {"p": {"stages": {"hash": stage}}}}
+
+    def test_slower_stage_is_reported(self):
+        regressions = compare_to_baseline(self._results(50), self._results(100), 0.1)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("p/hash", regressions[0])
+
+    def test_within_tolerance_passes(self):
+        self.assertEqual(
+            compare_to_baseline(self._results(95), self._results(100), 0.1), []
+        )
+
+    def test_extra_stat_calls_are_reported(self):
+        regressions = compare_to_baseline(
+            self._results(100, stat_calls=11), self._results(100), 0.1
+        )
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("stat", regressions[0])
+
+
+class TestStatCounter(unittest.TestCase):
+    def test_counts_stat_and_scandir(self):
+        root = tempfile.mkdtemp()
+        try:
+            for name in ("a", "b"):
+                with open(os.path.join(root, name), "w") as f:
+                    f.write(name)
+            original = os.stat
+            with StatCounter() as counter:
+                os.stat(root)
+                with os.scandir(root) as entries:
+                    for entry in entries:
+                        entry.stat()
+                        entry.stat()
+                        self.assertTrue(entry.is_file())
+            self.assertIs(os.stat, original)
+            self.assertEqual((counter.stats, counter.scandirs), (3, 1))
+        finally:
+            shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    unittest.main()
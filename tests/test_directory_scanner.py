@@ -0,0 +1,56 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import platform
+from unittest import mock
+
+if platform.system() == "Darwin":
+    raise unittest.SkipTest("Skipping all tests on macOS")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pure_core.directory_scanner import scan_files  # type: ignore
+
+
+class TestDirectoryScanner(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        for rel in ("a.txt", "sub/b.txt", "sub/deeper/c.txt", "node_modules/pkg/x.js"):
+            path = os.path.join(self.test_dir, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(rel)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_yields_regular_files(self):
+        names = sorted(entry.name for entry in scan_files(self.test_dir))
+        self.assertEqual(names, ["a.txt", "b.txt", "c.txt"])
+
+    def test_excluded_dirs_are_never_listed(self):
+        real_scandir = os.scandir
+        listed = []
+
+        def spy(path):
+            listed.append(path)
+            return real_scandir(path)
+
+        with mock.patch("os.scandir", side_effect=spy):
+            list(scan_files(self.test_dir))
+        self.assertFalse(any("node_modules" in p for p in listed))
+        self.assertEqual(len(listed), 3)
+
+    @unittest.skipIf(os.name == "nt", "Symlinks need privileges on Windows")
+    def test_skipped_entries_reported_in_same_pass(self):
+        broken = os.path.join(self.test_dir, "broken.lnk")
+        os.symlink(os.path.join(self.test_dir, "missing"), broken)
+        skipped = []
+        names = [e.name for e in scan_files(self.test_dir, on_skipped=skipped.append)]
+        self.assertEqual(skipped, [broken])
+        self.assertNotIn("broken.lnk", names)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+import platform
+from unittest import mock
+
+if platform.system() == "Darwin":
+    raise unittest.SkipTest("Skipping all tests on macOS")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pure_core import duplicate_detector  # type: ignore
+from pure_core.directory_snapshot import (  # type: ignore
+    DirectorySnapshot,
+    IncrementalScanner,
+)
+from pure_core.duplicate_detector import rescan_directory  # type: ignore
+
+OLD_MTIME = 1_000_000_000_000_000_000
+
+
+class TestIncrementalRescan(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.tree = os.path.join(self.test_dir, "tree")
+        self.snapshot = os.path.join(self.test_dir, "state", "snapshot.json.gz")
+        for rel, content in (
+            ("a/same.txt", "duplicate"),
+            ("b/same.txt", "duplicate"),
+            ("c/keep.txt", "keep"),
+            ("c/gone.txt", "gone"),
+        ):
+            self._write(rel, content)
+        # Παλιά mtimes, ώστε το δέντρο να μην είναι "racily clean"
+        for directory, _, names in os.walk(self.tree):
+            for path in [directory] + [os.path.join(directory, n) for n in names]:
+                os.utime(path, ns=(OLD_MTIME, OLD_MTIME))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, rel, content, mtime=None):  # type: ignore
+        path = os.path.join(self.tree, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        if mtime is not None:
+            os.utime(path, ns=(mtime, mtime))
+        return path
+
+    def test_first_run_reports_everything_added(self):
+        records, delta = rescan_directory(self.tree, self.snapshot)
+        self.assertEqual(len(records), 4)
+        self.assertEqual(len(delta.added), 4)
+        self.assertTrue(os.path.exists(self.snapshot))
+
+    def test_unchanged_rescan_lists_nothing_and_hashes_nothing(self):
+        rescan_directory(self.tree, self.snapshot)
+        with (
+            mock.patch("os.scandir") as scandir,
+            mock.patch.object(duplicate_detector, "_compute_digest") as compute,
+        ):
+            records, delta = rescan_directory(self.tree, self.snapshot)
+        scandir.assert_not_called()
+        compute.assert_not_called()
+        self.assertEqual(delta, ([], [], []))
+        same = [r for r in records if r.name == "same.txt"]
+        self.assertEqual(same[0].digest, same[1].digest)
+        self.assertIsNotNone(same[0].digest)
+
+    def test_delta_reports_changes(self):
+        rescan_directory(self.tree, self.snapshot)
+        os.remove(os.path.join(self.tree, "c", "gone.txt"))
+        new_path = self._write("c/new.txt", "new")
+        changed = self._write("a/same.txt", "changed content", mtime=123_000_000_000)
+
+        records, delta = rescan_directory(self.tree, self.snapshot)
+        self.assertEqual(delta.added, [new_path])
+        self.assertEqual(delta.removed, [os.path.join(self.tree, "c", "gone.txt")])
+        self.assertEqual(delta.modified, [changed])
+        self.assertEqual(len(records), 4)
+
+    def test_racily_clean_directory_is_relisted(self):
+        directory = os.path.join(self.tree, "c")
+        os.utime(directory, ns=(0, time.time_ns()))
+        rescan_directory(self.tree, self.snapshot)
+        # Νέο αρχείο στον ίδιο χρονικό κόκκο: το mtime του φακέλου δεν αλλάζει
+        mtime = os.stat(directory).st_mtime_ns
+        new_path = self._write("c/late.txt", "late")
+        os.utime(directory, ns=(mtime, mtime))
+
+        records, delta = rescan_directory(self.tree, self.snapshot)
+        self.assertEqual(delta.added, [new_path])
+        self.assertIn(new_path, [r.path for r in records])
+
+    def test_racily_clean_file_is_rehashed(self):
+        path = self._write("c/keep.txt", "keep", mtime=time.time_ns())
+        rescan_directory(self.tree, self.snapshot)
+        st = os.stat(path)
+        self._write("c/keep.txt", "KEEP", mtime=st.st_mtime_ns)
+
+        records, _ = rescan_directory(self.tree, self.snapshot)
+        record = next(r for r in records if r.path == path)
+        self.assertEqual(record.digest, hashlib.sha256(b"KEEP").digest())
+
+    def test_refresh_drops_files_removed_by_the_run(self):
+        scanner = IncrementalScanner(DirectorySnapshot.load(self.snapshot))
+        list(scanner.scan(self.tree))
+        gone = os.path.join(self.tree, "b", "same.txt")
+        kept = os.path.join(self.tree, "a", "same.txt")
+        os.remove(gone)
+        self._write("a/same.txt", "duplicate, merged")
+
+        duplicate_detector.save_scan_snapshot(scanner, self.snapshot, [gone, kept])
+        saved = DirectorySnapshot.load(self.snapshot)
+        self.assertNotIn(gone, saved.files)
+        self.assertNotIn("same.txt", saved.dirs[os.path.dirname(gone)][2])
+        self.assertEqual(saved.files[kept].size, len("duplicate, merged"))
+        self.assertIsNone(saved.files[kept].digest)
+        # Το delta περιγράφει τη σάρωση, όχι τις ενέργειες
+        self.assertIn(gone, scanner.delta.added)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,16 +4,20 @@ import sys
 import tempfile
 import unittest
 import platform
+from unittest import mock
 
 if platform.system() == "Darwin":
     raise unittest.SkipTest("Skipping all tests on macOS")
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pure_core import duplicate_detector  # type: ignore
 from pure_core.duplicate_detector import inspect_directory_state  # type: ignore
+from pure_core.duplicate_detector import group_files_by_hash, staged_hash_pipeline  # type: ignore
+from pure_core.duplicate_detector import get_file_metadata  # type: ignore
+from pure_core.duplicate_detector import StreamingGrouper, iter_name_groups  # type: ignore
 from pure_core.exclusion_config import is_system_path  # type: ignore
 
 
-
 class TestDuplicateDetector(unittest.TestCase):
     def setUp(self):
         self.test_dir = tempfile.mkdtemp()
@@ -83,6 +87,102 @@ class TestDuplicateDetector(unittest.TestCase):
         result = inspect_directory_state(self.test_dir)
         self.assertFalse(any("ignored.pyc" in f["path"] for f in result))
 
+    def _write(self, name, data):  # type: ignore
+        path = os.path.join(self.test_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return get_file_metadata(path, with_hash=False)
+
+    def test_staged_pipeline_skips_unique_sizes(self):
+        unique = self._write("unique.bin", b"x" * 5)
+        a = self._write("a.bin", b"abc")
+        b = self._write("b.bin", b"abc")
+
+        with mock.patch.object(
+            duplicate_detector,
+            "partial_file_hash",
+            wraps=duplicate_detector.partial_file_hash,
+        ) as partial:
+            staged_hash_pipeline([unique, a, b])
+
+        hashed = {call.args[0] for call in partial.call_args_list}
+        self.assertNotIn(unique["path"], hashed)
+        self.assertIsNone(unique["hash"])
+        self.assertEqual(a["hash"], b["hash"])
+
+    def test_staged_pipeline_full_hash_on_partial_collision(self):
+        head, tail = b"H" * 16, b"T" * 16
+        same1 = self._write("same1.bin", head + b"middle" + tail)
+        same2 = self._write("same2.bin", head + b"middle" + tail)
+        other = self._write("other.bin", head + b"MIDDLE" + tail)
+
+        with mock.patch.object(duplicate_detector, "PARTIAL_BLOCK_SIZE", 16):
+            staged_hash_pipeline([same1, same2, other])
+
+        self.assertEqual(same1["partial_hash"], other["partial_hash"])
+        self.assertEqual(same1["hash"], same2["hash"])
+        self.assertNotEqual(same1["hash"], other["hash"])
+        groups = group_files_by_hash([same1, same2, other])
+        self.assertEqual(sorted(len(g) for g in groups.values()), [1, 2])
+
+    def test_staged_pipeline_does_not_hash_hardlinks(self):
+        a = self._write("a.bin", b"abc")
+        os.link(a["path"], os.path.join(self.test_dir, "a_link.bin"))
+        link = get_file_metadata(
+            os.path.join(self.test_dir, "a_link.bin"), with_hash=False
+        )
+
+        with mock.patch.object(duplicate_detector, "_compute_digest") as compute:
+            staged_hash_pipeline([a, link])
+        compute.assert_not_called()
+        self.assertEqual(len(group_files_by_hash([a, link])), 1)
+
+    def test_staged_pipeline_hashes_each_inode_once(self):
+        a = self._write("a.bin", b"abc")
+        os.link(a["path"], os.path.join(self.test_dir, "a_link.bin"))
+        link = get_file_metadata(
+            os.path.join(self.test_dir, "a_link.bin"), with_hash=False
+        )
+        b = self._write("b.bin", b"abc")
+
+        with mock.patch.object(
+            duplicate_detector,
+            "_compute_digest",
+            wraps=duplicate_detector._compute_digest,
+        ) as compute:
+            staged_hash_pipeline([a, link, b])
+        self.assertEqual(compute.call_count, 2)
+        self.assertEqual(a["hash"], link["hash"])
+        self.assertEqual(a["hash"], b["hash"])
+
+    def test_group_by_hash_keeps_unhashed_files_apart(self):
+        small = self._write("v.txt", b"one")
+        large = self._write("v2.txt", b"three")
+        staged_hash_pipeline([small, large])
+        self.assertEqual(len(group_files_by_hash([small, large])), 2)
+
+    def test_iter_name_groups_only_yields_colliding_names(self):
+        self._write("lonely.txt", b"only one of me")
+        groups = dict(iter_name_groups(self.test_dir))
+        self.assertEqual(list(groups), ["example.txt"])
+        self.assertEqual(len(groups["example.txt"]), 3)
+        self.assertEqual(len({f["hash"] for f in groups["example.txt"]}), 2)
+
+    def test_streaming_grouper_keeps_only_paths_for_singletons(self):
+        grouper = StreamingGrouper(lambda f: f["name"])
+        a = self._write("a.txt", b"a")
+        grouper.add(a)
+        self.assertEqual(grouper._singletons, {"a.txt": a["path"]})
+        self.assertEqual(grouper.groups(), {})
+
+        other = get_file_metadata(a["path"], with_hash=False)
+        other.path = os.path.join(self.diff_dir, "a.txt")
+        grouper.add(other)
+        self.assertEqual(grouper._singletons, {})
+        self.assertEqual(
+            [f["path"] for f in grouper.groups()["a.txt"]], [a["path"], other["path"]]
+        )
+
     @unittest.skipIf(os.name == "nt", "System path simulation not reliable on Windows")
     def test_is_system_path_override(self):
         self.assertTrue(is_system_path("/proc/fake_entry"))
@@ -0,0 +1,98 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import platform
+from unittest import mock
+
+if platform.system() == "Darwin":
+    raise unittest.SkipTest("Skipping all tests on macOS")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pure_core.directory_scanner import scan_files  # type: ignore
+from pure_core.duplicate_detector import iter_directory_state  # type: ignore
+from pure_core.exclusion_config import ExclusionMatcher, set_matcher  # type: ignore
+
+
+class TestExclusionMatcher(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        set_matcher(None)
+        shutil.rmtree(self.root)
+
+    def _path(self, rel):  # type: ignore
+        return os.path.join(self.root, *rel.split("/"))
+
+    def _write(self, rel, content="x"):  # type: ignore
+        path = self._path(rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_glob_rules(self):
+        m = ExclusionMatcher(
+            patterns=["*.tmp", "build/", "/top.txt", "docs/**/draft*"], root=self.root
+        )
+        self.assertTrue(m.excludes_file(self._path("x/y.tmp")))
+        self.assertTrue(m.excludes_dir(self._path("x/build")))
+        self.assertFalse(m.excludes_file(self._path("x/build")))
+        self.assertTrue(m.excludes_file(self._path("top.txt")))
+        self.assertFalse(m.excludes_file(self._path("x/top.txt")))
+        self.assertTrue(m.excludes_file(self._path("docs/a/b/draft1")))
+        self.assertFalse(m.excludes_file(self._path("docs/a/final")))
+
+    def test_negation_last_rule_wins(self):
+        m = ExclusionMatcher(patterns=["*.log", "!keep.log"], root=self.root)
+        self.assertTrue(m.excludes_file(self._path("a/debug.log")))
+        self.assertFalse(m.excludes_file(self._path("a/keep.log")))
+
+    def test_rule_file_is_relative_to_its_directory(self):
+        rules = self._write("proj/.ignore", "# comment\n\n/out/\n*.o\n")
+        m = ExclusionMatcher(rule_files=[rules])
+        self.assertTrue(m.excludes_dir(self._path("proj/out")))
+        self.assertFalse(m.excludes_dir(self._path("proj/src/out")))
+        self.assertTrue(m.excludes_file(self._path("proj/src/main.o")))
+        self.assertFalse(m.excludes_file(self._path("other/main.o")))
+
+    def test_extension_and_size_filters(self):
+        m = ExclusionMatcher(extensions=["TMP", ".bak"], min_size=10, max_size=100)
+        self.assertTrue(m.excludes_file(self._path("a.tmp")))
+        self.assertTrue(m.excludes_file(self._path("a.BAK")))
+        self.assertFalse(m.excludes_file(self._path("a.txt")))
+        self.assertTrue(m.excludes_size(5))
+        self.assertFalse(m.excludes_size(50))
+        self.assertTrue(m.excludes_size(500))
+
+    def test_scan_prunes_matching_dirs_before_listing(self):
+        self._write("src/a.py")
+        self._write("src/build/gen/b.py")
+        self._write("src/c.tmp")
+        matcher = ExclusionMatcher(patterns=["build/", "*.tmp"], root=self.root)
+
+        real_scandir = os.scandir
+        listed = []
+
+        def spy(path):
+            listed.append(path)
+            return real_scandir(path)
+
+        with mock.patch("os.scandir", side_effect=spy):
+            names = [e.name for e in scan_files(self.root, matcher=matcher)]
+        self.assertEqual(names, ["a.py"])
+        self.assertFalse(any("build" in p for p in listed))
+
+    def test_active_matcher_applies_size_filter(self):
+        self._write("small.txt", "x")
+        self._write("large.txt", "x" * 100)
+        set_matcher(ExclusionMatcher(min_size=10))
+        self.assertEqual(
+            [r.name for r in iter_directory_state(self.root)], ["large.txt"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import sys
+import unittest
+import platform
+from datetime import datetime
+
+if platform.system() == "Darwin":
+    raise unittest.SkipTest("Skipping all tests on macOS")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pure_core.file_record import FileRecord, FileTable  # type: ignore
+
+
+class TestFileRecord(unittest.TestCase):
+    def _record(self, path="/data/docs/report.txt", digest=None):  # type: ignore
+        return FileRecord(
+            os.path.basename(path),
+            path,
+            42,
+            1_600_000_000_000_000_000,
+            1_700_000_000_000_000_000,
+            3,
+            99,
+            digest,
+        )
+
+    def test_has_no_instance_dict(self):
+        self.assertFalse(hasattr(self._record(), "__dict__"))
+
+    def test_dict_style_access(self):
+        record = self._record(digest=bytes(range(32)))
+        self.assertEqual(record["name"], "report.txt")
+        self.assertEqual(record["hash"], bytes(range(32)).hex())
+        self.assertIsInstance(record["created"], datetime)
+        self.assertEqual(record["modified"], datetime.fromtimestamp(1_700_000_000))
+        self.assertIsNone(record.get("partial_hash"))
+        with self.assertRaises(KeyError):
+            record["missing"]
+
+    def test_hex_assignment_stored_raw(self):
+        record = self._record()
+        record["hash"] = "ab" * 32
+        self.assertEqual(record.digest, b"\xab" * 32)
+
+    def test_file_table_round_trip(self):
+        table = FileTable()
+        first = self._record("/data/docs/a.txt", digest=b"\x01" * 32)
+        second = self._record("/data/docs/b.txt")
+        table.append(first)
+        table.append(second)
+
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.dirs, ["/data/docs"])
+        restored = list(table)
+        self.assertEqual([r.path for r in restored], [first.path, second.path])
+        self.assertEqual(restored[0].digest, first.digest)
+        self.assertIsNone(restored[1].digest)
+        self.assertEqual(restored[1].mtime_ns, second.mtime_ns)
+
+
+if __name__ == "__main__":
+    unittest.main()
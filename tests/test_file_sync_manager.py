@@ -4,16 +4,17 @@ import sys
 import tempfile
 import unittest
 import platform
+from unittest import mock
 
 if platform.system() == "Darwin":
     raise unittest.SkipTest("Skipping all tests on macOS")
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from pure_core.file_sync_manager import delete_duplicates  # type: ignore
+from pure_core import file_sync_manager  # type: ignore
+from pure_core.file_sync_manager import delete_duplicates, link_duplicates  # type: ignore
 from pure_core.file_sync_manager import merge_by_version_date, merge_random_conflict
 
 
-
 class TestFileSyncManager(unittest.TestCase):
     def setUp(self):
         self.test_dir = tempfile.mkdtemp()
@@ -73,6 +74,20 @@ class TestFileSyncManager(unittest.TestCase):
             self.assertIn("Merged random conflict", content)
             self.assertTrue("First version" in content or "Second version" in content)
 
+    def test_merge_random_conflict_diff_strategy(self):
+        f1 = self._create_file("a/conflict.txt", "shared\nfirst\n")
+        f2 = self._create_file("b/conflict.txt", "shared\nsecond\n")
+
+        merge_random_conflict(f1, f2, "diff")
+
+        remaining = [f["path"] for f in (f1, f2) if os.path.exists(f["path"])]
+        self.assertEqual(len(remaining), 1)
+        with open(remaining[0], "r", encoding="utf-8") as f:
+            content = f.read()
+        self.assertEqual(content.count("shared"), 1)
+        self.assertIn("first", content)
+        self.assertIn("second", content)
+
     def test_delete_duplicates(self):
         os.makedirs(os.path.join(self.test_dir, "d1"))
         os.makedirs(os.path.join(self.test_dir, "d2"))
@@ -86,6 +101,76 @@ class TestFileSyncManager(unittest.TestCase):
         existing = [p for p in files if os.path.exists(p)]
         self.assertEqual(len(existing), 1)
 
+    def test_delete_duplicates_verifies_weak_hash(self):
+        os.makedirs(os.path.join(self.test_dir, "d1"))
+        os.makedirs(os.path.join(self.test_dir, "d2"))
+
+        f1 = self._create_file("d1/dup.txt", "Same content")
+        f2 = self._create_file("d2/dup.txt", "Other stuff!")
+        # Ίδιο (ψεύτικο) μη κρυπτογραφικό hash, διαφορετικό περιεχόμενο
+        for f in (f1, f2):
+            f.update(hash="00" * 16, algorithm="xxh3_128")
+
+        delete_duplicates([f1, f2])
+
+        self.assertTrue(os.path.exists(f1["path"]))
+        self.assertTrue(os.path.exists(f2["path"]))
+
+    def test_link_duplicates_hardlink(self):
+        f1 = self._create_file("d1/dup.txt", "Same content")
+        f2 = self._create_file("d2/dup.txt", "Same content")
+
+        link_duplicates([f1, f2], "hardlink")
+
+        self.assertTrue(os.path.samefile(f1["path"], f2["path"]))
+        with open(f2["path"], encoding="utf-8") as f:
+            self.assertEqual(f.read(), "Same content")
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.test_dir, "d2"))), ["dup.txt"]
+        )
+
+    def test_link_duplicates_skips_linked_without_reading(self):
+        f1 = self._create_file("d1/dup.txt", "Same content")
+        f2 = {"name": "dup.txt", "path": os.path.join(self.test_dir, "d2", "dup.txt")}
+        os.makedirs(os.path.dirname(f2["path"]))
+        os.link(f1["path"], f2["path"])
+
+        with mock.patch.object(file_sync_manager, "files_identical") as identical:
+            link_duplicates([f1, f2], "hardlink")
+        identical.assert_not_called()
+        self.assertTrue(os.path.samefile(f1["path"], f2["path"]))
+
+    def test_link_duplicates_keeps_different_content(self):
+        f1 = self._create_file("d1/dup.txt", "Same content")
+        f2 = self._create_file("d2/dup.txt", "Other stuff!")
+
+        link_duplicates([f1, f2], "hardlink")
+
+        self.assertFalse(os.path.samefile(f1["path"], f2["path"]))
+
+    def test_link_duplicates_auto_falls_back_to_hardlink(self):
+        f1 = self._create_file("d1/dup.txt", "Same content")
+        f2 = self._create_file("d2/dup.txt", "Same content")
+
+        with mock.patch.object(
+            file_sync_manager, "reflink_file", side_effect=OSError("unsupported")
+        ):
+            link_duplicates([f1, f2], "auto")
+        self.assertTrue(os.path.samefile(f1["path"], f2["path"]))
+
+    def test_link_duplicates_reflink_only_leaves_file_if_unsupported(self):
+        f1 = self._create_file("d1/dup.txt", "Same content")
+        f2 = self._create_file("d2/dup.txt", "Same content")
+
+        with mock.patch.object(
+            file_sync_manager, "reflink_file", side_effect=OSError("unsupported")
+        ):
+            link_duplicates([f1, f2], "reflink")
+        self.assertFalse(os.path.samefile(f1["path"], f2["path"]))
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.test_dir, "d2"))), ["dup.txt"]
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
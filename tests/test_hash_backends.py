@@ -0,0 +1,90 @@
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import platform
+from unittest import mock
+
+if platform.system() == "Darwin":
+    raise unittest.SkipTest("Skipping all tests on macOS")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pure_core import duplicate_detector  # type: ignore
+from pure_core.duplicate_detector import collect_file_info, file_digest  # type: ignore
+from pure_core.duplicate_detector import get_all_file_info  # type: ignore
+from pure_core.hash_backends import (  # type: ignore
+    available_algorithms,
+    is_cryptographic,
+    resolve_algorithm,
+)
+
+
+class TestHashBackends(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "data.bin")
+        with open(self.path, "wb") as f:
+            f.write(b"payload" * 1000)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_stdlib_algorithms_always_available(self):
+        self.assertIn("sha256", available_algorithms())
+        self.assertIn("blake2b", available_algorithms())
+
+    def test_auto_resolves_to_available_algorithm(self):
+        self.assertIn(resolve_algorithm("auto"), available_algorithms())
+
+    def test_unknown_algorithm_rejected(self):
+        with self.assertRaises(ValueError):
+            resolve_algorithm("md4-turbo")
+
+    def test_digest_independent_of_read_size(self):
+        expected = hashlib.blake2b(b"payload" * 1000, digest_size=32).digest()
+        self.assertEqual(file_digest(self.path, "blake2b", read_size=7), expected)
+        self.assertEqual(file_digest(self.path, "blake2b"), expected)
+
+    def test_file_hash_uses_given_algorithm(self):
+        data = b"payload" * 1000
+        self.assertEqual(
+            duplicate_detector.file_hash(self.path), hashlib.sha256(data).hexdigest()
+        )
+        self.assertEqual(
+            duplicate_detector.file_hash(self.path, "blake2b"),
+            hashlib.blake2b(data, digest_size=32).hexdigest(),
+        )
+
+    def test_pipeline_records_algorithm(self):
+        shutil.copy(self.path, os.path.join(self.test_dir, "copy.bin"))
+        infos = collect_file_info(self.test_dir, algorithm="blake2b")
+        self.assertEqual({i.algorithm for i in infos}, {"blake2b"})
+        self.assertEqual(len({i.digest for i in infos}), 1)
+
+    def test_mmap_and_readinto_paths_agree(self):
+        expected = hashlib.sha256(b"payload" * 1000).digest()
+        with mock.patch.object(duplicate_detector, "MMAP_THRESHOLD", 1):
+            with mock.patch.object(
+                duplicate_detector,
+                "_update_from_mmap",
+                wraps=duplicate_detector._update_from_mmap,
+            ) as mapped:
+                self.assertEqual(file_digest(self.path, read_size=100), expected)
+            mapped.assert_called_once()
+        self.assertEqual(file_digest(self.path, read_size=100), expected)
+
+    def test_get_all_file_info_streams_content(self):
+        infos = get_all_file_info(self.test_dir)
+        self.assertEqual(
+            infos[0]["hash"], hashlib.sha256(b"payload" * 1000).hexdigest()
+        )
+
+    def test_xxhash_is_not_cryptographic(self):
+        self.assertFalse(is_cryptographic("xxh3_128"))
+        self.assertTrue(is_cryptographic("sha256"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import platform
+from unittest import mock
+
+if platform.system() == "Darwin":
+    raise unittest.SkipTest("Skipping all tests on macOS")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pure_core import duplicate_detector  # type: ignore
+from pure_core.duplicate_detector import get_file_metadata  # type: ignore
+from pure_core.hash_cache import HashCache  # type: ignore
+
+
+class TestHashCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.test_dir, "cache", "hashes.sqlite")
+        self.file_path = os.path.join(self.test_dir, "data.txt")
+        with open(self.file_path, "w") as f:
+            f.write("cached content")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_second_lookup_does_not_rehash(self):
+        with HashCache(self.cache_path) as cache:
+            first = get_file_metadata(self.file_path, cache=cache)
+            with mock.patch.object(duplicate_detector, "file_digest") as hasher:
+                second = get_file_metadata(self.file_path, cache=cache)
+            hasher.assert_not_called()
+        self.assertEqual(first["hash"], second["hash"])
+
+    def test_cache_survives_reopen(self):
+        with HashCache(self.cache_path) as cache:
+            get_file_metadata(self.file_path, cache=cache)
+        with HashCache(self.cache_path) as cache:
+            get_file_metadata(self.file_path, cache=cache)
+            self.assertEqual(cache.hits, 1)
+
+    def test_modified_file_invalidates_entry(self):
+        with HashCache(self.cache_path) as cache:
+            first = get_file_metadata(self.file_path, cache=cache)
+            with open(self.file_path, "w") as f:
+                f.write("new content, new size")
+            second = get_file_metadata(self.file_path, cache=cache)
+        self.assertNotEqual(first["hash"], second["hash"])
+
+    def test_evict_keeps_max_entries(self):
+        with HashCache(self.cache_path, max_entries=2) as cache:
+            for inode in range(1, 6):
+                cache.put(1, inode, 10, 0, b"digest%d" % inode)
+            self.assertEqual(cache.evict(), 3)
+            self.assertIsNone(cache.get(1, 1, 10, 0))
+
+    def test_last_used_refreshed_in_batch_only_when_stale(self):
+        with HashCache(self.cache_path) as cache:
+            cache.put(1, 1, 10, 0, b"fresh")
+            cache.put(1, 2, 10, 0, b"stale")
+            cache._conn.execute("UPDATE hashes SET last_used=0 WHERE inode=2")
+            self.assertEqual(cache.get(1, 1, 10, 0), b"fresh")
+            self.assertEqual(cache.get(1, 2, 10, 0), b"stale")
+            # Μόνο η παλιά εγγραφή περιμένει ανανέωση, και όχι ακόμα στη βάση
+            self.assertEqual(len(cache._touched), 1)
+            (last_used,) = cache._conn.execute(
+                "SELECT last_used FROM hashes WHERE inode=2"
+            ).fetchone()
+            self.assertEqual(last_used, 0)
+        with HashCache(self.cache_path) as cache:
+            (last_used,) = cache._conn.execute(
+                "SELECT last_used FROM hashes WHERE inode=2"
+            ).fetchone()
+            self.assertGreater(last_used, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
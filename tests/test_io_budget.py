@@ -0,0 +1,126 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+import platform
+
+if platform.system() == "Darwin":
+    raise unittest.SkipTest("Skipping all tests on macOS")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pure_core.duplicate_detector import file_digest  # type: ignore
+from pure_core.file_sync_manager import files_identical, merge_into  # type: ignore
+from pure_core.io_budget import (  # type: ignore
+    BACKOFF_MAX_PAUSE,
+    Budget,
+    TokenBucket,
+    get_budget,
+    parse_rate,
+    set_budget,
+)
+from pure_core.metrics import Metrics, set_metrics  # type: ignore
+
+
+class TestIOBudget(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.metrics = Metrics()
+        set_metrics(self.metrics)
+
+    def tearDown(self):
+        set_budget(None)
+        set_metrics(None)
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, name, content):  # type: ignore
+        path = os.path.join(self.test_dir, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def _throttled(self):  # type: ignore
+        return self.metrics.as_dict()["stages"].get(
+            "throttle", {"count": 0, "seconds": 0}
+        )
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("50M"), 50 * 1024**2)
+        self.assertEqual(parse_rate("2kb/s"), 2048)
+        self.assertEqual(parse_rate("1000"), 1000)
+        for bad in ("fast", "0", "-1M"):
+            with self.assertRaises(ValueError):
+                parse_rate(bad)
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(1000)
+        self.assertEqual(bucket.reserve(1000), 0.0)
+        self.assertAlmostEqual(bucket.reserve(500), 0.5, delta=0.05)
+
+    def test_default_budget_is_disabled(self):
+        self.assertFalse(get_budget().enabled)
+        get_budget().charge(10**12, 10.0)
+        get_budget().start_file()
+        self.assertEqual(self._throttled()["count"], 0)
+
+    def test_hashing_respects_byte_rate(self):
+        path = self._write("data.bin", os.urandom(300_000))
+        expected = file_digest(path)
+        set_budget(Budget(bytes_per_sec=1_000_000))
+        started = time.monotonic()
+        file_digest(path, read_size=64 * 1024)  # ριπή 1 MB
+        self.assertEqual(file_digest(path, read_size=64 * 1024), expected)
+        file_digest(path, read_size=64 * 1024)
+        file_digest(path, read_size=64 * 1024)
+        # 1.2 MB με 1 MB/s και ριπή 1 MB: τουλάχιστον ~0.2 s αναμονής
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)
+        self.assertGreater(self._throttled()["seconds"], 0)
+
+    def test_files_rate_covers_compare_and_merge(self):
+        a = self._write("a.txt", b"same\n")
+        b = self._write("b.txt", b"same\n")
+        set_budget(Budget(files_per_sec=20))
+        started = time.monotonic()
+        for _ in range(15):
+            self.assertTrue(files_identical(a, b))
+        for _ in range(10):
+            merge_into(a, b, "\n")
+        # 25 αρχεία με 20/s και ριπή 20: τουλάχιστον ~0.25 s
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+
+    def test_adaptive_backoff(self):
+        budget = Budget(max_latency=0.001)
+        budget._adjusted = -1.0
+        self.assertEqual(budget._observe(0.01), 1.0)
+        for _ in range(10):
+            budget._adjusted = -1.0
+            budget._observe(0.01)
+        self.assertEqual(budget.pause, BACKOFF_MAX_PAUSE)
+        budget.latency = 0.0
+        for _ in range(10):
+            budget._adjusted = -1.0
+            budget._observe(0.0)
+        self.assertEqual(budget.pause, 0.0)
+
+    def test_lower_priority_in_child_process(self):
+        code = (
+            "import os, sys; sys.path.insert(0, sys.argv[1]);"
+            "from pure_core.io_budget import lower_priority;"
+            "before = os.nice(0); lower_priority(3, idle_io=True);"
+            "print(os.nice(0) - before)"
+        )
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+        result = subprocess.run(
+            [sys.executable, "-c", code, root],
+            capture_output=True,
+            text=True,
+            cwd=self.test_dir,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "3")
+
+
+if __name__ == "__main__":
+    unittest.main()
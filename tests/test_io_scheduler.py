@@ -0,0 +1,88 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import platform
+
+if platform.system() == "Darwin":
+    raise unittest.SkipTest("Skipping all tests on macOS")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pure_core.duplicate_detector import collect_file_info, file_digest  # type: ignore
+from pure_core.file_record import FileRecord  # type: ignore
+from pure_core.io_scheduler import (  # type: ignore
+    IOSchedule,
+    get_io_schedule,
+    physical_offset,
+    set_io_schedule,
+)
+
+
+class TestIOScheduler(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        set_io_schedule(None)
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, rel, content):  # type: ignore
+        path = os.path.join(self.test_dir, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def _record(self, path):  # type: ignore
+        return FileRecord.from_stat(path, os.path.basename(path), os.stat(path))
+
+    def test_unknown_order(self):
+        with self.assertRaises(ValueError):
+            IOSchedule("random")
+
+    def test_scan_order_is_lazy(self):
+        infos = iter([])
+        self.assertIs(IOSchedule().arrange(infos), infos)
+
+    def test_inode_order(self):
+        records = [
+            self._record(self._write(f"d{i}/f.txt", b"x" * 10)) for i in range(5)
+        ]
+        arranged = IOSchedule("inode").arrange(reversed(records))
+        keys = [(r.device, r.inode) for r in arranged]
+        self.assertEqual(keys, sorted(keys))
+
+    def test_physical_order(self):
+        records = [
+            self._record(self._write(f"d{i}/f.bin", os.urandom(8192))) for i in range(5)
+        ]
+        schedule = IOSchedule("physical")
+        try:
+            physical_offset(records[0].path)
+        except OSError:
+            # Χωρίς FIEMAP (π.χ. tmpfs): σειρά inode για τη συσκευή
+            arranged = schedule.arrange(records)
+            self.assertIn(records[0].device, schedule._no_fiemap)
+            keys = [r.inode for r in arranged]
+        else:
+            arranged = schedule.arrange(records)
+            keys = [physical_offset(r.path) or 0 for r in arranged]
+        self.assertEqual(keys, sorted(keys))
+
+    def test_pipeline_with_schedule_and_fadvise(self):
+        content = os.urandom(200_000)
+        first = self._write("a/same.bin", content)
+        second = self._write("b/same.bin", content)
+        other = self._write("c/other.bin", content[:-1] + b"!")
+        set_io_schedule(IOSchedule("physical", fadvise=True))
+        self.assertTrue(get_io_schedule().fadvise or not hasattr(os, "posix_fadvise"))
+
+        infos = {info.path: info for info in collect_file_info(self.test_dir)}
+        self.assertEqual(infos[first].digest, infos[second].digest)
+        self.assertEqual(infos[first].digest, file_digest(first))
+        self.assertNotEqual(infos[first].digest, infos[other].digest)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,230 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import platform
+from unittest import mock
+
+if platform.system() == "Darwin":
+    raise unittest.SkipTest("Skipping all tests on macOS")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pure_core import merge_engine  # type: ignore
+from pure_core.merge_engine import append_merge, diff_merge, merge_chain  # type: ignore
+
+
+class TestMergeEngine(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, name, data):  # type: ignore
+        path = os.path.join(self.test_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def _read(self, path):  # type: ignore
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_append_merge_binary_content(self):
+        target = self._write("target.bin", b"old\xff\xfe")
+        source = self._write("source.bin", b"\x00new\x80")
+
+        append_merge(target, source, "\n# header\n")
+
+        self.assertEqual(self._read(target), b"old\xff\xfe\n# header\n\x00new\x80")
+        self.assertEqual(self._read(source), b"\x00new\x80")
+        self.assertEqual(
+            sorted(os.listdir(self.test_dir)), ["source.bin", "target.bin"]
+        )
+
+    def test_append_merge_without_kernel_copy(self):
+        target = self._write("target.bin", b"a" * 3000)
+        source = self._write("source.bin", b"b" * 5000)
+
+        with (
+            mock.patch.object(merge_engine, "_kernel_copy", return_value=False),
+            mock.patch.object(merge_engine, "MERGE_CHUNK_SIZE", 1024),
+        ):
+            append_merge(target, source, "|")
+
+        self.assertEqual(self._read(target), b"a" * 3000 + b"|" + b"b" * 5000)
+
+    def test_append_merge_failure_keeps_target(self):
+        target = self._write("target.bin", b"original")
+        os.chmod(target, 0o640)
+
+        with self.assertRaises(OSError):
+            append_merge(target, os.path.join(self.test_dir, "missing.bin"), "|")
+
+        self.assertEqual(self._read(target), b"original")
+        self.assertEqual(os.listdir(self.test_dir), ["target.bin"])
+
+    def test_append_merge_keeps_mode(self):
+        target = self._write("target.bin", b"x")
+        source = self._write("source.bin", b"y")
+        os.chmod(target, 0o640)
+
+        append_merge(target, source, "")
+
+        self.assertEqual(os.stat(target).st_mode & 0o777, 0o640)
+
+    @unittest.skipUnless(
+        hasattr(os, "geteuid") and os.geteuid() == 0, "chown μόνο ως root"
+    )
+    def test_append_merge_keeps_owner(self):
+        target = self._write("target.bin", b"x")
+        source = self._write("source.bin", b"y")
+        os.chown(target, 12345, 23456)
+
+        append_merge(target, source, "")
+
+        st = os.stat(target)
+        self.assertEqual((st.st_uid, st.st_gid), (12345, 23456))
+
+    def test_append_merge_keeps_hardlinks(self):
+        target = self._write("target.txt", b"old\n")
+        link = os.path.join(self.test_dir, "link.txt")
+        os.link(target, link)
+        source = self._write("source.txt", b"new\n")
+
+        append_merge(target, source, "# merged\n")
+
+        self.assertEqual(self._read(link), b"old\n# merged\nnew\n")
+        self.assertTrue(os.path.samefile(target, link))
+
+    def test_append_in_place_failure_restores_size(self):
+        target = self._write("target.txt", b"old\n")
+        os.link(target, os.path.join(self.test_dir, "link.txt"))
+        source = self._write("source.txt", b"new\n")
+
+        with mock.patch.object(
+            merge_engine, "copy_stream", side_effect=OSError("boom")
+        ):
+            with self.assertRaises(OSError):
+                append_merge(target, source, "# merged\n")
+
+        self.assertEqual(self._read(target), b"old\n")
+
+    def test_write_all_retries_short_writes(self):
+        class ShortWriter:
+            def __init__(self):  # type: ignore
+                self.data = bytearray()
+
+            def write(self, chunk):  # type: ignore
+                self.data += bytes(chunk[:3])
+                return min(3, len(chunk))
+
+        out = ShortWriter()
+        merge_engine.write_all(out, b"0123456789")
+        self.assertEqual(bytes(out.data), b"0123456789")
+
+    def test_diff_merge_adds_only_new_lines(self):
+        target = self._write("target.txt", b"a\nb\nc\n")
+        source = self._write("source.txt", b"a\nb\nnew\nc\nend\n")
+
+        added = diff_merge(target, source, "# merged\n")
+
+        self.assertEqual(added, 2)
+        self.assertEqual(self._read(target), b"a\nb\nc\n# merged\nnew\nend\n")
+
+    def test_line_hashes_are_content_digests(self):
+        path = self._write("lines.txt", b"a\nb\na\n")
+
+        keys = merge_engine._line_hashes(path)
+
+        self.assertEqual(len(keys), 3)
+        self.assertEqual(keys[0], keys[2])
+        self.assertNotEqual(keys[0], keys[1])
+        self.assertTrue(all(len(k) == merge_engine.LINE_DIGEST_SIZE for k in keys))
+
+    def test_diff_merge_identical_is_noop(self):
+        target = self._write("target.txt", b"same\nlines\n")
+        source = self._write("source.txt", b"same\nlines\n")
+        before = os.stat(target)
+
+        self.assertEqual(diff_merge(target, source, "# merged\n"), 0)
+
+        self.assertEqual(self._read(target), b"same\nlines\n")
+        self.assertEqual(os.stat(target).st_ino, before.st_ino)
+
+    def test_diff_merge_repeated_mid_file_change_is_noop(self):
+        target = self._write("target.txt", b"a\nb\nc\n")
+        source = self._write("source.txt", b"a\nx\nc\n")
+
+        self.assertEqual(diff_merge(target, source, "# merged\n"), 1)
+        merged = self._read(target)
+        inode = os.stat(target).st_ino
+
+        self.assertEqual(diff_merge(target, source, "# merged\n"), 0)
+        self.assertEqual(diff_merge(target, source, "# merged\n"), 0)
+        self.assertEqual(merge_chain(target, [(source, "# merged\n")], "diff"), 0)
+        self.assertEqual(self._read(target), merged)
+        self.assertEqual(merged, b"a\nb\nc\n# merged\nx\n")
+        self.assertEqual(os.stat(target).st_ino, inode)
+
+    def test_diff_merge_repeated_stays_bounded(self):
+        target = self._write(
+            "target.txt", b"".join(b"line %d\n" % i for i in range(1000))
+        )
+        source = self._write(
+            "source.txt", b"".join(b"line %d\n" % i for i in range(1000)) + b"tail\n"
+        )
+
+        diff_merge(target, source, "# merged\n")
+        size = os.path.getsize(target)
+        diff_merge(target, source, "# merged\n")
+
+        self.assertEqual(os.path.getsize(target), size)
+        self.assertLess(size, os.path.getsize(source) + 20)
+
+    def test_diff_merge_writes_in_chunks(self):
+        target = self._write("target.txt", b"x\n")
+        lines = [b"%05d\n" % i for i in range(500)]
+        source = self._write("source.txt", b"x\n" + b"".join(lines))
+
+        with mock.patch.object(merge_engine, "MERGE_CHUNK_SIZE", 64):
+            self.assertEqual(diff_merge(target, source, ""), 500)
+
+        self.assertEqual(self._read(target), b"x\n" + b"".join(lines))
+
+    def test_merge_chain_writes_target_once(self):
+        target = self._write("target.txt", b"a\n")
+        v2 = self._write("v2.txt", b"a\nb\n")
+        v3 = self._write("v3.txt", b"a\nb\nc\n")
+        v4 = self._write("v4.txt", b"a\n")
+
+        with mock.patch.object(
+            merge_engine, "_rewrite_with_tail", wraps=merge_engine._rewrite_with_tail
+        ) as rewrite:
+            added = merge_chain(
+                target, [(v2, "#2\n"), (v3, "#3\n"), (v4, "#4\n")], "diff"
+            )
+
+        rewrite.assert_called_once()
+        self.assertEqual(added, 2)
+        self.assertEqual(self._read(target), b"a\n#2\nb\n#3\nc\n")
+
+    def test_merge_chain_append_keeps_order(self):
+        target = self._write("target.bin", b"1")
+        sources = [
+            (self._write(f"s{i}.bin", str(i).encode()), f"|{i}|") for i in (2, 3)
+        ]
+        self.assertEqual(merge_chain(target, sources), 2)
+        self.assertEqual(self._read(target), b"1|2|2|3|3")
+
+    def test_merge_chain_noop_leaves_target(self):
+        target = self._write("target.txt", b"same\n")
+        source = self._write("source.txt", b"same\n")
+        before = os.stat(target).st_ino
+        self.assertEqual(merge_chain(target, [(source, "#\n")], "diff"), 0)
+        self.assertEqual(os.stat(target).st_ino, before)
+
+
+if __name__ == "__main__":
+    unittest.main()
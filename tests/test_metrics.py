@@ -0,0 +1,114 @@
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import platform
+
+if platform.system() == "Darwin":
+    raise unittest.SkipTest("Skipping all tests on macOS")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pure_core.duplicate_detector import inspect_directory_state  # type: ignore
+from pure_core.file_sync_manager import delete_duplicates  # type: ignore
+from pure_core.metrics import (  # type: ignore
+    Metrics,
+    get_metrics,
+    profiling,
+    set_metrics,
+    setup_queue_logging,
+    write_metrics,
+)
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.metrics = Metrics()
+        set_metrics(self.metrics)
+
+    def tearDown(self):
+        set_metrics(None)
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, rel, content):  # type: ignore
+        path = os.path.join(self.test_dir, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_timer_accumulates(self):
+        with self.metrics.timer("hash", nbytes=10):
+            pass
+        with self.metrics.timer("hash", count=0) as timer:
+            timer.count, timer.nbytes = 2, 5
+        stages = self.metrics.as_dict()["stages"]
+        self.assertEqual(stages["hash"]["count"], 3)
+        self.assertEqual(stages["hash"]["bytes"], 15)
+        self.assertGreaterEqual(stages["hash"]["seconds"], 0)
+
+    def test_disabled_metrics_record_nothing(self):
+        set_metrics(None)
+        self.assertFalse(get_metrics().enabled)
+        with get_metrics().timer("walk"):
+            pass
+        get_metrics().add("stat")
+        self.assertEqual(get_metrics().as_dict()["stages"], {})
+
+    def test_scan_and_delete_are_instrumented(self):
+        keep = self._write("a/same.txt", "duplicate")
+        dup = self._write("b/same.txt", "duplicate")
+        self._write("c/other.txt", "duplicatX")
+        inspect_directory_state(self.test_dir)
+        delete_duplicates([{"path": keep}, {"path": dup}])
+
+        stages = self.metrics.as_dict()["stages"]
+        self.assertEqual(list(stages), ["walk", "stat", "hash", "delete"])
+        self.assertEqual(stages["walk"]["count"], 4)
+        self.assertEqual(stages["stat"]["count"], 3)
+        self.assertEqual(stages["hash"]["bytes"], 27)
+        self.assertEqual((stages["delete"]["count"], stages["delete"]["bytes"]), (1, 9))
+
+    def test_export_formats(self):
+        self.metrics.add("hash", 2, 100, 0.5)
+        json_path = os.path.join(self.test_dir, "metrics.json")
+        prom_path = os.path.join(self.test_dir, "metrics.prom")
+        write_metrics(self.metrics, json_path)
+        write_metrics(self.metrics, prom_path, "prometheus")
+
+        with open(json_path) as f:
+            self.assertEqual(
+                json.load(f)["stages"]["hash"],
+                {"count": 2, "bytes": 100, "seconds": 0.5},
+            )
+        with open(prom_path) as f:
+            prom = f.read()
+        self.assertIn('pure_core_stage_bytes_total{stage="hash"} 100', prom)
+        self.assertIn("# TYPE pure_core_stage_seconds_total counter", prom)
+        self.assertEqual(
+            sorted(os.listdir(self.test_dir)), ["metrics.json", "metrics.prom"]
+        )
+
+    def test_profiling_hooks(self):
+        profile_path = os.path.join(self.test_dir, "run.prof")
+        with profiling(profile_path, trace_memory=True, metrics=self.metrics):
+            data = [bytes(1000) for _ in range(100)]
+        del data
+        self.assertTrue(os.path.getsize(profile_path))
+        self.assertGreaterEqual(self.metrics.memory_peak, 100_000)
+        self.assertIn("Μέγιστη μνήμη", self.metrics.summary())
+
+    def test_queue_logging_respects_existing_handlers(self):
+        root = logging.getLogger()
+        handlers = list(root.handlers)
+        if not handlers:
+            self.skipTest("ο root logger δεν έχει handlers")
+        setup_queue_logging(os.path.join(self.test_dir, "x.log"))
+        self.assertEqual(root.handlers, handlers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import platform
+
+if platform.system() == "Darwin":
+    raise unittest.SkipTest("Skipping all tests on macOS")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pure_core.duplicate_detector import collect_file_info  # type: ignore
+from pure_core.parallel import bounded_map, make_executor  # type: ignore
+
+
+class TestBoundedMap(unittest.TestCase):
+    def test_serial_without_executor(self):
+        results = list(bounded_map(lambda x: x * 2, [1, 2, 3]))
+        self.assertEqual([(1, 2, None), (2, 4, None), (3, 6, None)], results)
+
+    def test_errors_are_returned_not_raised(self):
+        def boom(x):
+            raise ValueError(x)
+
+        ((item, result, error),) = bounded_map(boom, [7])
+        self.assertEqual(item, 7)
+        self.assertIsNone(result)
+        self.assertIsInstance(error, ValueError)
+
+    def test_in_flight_is_bounded(self):
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def work(x):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.01)
+            with lock:
+                state["running"] -= 1
+            return x
+
+        pulled = []
+
+        def items():
+            for i in range(20):
+                pulled.append(i)
+                yield i
+
+        executor = make_executor(8)
+        try:
+            gen = bounded_map(work, items(), executor=executor, max_in_flight=3)
+            next(gen)
+            self.assertLessEqual(len(pulled), 4)
+            rest = list(gen)
+        finally:
+            executor.shutdown()
+        self.assertEqual(len(rest), 19)
+        self.assertLessEqual(state["peak"], 3)
+
+
+class TestParallelCollect(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        for i in range(12):
+            sub = os.path.join(self.test_dir, f"d{i % 3}")
+            os.makedirs(sub, exist_ok=True)
+            with open(os.path.join(sub, f"f{i}.txt"), "w") as f:
+                f.write("same" if i % 2 else f"unique {i:04d}")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_parallel_matches_serial(self):
+        def summary(infos):
+            return sorted((i["path"], i["hash"]) for i in infos)
+
+        serial = collect_file_info(self.test_dir)
+        threaded = collect_file_info(self.test_dir, jobs=4)
+        processes = collect_file_info(self.test_dir, jobs=2, use_processes=True)
+        self.assertEqual(summary(serial), summary(threaded))
+        self.assertEqual(summary(serial), summary(processes))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import platform
+from unittest import mock
+
+if platform.system() == "Darwin":
+    raise unittest.SkipTest("Skipping all tests on macOS")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pure_core import shard_index  # type: ignore
+from pure_core.shard_index import (  # type: ignore
+    build_shard_index,
+    iter_index_groups,
+    parse_shard,
+    shard_of,
+)
+
+
+class TestShardIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.root1 = os.path.join(self.test_dir, "r1")
+        self.root2 = os.path.join(self.test_dir, "r2")
+        self._write(self.root1, "a/same.txt", "duplicate")
+        self._write(self.root2, "b/same.txt", "duplicate")
+        self._write(self.root1, "v/notes.txt", "version one")
+        self._write(self.root2, "notes.txt", "version two")
+        for number in range(20):
+            self._write(
+                self.root1 if number % 2 else self.root2, f"n{number}.txt", str(number)
+            )
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, root, rel, content):  # type: ignore
+        path = os.path.join(root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def _index(self, name, roots, **kwargs):  # type: ignore
+        path = os.path.join(self.test_dir, name)
+        build_shard_index(roots, path, **kwargs)
+        return path
+
+    @staticmethod
+    def _summary(groups):  # type: ignore
+        return {
+            name: sorted((f["path"], f["hash"]) for f in files)
+            for name, files in groups
+        }
+
+    @staticmethod
+    def _rows(path):  # type: ignore
+        with open(path, encoding="utf-8") as f:
+            f.readline()
+            return [json.loads(line) for line in f]
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for spec in ("4/4", "1", "a/2", "-1/2"):
+            with self.assertRaises(ValueError):
+                parse_shard(spec)
+
+    def test_hash_range_shards_partition_names(self):
+        roots = [self.root1, self.root2]
+        full = self._rows(self._index("full.jsonl", roots))
+        shards = [
+            self._rows(self._index(f"s{i}.jsonl", roots, shard=(i, 3)))
+            for i in range(3)
+        ]
+        self.assertEqual(
+            sorted(r[2] for s in shards for r in s), sorted(r[2] for r in full)
+        )
+        for i, rows in enumerate(shards):
+            self.assertTrue(all(shard_of(r[0], 3) == i for r in rows))
+
+    def test_shard_stats_only_its_own_names(self):
+        roots = [self.root1, self.root2]
+        metadata = shard_index.entry_metadata
+        with mock.patch.object(shard_index, "entry_metadata", wraps=metadata) as stats:
+            rows = self._rows(self._index("s0.jsonl", roots, shard=(0, 3)))
+        stated = [call.args[0].name for call in stats.call_args_list]
+        self.assertEqual(len(stated), len(rows))
+        self.assertTrue(all(shard_of(name, 3) == 0 for name in stated))
+
+    def test_index_is_sorted_with_small_runs(self):
+        rows = self._rows(self._index("i.jsonl", [self.root1, self.root2], run_size=3))
+        keys = [(r[0], r[1], r[2]) for r in rows]
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(len(rows), 24)
+
+    def test_reduce_finds_cross_root_groups(self):
+        index1 = self._index("i1.jsonl", [self.root1])
+        index2 = self._index("i2.jsonl", [self.root2])
+        # Κάθε ρίζα μόνη της δεν έχει συμπτώσεις, άρα κανένα hash
+        self.assertTrue(all(r[3] is None for r in self._rows(index1)))
+
+        groups = self._summary(iter_index_groups([index1, index2]))
+        self.assertEqual(sorted(groups), ["notes.txt", "same.txt"])
+        self.assertEqual(len({h for _, h in groups["same.txt"]}), 1)
+        self.assertEqual(len({h for _, h in groups["notes.txt"]}), 2)
+
+    def test_sharded_reduce_matches_single_index(self):
+        roots = [self.root1, self.root2]
+        single = self._summary(iter_index_groups([self._index("all.jsonl", roots)]))
+        shards = [self._index(f"s{i}.jsonl", roots, shard=(i, 2)) for i in range(2)]
+        self.assertEqual(self._summary(iter_index_groups(shards)), single)
+
+    def test_overlapping_roots_count_once(self):
+        index = self._index("i.jsonl", [self.root1, os.path.join(self.root1, "a")])
+        self.assertEqual(self._summary(iter_index_groups([index])), {})
+
+    def test_reduce_rehashes_files_changed_after_index(self):
+        index = self._index("i.jsonl", [self.root1, self.root2])
+        path = os.path.join(self.root2, "b", "same.txt")
+        self._write(self.root2, "b/same.txt", "changed!!")
+        os.utime(path, ns=(1, 1))
+        groups = self._summary(iter_index_groups([index]))
+        self.assertEqual(len({h for _, h in groups["same.txt"]}), 2)
+
+    def test_reduce_rejects_mixed_algorithms(self):
+        index1 = self._index("i1.jsonl", [self.root1], algorithm="sha256")
+        index2 = self._index("i2.jsonl", [self.root2], algorithm="blake2b")
+        with self.assertRaises(ValueError):
+            list(iter_index_groups([index1, index2]))
+
+
+if __name__ == "__main__":
+    unittest.main()
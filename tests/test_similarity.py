@@ -0,0 +1,107 @@
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+import platform
+from unittest import mock
+
+if platform.system() == "Darwin":
+    raise unittest.SkipTest("Skipping all tests on macOS")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pure_core import similarity  # type: ignore
+from pure_core.hash_cache import HashCache  # type: ignore
+from pure_core.similarity import (  # type: ignore
+    SimilarityIndex,
+    estimate_similarity,
+    find_near_duplicates,
+    iter_chunk_fingerprints,
+    minhash_signature,
+    pack_signature,
+    unpack_signature,
+)
+
+
+class TestSimilarity(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        rng = random.Random(7)
+        self.text = b"".join(
+            b"record %d value %d\n" % (i, rng.randint(0, 10**6)) for i in range(40000)
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, rel, data):  # type: ignore
+        path = os.path.join(self.test_dir, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_chunks_survive_prepended_header(self):
+        a = set(iter_chunk_fingerprints(self._write("a.log", self.text)))
+        b = set(
+            iter_chunk_fingerprints(self._write("b.log", b"# header\n" + self.text))
+        )
+        self.assertGreater(len(a), 50)
+        self.assertGreater(len(a & b) / len(a | b), 0.9)
+
+    def test_chunking_is_deterministic_and_bounded(self):
+        path = self._write("zeros.bin", b"\0" * (200 * 1024))
+        fingerprints = list(iter_chunk_fingerprints(path))
+        self.assertEqual(fingerprints, list(iter_chunk_fingerprints(path)))
+        self.assertEqual(len(fingerprints), 4)
+        self.assertEqual(list(iter_chunk_fingerprints(self._write("empty", b""))), [])
+
+    def test_signature_similarity(self):
+        a = minhash_signature(range(1000))
+        self.assertEqual(estimate_similarity(a, a), 1.0)
+        self.assertLess(
+            estimate_similarity(a, minhash_signature(range(5000, 6000))), 0.1
+        )
+
+    def test_index_skips_empty_bands(self):
+        index = SimilarityIndex()
+        index.add("a", minhash_signature([1]))
+        index.add("b", minhash_signature([2]))
+        self.assertEqual(index.candidate_pairs(), set())
+
+    def test_find_near_duplicates_across_names(self):
+        original = self._write("docs/report.txt", self.text)
+        renamed = self._write(
+            "backup/old_copy.dat", b"# v2\n" + self.text + b"appendix\n"
+        )
+        self._write("other/unrelated.txt", bytes(reversed(self.text)))
+
+        pairs = find_near_duplicates(self.test_dir, threshold=0.8)
+
+        self.assertEqual(
+            [(a, b) for a, b, _ in pairs], [tuple(sorted((original, renamed)))]
+        )
+
+    def test_signature_packing_roundtrip(self):
+        signature = minhash_signature([1, 2**64 - 1, 130], num_bins=128)
+        self.assertEqual(unpack_signature(pack_signature(signature), 128), signature)
+
+    def test_signatures_come_from_cache(self):
+        self._write("docs/report.txt", self.text)
+        self._write("backup/old_copy.dat", b"# v2\n" + self.text)
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        with HashCache(os.path.join(cache_dir, "hashes.sqlite")) as cache:
+            first = find_near_duplicates(self.test_dir, threshold=0.8, cache=cache)
+            with mock.patch.object(
+                similarity, "file_signature", side_effect=AssertionError("chunking")
+            ):
+                second = find_near_duplicates(self.test_dir, threshold=0.8, cache=cache)
+
+        self.assertEqual(len(first), 1)
+        self.assertEqual(second, first)
+
+
+if __name__ == "__main__":
+    unittest.main()
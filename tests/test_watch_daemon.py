@@ -0,0 +1,281 @@
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import time
+import unittest
+import platform
+from unittest import mock
+
+if platform.system() == "Darwin":
+    raise unittest.SkipTest("Skipping all tests on macOS")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pure_core.file_record import FileRecord  # type: ignore
+from pure_core import watch_daemon  # type: ignore
+from pure_core.metrics import Metrics, set_metrics  # type: ignore
+from pure_core.watch_daemon import (  # type: ignore
+    Debouncer,
+    LiveIndex,
+    QueryServer,
+    WatchDaemon,
+    query_daemon,
+)
+
+
+class TestDebouncer(unittest.TestCase):
+    def test_ready_after_quiet_period(self):
+        debouncer = Debouncer(1.0)
+        debouncer.touch("/a", now=10.0)
+        debouncer.touch("/b", now=10.5)
+        debouncer.touch("/a", now=10.8)  # νέα εγγραφή, μετατίθεται
+        self.assertEqual(debouncer.ready(now=11.0), [])
+        self.assertEqual(debouncer.ready(now=11.6), [("/b", False)])
+        self.assertEqual(debouncer.next_deadline(), 11.8)
+        self.assertEqual(debouncer.ready(now=12.0), [("/a", False)])
+        self.assertEqual(len(debouncer), 0)
+        self.assertIsNone(debouncer.next_deadline())
+
+    def test_directory_flag_is_sticky(self):
+        debouncer = Debouncer(1.0)
+        debouncer.touch("/d", now=10.0, is_dir=True)
+        debouncer.touch("/d", now=10.5)
+        self.assertEqual(debouncer.ready(now=12.0), [("/d", True)])
+
+
+class TestLiveIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _record(self, rel, content):  # type: ignore
+        path = os.path.join(self.test_dir, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return FileRecord.from_stat(path, os.path.basename(path), os.stat(path))
+
+    def test_update_remove_and_tree(self):
+        index = LiveIndex()
+        first = self._record("a/x.txt", "one")
+        second = self._record("b/sub/x.txt", "one")
+        self.assertTrue(index.update(first))
+        self.assertTrue(index.update(second))
+        first.digest = b"digest"
+        same = FileRecord.from_stat(first.path, "x.txt", os.stat(first.path))
+        self.assertFalse(index.update(same))
+        self.assertEqual(index.files[first.path].digest, b"digest")
+
+        self.assertEqual(index.remove_tree(os.path.join(self.test_dir, "b")), {"x.txt"})
+        self.assertEqual([f.path for f in index.group("x.txt")], [first.path])
+        self.assertEqual(index.remove(first.path), "x.txt")
+        self.assertEqual(index.group("x.txt"), [])
+        self.assertIsNone(index.remove(first.path))
+        self.assertEqual((index.by_dir, index.subdirs), ({}, {}))
+
+    def test_remove_tree_only_touches_subtree(self):
+        index = LiveIndex()
+        inside = [self._record(rel, "one") for rel in ("b/x.txt", "b/sub/deep/y.txt")]
+        outside = [self._record(rel, "one") for rel in ("a/x.txt", "bb/x.txt")]
+        for record in inside + outside:
+            index.update(record)
+
+        self.assertEqual(
+            index.remove_tree(os.path.join(self.test_dir, "b")), {"x.txt", "y.txt"}
+        )
+
+        self.assertEqual(sorted(index.files), sorted(r.path for r in outside))
+        self.assertNotIn(os.path.join(self.test_dir, "b"), index.subdirs)
+        self.assertEqual(
+            index.remove_tree(os.path.join(self.test_dir, "missing")), set()
+        )
+
+    def test_publish_skips_changed_records(self):
+        index = LiveIndex()
+        record = self._record("a/x.txt", "one")
+        index.update(record)
+        hashed = FileRecord.from_stat(record.path, "x.txt", os.stat(record.path))
+        hashed.digest = b"digest"
+        stale = FileRecord.from_stat(record.path, "x.txt", os.stat(record.path))
+        stale.size += 1
+        stale.digest = b"stale"
+
+        index.publish([stale])
+        self.assertIsNone(index.files[record.path].digest)
+        index.publish([hashed])
+        self.assertEqual(index.files[record.path].digest, b"digest")
+        self.assertIsNot(index.files[record.path], hashed)
+
+    def test_hardlink_inherits_digests(self):
+        index = LiveIndex()
+        first = self._record("a/x.txt", "one")
+        first.digest = b"digest"
+        index.update(first)
+        link = os.path.join(self.test_dir, "x.txt")
+        os.link(first.path, link)
+        self.assertTrue(
+            index.update(FileRecord.from_stat(link, "x.txt", os.stat(link)))
+        )
+        self.assertEqual(index.files[link].digest, b"digest")
+        self.assertEqual(
+            index.duplicate_groups(), {"x.txt": [sorted([link, first.path])]}
+        )
+
+
+class TestWatchDaemon(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.metrics = Metrics()
+        set_metrics(self.metrics)
+        self.handled = []
+
+    def tearDown(self):
+        set_metrics(None)
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, rel, content):  # type: ignore
+        path = os.path.join(self.test_dir, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def _on_group(self, name, files):  # type: ignore
+        self.handled.append((name, sorted(f.path for f in files)))
+
+    def _hash_count(self):  # type: ignore
+        stats = self.metrics.as_dict()["stages"].get("hash")
+        return stats["count"] if stats else 0
+
+    def _wait_for(self, daemon, condition, seconds=5.0):  # type: ignore
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            daemon.step(0.05)
+            if condition():
+                return True
+        return False
+
+    def _check_daemon(self, use_inotify):  # type: ignore
+        first = self._write("a/report.txt", "same content")
+        self._write("a/other.txt", "unique")
+        daemon = WatchDaemon(
+            self.test_dir,
+            self._on_group,
+            debounce=0.1,
+            poll_interval=0.1,
+            use_inotify=use_inotify,
+        )
+        daemon.start()
+        try:
+            self.assertEqual(daemon.duplicate_groups(), {})
+            hashed = self._hash_count()
+
+            second = self._write("b/report.txt", "same content")
+            self.assertTrue(self._wait_for(daemon, lambda: self.handled))
+            self.assertEqual(self.handled, [("report.txt", sorted([first, second]))])
+            self.assertEqual(
+                daemon.duplicate_groups(), {"report.txt": [sorted([first, second])]}
+            )
+            # Μόνο τα δύο report.txt χρειάστηκαν hash, όχι το other.txt
+            self.assertLessEqual(self._hash_count() - hashed, 4)
+
+            os.remove(second)
+            self.assertTrue(
+                self._wait_for(daemon, lambda: daemon.duplicate_groups() == {})
+            )
+
+            # Διαγραφή ολόκληρου φακέλου
+            third = self._write("c/deep/report.txt", "same content")
+            self.assertTrue(
+                self._wait_for(daemon, lambda: daemon.duplicate_groups() != {})
+            )
+            shutil.rmtree(os.path.join(self.test_dir, "c"))
+            self.assertTrue(
+                self._wait_for(daemon, lambda: daemon.duplicate_groups() == {})
+            )
+            self.assertNotIn(os.path.dirname(third), daemon.index.by_dir)
+        finally:
+            daemon.close()
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify μόνο στο Linux")
+    def test_inotify_daemon(self):
+        self._check_daemon(use_inotify=True)
+
+    def test_polling_daemon(self):
+        self._check_daemon(use_inotify=False)
+
+    def test_resync_builds_index_outside_lock(self):
+        first = self._write("a/x.txt", "same")
+        self._write("b/x.txt", "same")
+        daemon = WatchDaemon(self.test_dir, self._on_group, use_inotify=False)
+        daemon.start()
+        try:
+            hashed = self._hash_count()
+            third = self._write("c/x.txt", "same")
+            os.remove(first)
+            scan = watch_daemon.IncrementalScanner.scan
+            locked = []
+
+            def checking_scan(scanner, root):  # type: ignore
+                for record in scan(scanner, root):
+                    locked.append(daemon.lock.locked())
+                    yield record
+
+            with mock.patch.object(
+                watch_daemon.IncrementalScanner, "scan", checking_scan
+            ):
+                daemon._resync_all()
+
+            self.assertTrue(locked)
+            self.assertFalse(any(locked))
+            self.assertNotIn(first, daemon.index.files)
+            groups = daemon.duplicate_groups()["x.txt"]
+            self.assertEqual(len(groups), 1)
+            self.assertIn(third, groups[0])
+            # Μόνο το νέο αρχείο χρειάστηκε hash
+            self.assertLessEqual(self._hash_count() - hashed, 2)
+        finally:
+            daemon.close()
+
+    def test_query_server_refuses_non_socket_path(self):
+        path = self._write("notes.txt", "keep me")
+        daemon = WatchDaemon(self.test_dir, use_inotify=False)
+        with self.assertRaises(FileExistsError):
+            QueryServer(path, daemon)
+        with open(path) as f:
+            self.assertEqual(f.read(), "keep me")
+
+    def test_query_server_replaces_stale_socket(self):
+        path = os.path.join(self.test_dir, "stale.sock")
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+        server = QueryServer(path, WatchDaemon(self.test_dir, use_inotify=False))
+        server.close()
+
+    def test_query_server(self):
+        first = self._write("a/x.txt", "same")
+        second = self._write("b/x.txt", "same")
+        daemon = WatchDaemon(self.test_dir, use_inotify=False)
+        daemon.start()
+        socket_path = os.path.join(self.test_dir, "query.sock")
+        server = QueryServer(socket_path, daemon)
+        try:
+            self.assertEqual(
+                query_daemon(socket_path),
+                {"groups": {"x.txt": [sorted([first, second])]}},
+            )
+            stats = query_daemon(socket_path, "stats")
+            self.assertEqual((stats["files"], stats["pending"]), (2, 0))
+            self.assertIn("error", query_daemon(socket_path, "nope"))
+        finally:
+            server.close()
+            daemon.close()
+        self.assertFalse(os.path.exists(socket_path))
+
+
+if __name__ == "__main__":
+    unittest.main()